@@ -0,0 +1,69 @@
+"""
+冷启动基准测试
+在新的Python进程中测量导入src包和创建Agent的耗时，并检查是否提前加载了openai、tavily、numpy等重依赖
+
+用法：
+    python benchmarks/import_time.py --repeat 10
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+HEAVY_MODULES = ("openai", "tavily", "numpy")
+
+# 在子进程中执行的代码，最后一行打印已加载的重依赖
+TARGETS = {
+    "import src": "import src",
+    "from src import Config": "from src import Config",
+    "from src import DeepSearchAgent": "from src import DeepSearchAgent",
+    "创建DeepSearchAgent": (
+        "from src import DeepSearchAgent, Config\n"
+        "DeepSearchAgent(Config(deepseek_api_key='bench', tavily_api_key='bench', output_dir={output_dir!r}))"
+    ),
+}
+
+_REPORT = (
+    "\nimport sys\n"
+    f"print(','.join(sorted({{name.split('.')[0] for name in sys.modules}} & {set(HEAVY_MODULES)!r})))"
+)
+
+_TIMER = (
+    "import time\n"
+    "_start = time.perf_counter()\n"
+    "{code}\n"
+    "print(time.perf_counter() - _start)"
+)
+
+
+def run_target(code: str) -> tuple:
+    """在新进程中执行代码，返回(耗时秒数, 已加载的重依赖)"""
+    output = subprocess.run(
+        [sys.executable, "-c", _TIMER.format(code=code) + _REPORT],
+        cwd=ROOT, capture_output=True, text=True, check=True
+    ).stdout.split("\n")
+    return float(output[0]), output[1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="冷启动基准测试")
+    parser.add_argument("--repeat", type=int, default=10, help="每个目标的重复次数")
+    args = parser.parse_args()
+
+    print(f"{'目标':<34}{'中位数(ms)':>12}{'最小(ms)':>12}  已加载的重依赖")
+    with tempfile.TemporaryDirectory() as output_dir:
+        for name, code in TARGETS.items():
+            code = code.format(output_dir=output_dir)
+            runs = [run_target(code) for _ in range(args.repeat)]
+            times = [elapsed for elapsed, _ in runs]
+            print(f"{name:<34}{statistics.median(times) * 1000:>12.1f}{min(times) * 1000:>12.1f}"
+                  f"  {runs[-1][1] or '-'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+状态序列化基准测试
+比较JSON与二进制格式（不压缩、zlib、lzma）在大状态上的文件大小、保存/加载耗时，
+以及二进制格式延迟加载（只读元数据）的耗时和JSON一次性/流式保存的峰值内存
+
+用法：
+    python benchmarks/state_serialization.py --paragraphs 5 --searches 200 --content-size 8000
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from src.state import State  # noqa: E402
+
+# 用于生成搜索内容的词表，中英文混合，接近真实搜索结果的可压缩程度
+_WORDS = (
+    "人工智能 芯片 出口管制 供应链 半导体 市场 预测 政策 投资 研发 产能 需求 价格 竞争 监管 "
+    "AI chip export control supply chain semiconductor market forecast policy investment "
+    "2025 2026 2027 growth revenue capacity demand NVIDIA TSMC analysts report"
+).split()
+
+
+def build_state(paragraphs: int, searches: int, content_size: int, seed: int = 0) -> State:
+    """构造一个包含大量搜索记录的状态"""
+    rng = random.Random(seed)
+    state = State(query="AI芯片出口管制的未来影响", report_title="AI芯片出口管制展望")
+    for p in range(paragraphs):
+        state.add_paragraph(f"段落{p}", "预期内容" * 20)
+        research = state.paragraphs[p].research
+        for i in range(searches // 5):
+            query = f"AI芯片 出口管制 影响 {p}-{i} 2026年"
+            results = []
+            for j in range(5):
+                words = []
+                length = 0
+                while length < content_size:
+                    word = rng.choice(_WORDS)
+                    words.append(word)
+                    length += len(word) + 1
+                results.append({
+                    "url": f"https://example.com/{p}/{i}/{j}",
+                    "title": f"搜索结果 {p}-{i}-{j}",
+                    "content": " ".join(words),
+                    "score": rng.random()
+                })
+            research.add_search_results(query, results)
+        research.latest_summary = "总结" * 500
+    state.final_report = "# 报告\n\n" + "正文" * 5000
+    return state
+
+
+def measure(state: State, filepath: str, repeat: int, **save_kwargs) -> tuple:
+    """返回(文件大小, 平均保存耗时, 平均加载耗时, 平均延迟加载耗时)"""
+    save_times, load_times, lazy_times = [], [], []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        state.save_to_file(filepath, **save_kwargs)
+        save_times.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        loaded = State.load_from_file(filepath)
+        load_times.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        State.load_from_file(filepath, lazy=True).get_progress_summary()
+        lazy_times.append(time.perf_counter() - start)
+
+    assert loaded.to_dict() == state.to_dict(), "加载结果与原状态不一致"
+    return (os.path.getsize(filepath), sum(save_times) / repeat, sum(load_times) / repeat,
+            sum(lazy_times) / repeat)
+
+
+def peak_memory(fn) -> float:
+    """返回执行fn期间新分配内存的峰值（MB）"""
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1] / 1024 / 1024
+    finally:
+        tracemalloc.stop()
+
+
+def save_json_at_once(state: State, filepath: str):
+    """一次性生成完整JSON字符串再写入"""
+    with open(filepath, 'w', encoding='utf-8') as f:
+        f.write(state.to_json())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="状态序列化基准测试")
+    parser.add_argument("--paragraphs", type=int, default=5, help="段落数")
+    parser.add_argument("--searches", type=int, default=200, help="每个段落的搜索记录数")
+    parser.add_argument("--content-size", type=int, default=8000, help="每条搜索内容的字符数")
+    parser.add_argument("--repeat", type=int, default=3, help="重复次数")
+    args = parser.parse_args()
+
+    state = build_state(args.paragraphs, args.searches, args.content_size)
+    total_searches = sum(len(p.research.search_history) for p in state.paragraphs)
+    print(f"状态: {args.paragraphs} 个段落, {total_searches} 条搜索记录, 每条约 {args.content_size} 字符\n")
+
+    cases = [
+        ("json", ".json", {"format": "json"}),
+        ("binary", ".dsa", {"format": "binary"}),
+        ("binary+zlib", ".dsa", {"format": "binary", "compression": "zlib"}),
+        ("binary+lzma", ".dsa", {"format": "binary", "compression": "lzma"}),
+    ]
+
+    print(f"{'格式':<14}{'大小(MB)':>10}{'保存(ms)':>12}{'加载(ms)':>12}{'延迟加载(ms)':>14}")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for name, extension, kwargs in cases:
+            filepath = os.path.join(tmp_dir, f"state{extension}")
+            size, save_time, load_time, lazy_time = measure(state, filepath, args.repeat, **kwargs)
+            print(f"{name:<14}{size / 1024 / 1024:>10.2f}{save_time * 1000:>12.1f}"
+                  f"{load_time * 1000:>12.1f}{lazy_time * 1000:>14.1f}")
+
+        filepath = os.path.join(tmp_dir, "state.json")
+        at_once = peak_memory(lambda: save_json_at_once(state, filepath))
+        streaming = peak_memory(lambda: state.save_to_file(filepath, format="json"))
+        print(f"\nJSON保存峰值内存: 一次性 {at_once:.1f} MB, 流式 {streaming:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
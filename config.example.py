@@ -27,14 +27,94 @@ OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "your_openai_api_key_here")
 TAVILY_API_KEY = os.getenv("TAVILY_API_KEY", "your_tavily_api_key_here")
 
 # ===== 模型配置 =====
-DEFAULT_LLM_PROVIDER = "deepseek"  # deepseek 或 openai
+DEFAULT_LLM_PROVIDER = "deepseek"  # deepseek、openai 或 local
 DEEPSEEK_MODEL = "deepseek-chat"
 OPENAI_MODEL = "gpt-4o-mini"
 
+# ===== 本地模型（可选） =====
+# 任何OpenAI兼容的本地服务（vLLM、llama.cpp server、Ollama等），provider名称为 local
+LOCAL_BASE_URL = "http://localhost:8000/v1"
+# LOCAL_MODEL = "qwen2.5-7b-instruct"  # 不设置则使用服务端加载的第一个模型
+# LOCAL_FALLBACK_MODEL = "default"  # 不设置LOCAL_MODEL且服务端模型列表查询失败时使用的模型名称
+LOCAL_MAX_CONCURRENCY = 4  # 同时发往本地服务的最大请求数
+LOCAL_TIMEOUT = 300  # 本地CPU模型生成较慢，适当放宽超时
+# 同一进程内运行多个Agent时，把并发请求攒批后提交以提高吞吐
+LOCAL_BATCHING = False
+LOCAL_BATCH_MODE = "concurrent"  # concurrent 或 completions（一次请求提交多个提示词，需服务端支持，如vLLM）
+LOCAL_BATCH_SIZE = 16
+LOCAL_BATCH_WAIT_MS = 5
+
+# ===== 多提供商路由（可选） =====
+# 主提供商出错时依次故障转移到备用提供商
+# FALLBACK_LLM_PROVIDERS = ["openai"]
+# 主请求超过该秒数仍未返回时，向备用提供商发出对冲请求，取先返回的结果
+# HEDGE_AFTER_SECONDS = 8.0
+# 按节点指定提供商顺序
+# NODE_LLM_ROUTES = {"FirstSearchNode": ["openai", "deepseek"], "ReflectionNode": ["openai", "deepseek"]}
+
+# ===== 相同请求合并 =====
+# 同一进程内并发的完全相同的LLM请求只调用一次提供商，等待者共享结果
+# 开启后提供商、模型和密钥相同的Agent共用一个后端客户端，日志中的LLM用量为这些Agent的合计
+LLM_COALESCING = False
+# LLM_COALESCING_TIMEOUT = 120  # 等待相同请求的最长时间（秒）
+
+# ===== 分层模型（可选） =====
+# 搜索查询生成节点只输出很短的JSON，可使用更小更快的模型
+# QUERY_LLM_PROVIDER = "local"  # 在本地模型上生成搜索查询，免去公网往返
+# QUERY_MODEL = "qwen2.5-3b-instruct"
+# QUERY_MAX_TOKENS = 512
+# 总结和报告格式化节点的最大输出长度，不设置则使用节点默认值
+# SUMMARY_MAX_TOKENS = 4000
+
+# ===== 批处理模式（可选） =====
+# research_batch 查询批处理任务状态的间隔（秒）
+BATCH_POLL_INTERVAL = 60
+
+# ===== 搜索后端 =====
+SEARCH_BACKEND = "tavily"  # tavily、local（本地全文搜索，可离线使用）或 meta（并发查询多个后端并按URL合并）
+# META_SEARCH_BACKENDS = ["tavily", "local"]
+# SEARCH_DEADLINE = 15  # meta搜索的最长等待时间（秒），到时返回已到达的结果
+# LOCAL_SEARCH_PATHS = ["reports"]  # 本地搜索索引的文件或目录
+# LOCAL_SEARCH_DB = "reports/local_search.db"  # 不设置则使用内存数据库
+
+# ===== 搜索语义缓存 =====
+# 措辞不同但含义相近的查询（如"2026年 AI芯片 出口管制"和"AI芯片出口管制 2026"）直接复用已有的搜索结果
+# 只有内容词（实体、数字等）完全相同的查询才会命中，"美国GDP"和"中国GDP"不会互相命中；默认关闭
+SEARCH_CACHE_ENABLED = False
+SEARCH_CACHE_THRESHOLD = 0.88  # 余弦相似度阈值，越高越严格
+SEARCH_CACHE_TTL = 86400  # 缓存有效期（秒），None表示不过期
+# SEARCH_CACHE_FILE = "reports/search_cache.json"  # 设置后可在多次运行之间共享缓存
+
+# ===== 节点输出预算（可选） =====
+# 各节点已有默认的最大输出长度（查询生成512、总结2500、报告结构1500、格式化4000），可按节点覆盖
+# NODE_MAX_TOKENS = {"ReportFormattingNode": 8000}
+# 输出JSON的节点在闭合括号处停止生成，避免模型在JSON之后继续输出
+USE_STOP_SEQUENCES = True
+
 # ===== Agent 配置 =====
 MAX_REFLECTIONS = 2
+# 各段落的查询生成、搜索和总结按依赖关系并发执行，以下为同时进行的LLM调用数和搜索数（设为1则逐个执行）
+WORKFLOW_LLM_CONCURRENCY = 4
+WORKFLOW_SEARCH_CONCURRENCY = 4
 SEARCH_RESULTS_PER_QUERY = 3
 SEARCH_CONTENT_MAX_LENGTH = 20000
 OUTPUT_DIR = "reports"
 SAVE_INTERMEDIATE_STATES = True
+STATE_FORMAT = "json"  # json 或 binary（紧凑二进制格式，扩展名.dsa）
+# STATE_COMPRESSION = "zlib"  # 二进制格式的文本压缩方式：zlib 或 lzma
+# 记录各节点的输出，调整反思次数、分析角度等参数后重新研究时，输入未变化的节点和搜索直接复用上次的结果
+NODE_MEMO_ENABLED = False
+# NODE_MEMO_FILE = "reports/node_memo.json"  # 默认保存在输出目录中
+# 搜索结果会随时间变化，记录的搜索结果超过有效期（秒）后重新搜索；None表示一直复用第一次的结果
+NODE_MEMO_SEARCH_TTL = 86400
+NODE_MEMO_MAX_ENTRIES = 10000  # 超出时淘汰最久未使用的记录，记忆文件的大小因此有上限
+
 
+# ===== 日志配置 =====
+LOG_LEVEL = "INFO"     # DEBUG / INFO / WARNING / ERROR
+LOG_FORMAT = "text"    # text 或 json（便于日志系统采集）
+LOG_FILE = None        # 日志文件路径，None表示输出到stderr
+LOG_LEVELS = {         # 按子系统单独设置日志级别
+    "src.llms": "WARNING",
+    "src.tools": "WARNING",
+}
@@ -11,6 +11,7 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
 from src import DeepSearchAgent, Config
 from src.utils.config import print_config
+from src.utils.logger import setup_logging_from_config
 
 
 def advanced_example():
@@ -44,6 +45,7 @@ def advanced_example():
             return
         
         print_config(config)
+        setup_logging_from_config(config)
         
         # 创建Agent
         print("正在初始化Agent...")
@@ -11,6 +11,7 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
 from src import DeepSearchAgent, load_config
 from src.utils.config import print_config
+from src.utils.logger import setup_logging_from_config
 
 
 def basic_example():
@@ -24,6 +25,7 @@ def basic_example():
         print("正在加载配置...")
         config = load_config()
         print_config(config)
+        setup_logging_from_config(config)
         
         # 创建Agent
         print("正在初始化Agent...")
@@ -11,6 +11,7 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
 from src import DeepSearchAgent, load_config, Config
 from src.utils.config import print_config
+from src.utils.logger import setup_logging_from_config
 
 
 def future_simple_example():
@@ -29,6 +30,7 @@ def future_simple_example():
         config.analysis_angles = ["技术", "经济", "社会"]  # 从技术、经济、社会角度分析
         
         print_config(config)
+        setup_logging_from_config(config)
         
         # 创建Agent
         print("正在初始化Agent...")
@@ -5,14 +5,153 @@ Streamlit Web界面
 
 import os
 import sys
+import threading
+import time
+import uuid
+import queue
 import streamlit as st
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
 from datetime import datetime
+from typing import Dict, List, Optional
 import json
 
 # 添加src目录到Python路径
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
-from src import DeepSearchAgent, Config
+from src import DeepSearchAgent, Config, RunContext
+from src.utils.logger import setup_logging_from_config
+from src.events import (
+    EventBus,
+    StructureGenerated,
+    ParagraphStarted,
+    SearchStarted,
+    SummaryUpdated,
+    ReflectionDone,
+    ParagraphCompleted
+)
+
+
+# 前端轮询后台任务进度的间隔（秒）
+POLL_INTERVAL = 1.0
+
+# 后台执行研究任务的最大线程数
+MAX_RESEARCH_WORKERS = 4
+
+# 已结束但会话一直没有取走结果的任务（如页面已关闭）在任务表中保留的时间（秒）
+FINISHED_JOB_TTL = 3600.0
+
+
+@dataclass
+class ResearchJob:
+    """后台研究任务，由工作线程写入进度事件，由页面轮询读取"""
+    query: str
+    agent: DeepSearchAgent
+    run: RunContext
+    events: "queue.Queue" = field(default_factory=queue.Queue)
+    future: Optional[Future] = None
+    progress: int = 0
+    status: str = "排队中..."
+    logs: List[str] = field(default_factory=list)
+    final_report: Optional[str] = None
+    error: Optional[str] = None
+    finished_at: Optional[float] = None
+    
+    def emit(self, progress: Optional[int], status: str):
+        """
+        在工作线程中推送进度事件（不能在工作线程中调用st.*）
+        
+        Args:
+            progress: 新的进度，None表示只更新状态文字、进度不变
+            status: 状态文字
+        """
+        self.events.put((progress, status))
+    
+    def poll(self):
+        """在页面脚本中取出所有未处理的进度事件"""
+        while True:
+            try:
+                progress, status = self.events.get_nowait()
+            except queue.Empty:
+                break
+            if progress is not None:
+                self.progress = progress
+            self.status = status
+            self.logs.append(status)
+    
+    @property
+    def done(self) -> bool:
+        """任务是否已结束"""
+        return self.future is not None and self.future.done()
+
+
+@st.cache_resource
+def init_logging():
+    """进程启动时配置一次日志输出，存在config.py时使用其中的日志配置（API密钥在页面中填写）"""
+    setup_logging_from_config(Config.from_file("config.py") if os.path.exists("config.py") else Config())
+
+
+@st.cache_resource
+def get_executor() -> ThreadPoolExecutor:
+    """获取进程内共享的后台线程池"""
+    return ThreadPoolExecutor(max_workers=MAX_RESEARCH_WORKERS, thread_name_prefix="research")
+
+
+@st.cache_resource
+def get_job_registry() -> Dict[str, ResearchJob]:
+    """
+    获取按会话ID索引的后台任务表
+    
+    表中只保存正在运行和尚未展示结果的任务：任务结束后，其所属会话下次渲染时把任务移到
+    st.session_state，随会话一起释放；没有会话取走的已结束任务在FINISHED_JOB_TTL后清理。
+    """
+    return {}
+
+
+def prune_job_registry(registry: Dict[str, ResearchJob]):
+    """清理结束超过FINISHED_JOB_TTL仍无人取走的任务"""
+    now = time.monotonic()
+    for session_id, job in list(registry.items()):
+        if job.done and job.finished_at is not None and now - job.finished_at > FINISHED_JOB_TTL:
+            registry.pop(session_id, None)
+
+
+def get_current_job() -> Optional[ResearchJob]:
+    """
+    获取当前会话的任务
+    
+    已结束的任务从进程共享的任务表移到当前会话中，页面重跑时仍可展示结果。
+    """
+    session_id = get_session_id()
+    registry = get_job_registry()
+    job = registry.get(session_id)
+    if job is None:
+        return st.session_state.get("research_job")
+    
+    if job.done:
+        registry.pop(session_id, None)
+        st.session_state.research_job = job
+    return job
+
+
+@st.cache_resource(max_entries=32)
+def get_agent(config_items: tuple) -> DeepSearchAgent:
+    """
+    获取缓存的Agent，配置相同的会话共用同一个Agent及其LLM和搜索客户端
+    
+    每次研究的参数和状态保存在各自的RunContext中，多个会话可以同时在同一个Agent上执行研究。
+    
+    Args:
+        config_items: 配置项元组（需可哈希）
+    """
+    return DeepSearchAgent(Config(**dict(config_items)))
+
+
+def get_session_id() -> str:
+    """获取当前浏览器会话的ID"""
+    if "session_id" not in st.session_state:
+        st.session_state.session_id = uuid.uuid4().hex
+    return st.session_state.session_id
 
 
 def main():
@@ -22,6 +161,7 @@ def main():
         page_icon="🔮",
         layout="wide"
     )
+    init_logging()
     
     st.title("🔮 未来简事")
     st.markdown("**智能未来趋势预测与分析工具** - 通过多轮搜索和反思，帮你了解未来可能发生的事情")
@@ -100,8 +240,9 @@ def main():
     
     with col2:
         st.header("状态信息")
-        if 'agent' in st.session_state and hasattr(st.session_state.agent, 'state'):
-            progress = st.session_state.agent.get_progress_summary()
+        job = get_current_job()
+        if job is not None:
+            progress = job.run.state.get_progress_summary()
             st.metric("总段落数", progress['total_paragraphs'])
             st.metric("已完成", progress['completed_paragraphs'])
             st.progress(progress['progress_percentage'] / 100)
@@ -131,82 +272,131 @@ def main():
             st.error("请提供OpenAI API Key")
             return
         
-        # 创建配置
-        config = Config(
-            deepseek_api_key=deepseek_key if llm_provider == "deepseek" else None,
-            openai_api_key=openai_key if llm_provider == "openai" else None,
-            tavily_api_key=tavily_key,
-            default_llm_provider=llm_provider,
-            deepseek_model=model_name if llm_provider == "deepseek" else "deepseek-chat",
-            openai_model=model_name if llm_provider == "openai" else "gpt-4o-mini",
-            max_reflections=max_reflections,
-            max_search_results=max_search_results,
-            max_content_length=max_content_length,
-            output_dir="streamlit_reports",
-            time_horizon=time_horizon,
-            analysis_angles=analysis_angles if analysis_angles else None
+        # 创建配置（元组形式，作为Agent缓存的键）
+        config_items = (
+            ("deepseek_api_key", deepseek_key if llm_provider == "deepseek" else None),
+            ("openai_api_key", openai_key if llm_provider == "openai" else None),
+            ("tavily_api_key", tavily_key),
+            ("default_llm_provider", llm_provider),
+            ("deepseek_model", model_name if llm_provider == "deepseek" else "deepseek-chat"),
+            ("openai_model", model_name if llm_provider == "openai" else "gpt-4o-mini"),
+            ("max_reflections", max_reflections),
+            ("max_search_results", max_search_results),
+            ("max_content_length", max_content_length),
+            ("output_dir", "streamlit_reports")
         )
         
-        # 执行研究
-        execute_research(query, config)
+        # 提交后台研究任务，时间范围和分析角度只作用于本次研究
+        submit_research(query, config_items, time_horizon, analysis_angles)
+    
+    # 展示当前会话的任务进度或结果
+    render_job()
 
 
-def execute_research(query: str, config: Config):
-    """执行研究"""
+def submit_research(query: str, config_items: tuple, time_horizon: str, analysis_angles: List[str]):
+    """提交后台研究任务"""
+    current_job = get_current_job()
+    if current_job is not None and not current_job.done:
+        st.warning("已有研究任务正在进行，请等待完成")
+        return
+    
     try:
-        # 创建进度条
-        progress_bar = st.progress(0)
-        status_text = st.empty()
-        
-        # 初始化Agent
-        status_text.text("正在初始化Agent...")
-        agent = DeepSearchAgent(config)
-        st.session_state.agent = agent
-        
-        progress_bar.progress(10)
-        
-        # 生成报告结构
-        status_text.text("正在生成报告结构...")
-        agent._generate_report_structure(query)
-        progress_bar.progress(20)
-        
-        # 处理段落
-        total_paragraphs = len(agent.state.paragraphs)
-        for i in range(total_paragraphs):
-            status_text.text(f"正在处理段落 {i+1}/{total_paragraphs}: {agent.state.paragraphs[i].title}")
-            
-            # 初始搜索和总结
-            agent._initial_search_and_summary(i)
-            progress_value = 20 + (i + 0.5) / total_paragraphs * 60
-            progress_bar.progress(int(progress_value))
-            
-            # 反思循环
-            agent._reflection_loop(i)
-            agent.state.paragraphs[i].research.mark_completed()
-            
-            progress_value = 20 + (i + 1) / total_paragraphs * 60
-            progress_bar.progress(int(progress_value))
-        
-        # 生成最终报告
-        status_text.text("正在生成最终报告...")
-        final_report = agent._generate_final_report()
-        progress_bar.progress(90)
-        
-        # 保存报告
-        status_text.text("正在保存报告...")
-        agent._save_report(final_report)
-        progress_bar.progress(100)
-        
-        status_text.text("研究完成！")
-        
-        # 显示结果
-        display_results(agent, final_report)
-        
+        agent = get_agent(config_items)
+    except Exception as e:
+        st.error(f"Agent初始化失败: {str(e)}")
+        return
+    
+    # 每个任务使用自己的事件总线，共享Agent上的其他研究不会推送到这里
+    run = agent.create_run(query, time_horizon=time_horizon, analysis_angles=analysis_angles or None,
+                           event_bus=EventBus())
+    job = ResearchJob(query=query, agent=agent, run=run)
+    job.future = get_executor().submit(execute_research, job)
+    
+    registry = get_job_registry()
+    prune_job_registry(registry)
+    st.session_state.pop("research_job", None)
+    registry[get_session_id()] = job
+
+
+def render_job():
+    """轮询并展示当前会话的后台任务"""
+    job = get_current_job()
+    if job is None:
+        return
+    
+    job.poll()
+    
+    st.progress(job.progress)
+    st.text(job.status)
+    with st.expander("执行日志", expanded=False):
+        st.text("\n".join(job.logs))
+    
+    if not job.done:
+        # 任务仍在运行，稍后重跑脚本以刷新进度
+        time.sleep(POLL_INTERVAL)
+        st.rerun()
+    elif job.error:
+        st.error(f"研究过程中发生错误: {job.error}")
+    elif job.final_report is not None:
+        display_results(job.run, job.final_report)
+
+
+def execute_research(job: ResearchJob):
+    """在后台线程中执行研究（只通过job推送进度，不访问st.*）"""
+    # 进度只由事件数据计算：段落并发处理，按收到的段落完成事件数计算进度。
+    # 完成事件可能在多个线程中同时到达，计数和推送在同一把锁内进行，保证队列中的进度单调递增
+    completed = set()
+    completed_lock = threading.Lock()
+    
+    def on_structure(event: StructureGenerated):
+        job.emit(20, f"报告结构已生成，共 {len(event.titles)} 个段落")
+    
+    def on_paragraph_started(event: ParagraphStarted):
+        job.emit(None, f"正在处理段落 {event.paragraph_index + 1}/{event.total_paragraphs}: {event.title}")
+    
+    def on_search_started(event: SearchStarted):
+        job.emit(None, f"段落 {event.paragraph_index + 1} 搜索: {event.search_query}")
+    
+    def on_summary_updated(event: SummaryUpdated):
+        if event.reflection_iteration is None:
+            job.emit(None, f"段落 {event.paragraph_index + 1} 初始总结完成，开始反思")
+    
+    def on_reflection_done(event: ReflectionDone):
+        job.emit(None, f"段落 {event.paragraph_index + 1} 反思 "
+                       f"{event.reflection_iteration + 1}/{event.max_reflections} 完成")
+    
+    def on_paragraph_completed(event: ParagraphCompleted):
+        with completed_lock:
+            completed.add(event.paragraph_index)
+            progress = int(20 + len(completed) / max(event.total_paragraphs, 1) * 60)
+            job.emit(progress, f"段落 {event.paragraph_index + 1}/{event.total_paragraphs} 处理完成")
+            if len(completed) == event.total_paragraphs:
+                job.emit(80, "正在生成最终报告...")
+    
+    handlers = [
+        (StructureGenerated, on_structure),
+        (ParagraphStarted, on_paragraph_started),
+        (SearchStarted, on_search_started),
+        (SummaryUpdated, on_summary_updated),
+        (ReflectionDone, on_reflection_done),
+        (ParagraphCompleted, on_paragraph_completed)
+    ]
+    unsubscribers = [job.run.events.subscribe(event_type, handler) for event_type, handler in handlers]
+    
+    try:
+        job.emit(10, "正在生成报告结构...")
+        job.final_report = job.agent.execute_run(job.run, save_report=True).final_report
+        job.emit(100, "研究完成！")
     except Exception as e:
-        st.error(f"研究过程中发生错误: {str(e)}")
+        job.error = str(e)
+        job.emit(None, f"研究失败: {str(e)}")
+    finally:
+        for unsubscribe in unsubscribers:
+            unsubscribe()
+        job.finished_at = time.monotonic()
 
 
-def display_results(agent: DeepSearchAgent, final_report: str):
+def display_results(run: RunContext, final_report: str):
     """显示研究结果"""
     st.header("📊 预测结果")
     
@@ -219,7 +409,7 @@ def display_results(agent: DeepSearchAgent, final_report: str):
     with tab2:
         # 段落详情
         st.subheader("段落详情")
-        for i, paragraph in enumerate(agent.state.paragraphs):
+        for i, paragraph in enumerate(run.state.paragraphs):
             with st.expander(f"段落 {i+1}: {paragraph.title}"):
                 st.write("**预期内容:**", paragraph.content)
                 st.write("**最终内容:**", paragraph.research.latest_summary[:300] + "..." 
@@ -231,7 +421,7 @@ def display_results(agent: DeepSearchAgent, final_report: str):
         # 搜索历史
         st.subheader("搜索历史")
         all_searches = []
-        for paragraph in agent.state.paragraphs:
+        for paragraph in run.state.paragraphs:
             all_searches.extend(paragraph.research.search_history)
         
         if all_searches:
@@ -256,7 +446,7 @@ def display_results(agent: DeepSearchAgent, final_report: str):
         )
         
         # JSON状态下载
-        state_json = agent.state.to_json()
+        state_json = run.state.to_json()
         st.download_button(
             label="下载状态文件",
             data=state_json,
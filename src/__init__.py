@@ -3,10 +3,40 @@ Deep Search Agent
 一个无框架的深度搜索AI代理实现
 """
 
-from .agent import DeepSearchAgent, create_agent
-from .utils.config import Config, load_config
+import importlib
+from typing import TYPE_CHECKING, Any, List
 
 __version__ = "1.0.0"
 __author__ = "Deep Search Agent Team"
 
-__all__ = ["DeepSearchAgent", "create_agent", "Config", "load_config"]
+__all__ = ["DeepSearchAgent", "create_agent", "RunContext", "EventBus", "Config", "load_config"]
+
+# 公开名称到所在模块的映射，首次访问时才导入，`from src import Config`不会加载Agent和各个节点
+_LAZY_ATTRIBUTES = {
+    "DeepSearchAgent": ".agent",
+    "create_agent": ".agent",
+    "RunContext": ".run_context",
+    "EventBus": ".events",
+    "Config": ".utils.config",
+    "load_config": ".utils.config",
+}
+
+if TYPE_CHECKING:
+    from .agent import DeepSearchAgent, create_agent
+    from .run_context import RunContext
+    from .events import EventBus
+    from .utils.config import Config, load_config
+
+
+def __getattr__(name: str) -> Any:
+    module_name = _LAZY_ATTRIBUTES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    # 缓存到模块字典，之后的访问不再经过__getattr__
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(__all__))
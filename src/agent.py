@@ -3,12 +3,28 @@ Deep Search Agent主类
 整合所有模块，实现完整的深度搜索流程
 """
 
+import hashlib
 import json
+import logging
 import os
 from datetime import datetime
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Tuple
 
-from .llms import DeepSeekLLM, OpenAILLM, BaseLLM
+from .batch import BatchBackend, BatchResearchRunner, LocalFileBatchBackend
+from .events import (
+    EventBus,
+    ResearchStarted,
+    StructureGenerated,
+    ParagraphStarted,
+    SearchStarted,
+    SearchFinished,
+    SummaryUpdated,
+    ReflectionDone,
+    ParagraphCompleted,
+    ReportReady,
+    ResearchFailed
+)
+from .llms import DeepSeekLLM, OpenAILLM, LocalLLM, BaseLLM, RoutingLLM, BatchingLLM, CoalescingLLM, MemoizedLLM
 from .nodes import (
     ReportStructureNode,
     FirstSearchNode, 
@@ -17,64 +33,298 @@ from .nodes import (
     ReflectionSummaryNode,
     ReportFormattingNode
 )
-from .state import State
-from .tools import tavily_search
-from .utils import Config, load_config, format_search_results_for_prompt
+from .run_context import ResearchNodes, RunContext
+from .state import State, Research, BINARY_STATE_EXTENSION
+from .tools import BaseSearch, SemanticSearchCache, search_registry
+from .utils import (
+    Config, load_config, format_search_results_for_prompt, normalize_search_query, SingleFlight, MemoStore
+)
+from .workflow import Workflow, WorkflowScheduler
+
+logger = logging.getLogger(__name__)
+
+# 查询生成模型在RoutingLLM中的提供商名称
+QUERY_LLM_ROUTE = "query"
+
+# 使用查询生成模型的节点
+QUERY_NODE_NAMES = ("FirstSearchNode", "ReflectionNode")
 
 
 class DeepSearchAgent:
-    """Deep Search Agent主类"""
+    """
+    Deep Search Agent主类
+    
+    Agent只持有配置、LLM客户端、搜索后端和默认节点，每次研究的参数和状态保存在RunContext中，
+    研究过程中不修改Agent，因此一个Agent（及其共享的客户端）可以在多个线程中同时执行研究。
+    """
     
-    def __init__(self, config: Optional[Config] = None):
+    # 进程内所有Agent共享，规范化后相同的并发搜索只发出一次请求
+    _search_flight = SingleFlight()
+    
+    def __init__(self, config: Optional[Config] = None, event_bus: Optional[EventBus] = None):
         """
         初始化Deep Search Agent
         
         Args:
             config: 配置对象，如果不提供则自动加载
+            event_bus: 进度事件总线，如果不提供则创建新的事件总线
         """
         # 加载配置
         self.config = config or load_config()
         
+        # 进度事件总线
+        self.events = event_bus or EventBus()
+        
         # 初始化LLM客户端
         self.llm_client = self._initialize_llm()
         
+        # 搜索后端
+        self.search_backend = self._initialize_search()
+        
+        # 搜索语义缓存，在多次研究之间共享
+        self.search_cache = self._initialize_search_cache()
+        
+        # 节点输出记忆，在多次研究之间共享并持久化
+        self.node_memo = self._initialize_node_memo()
+        
         # 初始化节点
         self._initialize_nodes()
         
-        # 状态
+        # research()最近一次开始的研究（或load_state加载）的状态，供get_progress_summary、save_state等使用；
+        # run_research/execute_run不修改它，并发研究应使用各自RunContext的state
         self.state = State()
         
         # 确保输出目录存在
         os.makedirs(self.config.output_dir, exist_ok=True)
         
-        print(f"Deep Search Agent 已初始化")
-        print(f"使用LLM: {self.llm_client.get_model_info()}")
+        logger.info("Deep Search Agent 已初始化，使用LLM: %s", self.llm_client.get_model_info())
+    
+    def _initialize_search(self) -> BaseSearch:
+        """初始化搜索后端，meta后端并发查询多个后端"""
+        if self.config.search_backend == "meta":
+            return search_registry.create(
+                "meta",
+                backends=[self._create_search_backend(name) for name in self.config.get_search_backends()],
+                deadline=self.config.search_deadline
+            )
+        return self._create_search_backend(self.config.search_backend)
+    
+    def _create_search_backend(self, name: str) -> BaseSearch:
+        """
+        创建单个搜索后端
+        
+        Args:
+            name: 注册表中的后端名称
+        """
+        if name == "tavily":
+            return search_registry.create("tavily", api_key=self.config.tavily_api_key)
+        elif name == "local":
+            return search_registry.create(
+                "local",
+                db_path=self.config.local_search_db or ":memory:",
+                paths=self.config.local_search_paths
+            )
+        # 通过search_registry注册的自定义后端
+        return search_registry.create(name)
+    
+    def _initialize_search_cache(self) -> Optional[SemanticSearchCache]:
+        """初始化搜索语义缓存，未启用时返回None"""
+        if not self.config.search_cache_enabled:
+            return None
+        return SemanticSearchCache(
+            threshold=self.config.search_cache_threshold,
+            max_entries=self.config.search_cache_max_entries,
+            ttl=self.config.search_cache_ttl,
+            persist_path=self.config.search_cache_file
+        )
+    
+    def _initialize_node_memo(self) -> Optional[MemoStore]:
+        """初始化节点输出记忆，未启用时返回None"""
+        if not self.config.node_memo_enabled:
+            return None
+        return MemoStore(persist_path=self.config.get_node_memo_file(),
+                         max_entries=self.config.node_memo_max_entries)
     
     def _initialize_llm(self) -> BaseLLM:
-        """初始化LLM客户端"""
-        if self.config.default_llm_provider == "deepseek":
+        """
+        初始化LLM客户端，配置了备用提供商、节点路由或查询生成模型时返回RoutingLLM
+        
+        查询生成模型作为名为query的提供商加入路由，查询生成节点的路由以它开头，
+        之后是该节点原有的路由（节点路由或默认路由），因此仍可故障转移和对冲到其他提供商。
+        """
+        default_route = [self.config.default_llm_provider] + [
+            provider for provider in (self.config.fallback_llm_providers or [])
+            if provider != self.config.default_llm_provider
+        ]
+        routes = dict(self.config.node_llm_routes or {})
+        providers = list(dict.fromkeys(
+            default_route + [name for route in routes.values() for name in route if name != QUERY_LLM_ROUTE]
+        ))
+        if len(providers) == 1 and not self._has_query_llm():
+            return self._create_provider_llm(providers[0])
+        
+        clients = {provider: self._create_provider_llm(provider) for provider in providers}
+        
+        if self._has_query_llm():
+            clients[QUERY_LLM_ROUTE] = self._create_provider_llm(
+                self.config.query_llm_provider or self.config.default_llm_provider,
+                model_name=self.config.query_model
+            )
+            for node_name in QUERY_NODE_NAMES:
+                route = routes.get(node_name, default_route)
+                routes[node_name] = [QUERY_LLM_ROUTE] + [name for name in route if name != QUERY_LLM_ROUTE]
+        
+        return RoutingLLM(
+            providers=clients,
+            default_route=default_route,
+            routes=routes,
+            hedge_after=self.config.hedge_after_seconds
+        )
+    
+    def _has_query_llm(self) -> bool:
+        """是否为查询生成节点单独配置了提供商或模型"""
+        return bool(self.config.query_llm_provider or self.config.query_model)
+    
+    def _query_model_name(self) -> Optional[str]:
+        """查询生成节点使用的模型名称，未单独配置时返回None"""
+        if not self._has_query_llm():
+            return None
+        client = self.llm_client.providers[QUERY_LLM_ROUTE]
+        return getattr(client, "default_model", None) or client.model_name
+    
+    def _create_provider_llm(self, provider: str, model_name: Optional[str] = None) -> BaseLLM:
+        """
+        创建单个提供商的LLM客户端，启用请求合并时返回进程内共享的CoalescingLLM
+        
+        Args:
+            provider: 提供商名称
+            model_name: 模型名称，不提供则使用配置中该提供商的模型
+        """
+        if not self.config.llm_coalescing:
+            return self._build_provider_llm(provider, model_name)
+        
+        # 同一进程内提供商、模型和密钥相同的Agent共用一个合并器，并发的相同请求才能共享一次调用
+        if provider == "deepseek":
+            key = (provider, model_name or self.config.deepseek_model, self.config.deepseek_api_key)
+        elif provider == "openai":
+            key = (provider, model_name or self.config.openai_model, self.config.openai_api_key)
+        else:
+            key = (provider, model_name or self.config.local_model, self.config.local_base_url)
+        
+        return CoalescingLLM.shared(
+            key=key,
+            factory=lambda: self._build_provider_llm(provider, model_name),
+            wait_timeout=self.config.llm_coalescing_timeout
+        )
+    
+    def _build_provider_llm(self, provider: str, model_name: Optional[str] = None) -> BaseLLM:
+        """
+        构造单个提供商的LLM客户端
+        
+        Args:
+            provider: 提供商名称
+            model_name: 模型名称，不提供则使用配置中该提供商的模型
+        """
+        if provider == "deepseek":
             return DeepSeekLLM(
                 api_key=self.config.deepseek_api_key,
-                model_name=self.config.deepseek_model
+                model_name=model_name or self.config.deepseek_model
             )
-        elif self.config.default_llm_provider == "openai":
+        elif provider == "openai":
             return OpenAILLM(
                 api_key=self.config.openai_api_key,
-                model_name=self.config.openai_model
+                model_name=model_name or self.config.openai_model
+            )
+        elif provider == "local":
+            model_name = model_name or self.config.local_model
+            
+            def create_local_llm() -> LocalLLM:
+                return LocalLLM(
+                    base_url=self.config.local_base_url,
+                    model_name=model_name,
+                    api_key=self.config.local_api_key,
+                    max_concurrency=self.config.local_max_concurrency,
+                    timeout=self.config.local_timeout,
+                    batch_mode=self.config.local_batch_mode,
+                    fallback_model=self.config.local_fallback_model
+                )
+            
+            if not self.config.local_batching:
+                return create_local_llm()
+            
+            # 同一进程内的所有Agent共用一个批处理器，并发请求才能攒到同一批
+            return BatchingLLM.shared(
+                key=(self.config.local_base_url, model_name, self.config.local_batch_mode),
+                factory=create_local_llm,
+                max_batch_size=self.config.local_batch_size,
+                max_wait_ms=self.config.local_batch_wait_ms
             )
         else:
-            raise ValueError(f"不支持的LLM提供商: {self.config.default_llm_provider}")
+            raise ValueError(f"不支持的LLM提供商: {provider}")
     
     def _initialize_nodes(self):
-        """初始化处理节点"""
-        # 获取时间范围（未来简事专用）
-        time_horizon = getattr(self.config, 'time_horizon', None)
+        """按配置中的时间范围初始化默认处理节点"""
+        nodes = self._create_nodes(getattr(self.config, 'time_horizon', None))
+        self.first_search_node = nodes.first_search_node
+        self.reflection_node = nodes.reflection_node
+        self.first_summary_node = nodes.first_summary_node
+        self.reflection_summary_node = nodes.reflection_summary_node
+        self.report_formatting_node = nodes.report_formatting_node
+    
+    def _create_nodes(self, time_horizon: Optional[str], memo: Optional[MemoStore] = None) -> ResearchNodes:
+        """
+        创建一组处理节点
         
-        self.first_search_node = FirstSearchNode(self.llm_client, time_horizon=time_horizon)
-        self.reflection_node = ReflectionNode(self.llm_client, time_horizon=time_horizon)
-        self.first_summary_node = FirstSummaryNode(self.llm_client, time_horizon=time_horizon)
-        self.reflection_summary_node = ReflectionSummaryNode(self.llm_client, time_horizon=time_horizon)
-        self.report_formatting_node = ReportFormattingNode(self.llm_client, time_horizon=time_horizon)
+        Args:
+            time_horizon: 时间范围（未来简事专用）
+            memo: 节点输出记忆，提供时节点通过MemoizedLLM调用LLM
+        """
+        # 查询生成节点只输出很短的JSON，使用较小的输出长度；单独配置的查询生成模型由路由按节点名选择
+        query_max_tokens = self.config.query_max_tokens
+        summary_max_tokens = self.config.summary_max_tokens
+        llm_client = self._memoize_llm(self.llm_client, memo)
+        
+        return ResearchNodes(
+            first_search_node=self._configure_node(FirstSearchNode(
+                llm_client, time_horizon=time_horizon, max_tokens=query_max_tokens
+            )),
+            reflection_node=self._configure_node(ReflectionNode(
+                llm_client, time_horizon=time_horizon, max_tokens=query_max_tokens
+            )),
+            first_summary_node=self._configure_node(FirstSummaryNode(
+                llm_client, time_horizon=time_horizon, max_tokens=summary_max_tokens
+            )),
+            reflection_summary_node=self._configure_node(ReflectionSummaryNode(
+                llm_client, time_horizon=time_horizon, max_tokens=summary_max_tokens
+            )),
+            report_formatting_node=self._configure_node(ReportFormattingNode(
+                llm_client, time_horizon=time_horizon, max_tokens=summary_max_tokens
+            ))
+        )
+    
+    @staticmethod
+    def _memoize_llm(llm_client: BaseLLM, memo: Optional[MemoStore]) -> BaseLLM:
+        """提供记忆表时用MemoizedLLM包装客户端"""
+        return MemoizedLLM(llm_client, memo) if memo is not None else llm_client
+    
+    def _default_nodes(self) -> ResearchNodes:
+        """当前的默认节点（节点本身无状态，可在多个研究之间共享）"""
+        return ResearchNodes(
+            first_search_node=self.first_search_node,
+            reflection_node=self.reflection_node,
+            first_summary_node=self.first_summary_node,
+            reflection_summary_node=self.reflection_summary_node,
+            report_formatting_node=self.report_formatting_node
+        )
+    
+    def _configure_node(self, node):
+        """应用配置中按节点覆盖的输出长度和停止序列设置"""
+        node_max_tokens = (self.config.node_max_tokens or {}).get(node.node_name)
+        if node_max_tokens is not None:
+            node.max_tokens = node_max_tokens
+        if not self.config.use_stop_sequences:
+            node.stop_sequences = None
+        return node
     
     def research(self, query: str, save_report: bool = True, 
                  time_horizon: str = None, analysis_angles: list = None) -> str:
@@ -84,137 +334,462 @@ class DeepSearchAgent:
         Args:
             query: 研究查询
             save_report: 是否保存报告到文件
-            time_horizon: 时间范围（如"3个月"、"1年"等），如果提供则覆盖配置
-            analysis_angles: 分析角度列表（如["技术", "经济"]），如果提供则覆盖配置
+            time_horizon: 时间范围（如"3个月"、"1年"等），如果提供则覆盖配置（只对本次研究有效）
+            analysis_angles: 分析角度列表（如["技术", "经济"]），如果提供则覆盖配置（只对本次研究有效）
             
         Returns:
             最终报告内容
+        
+        注意：本方法会把Agent的state替换为本次研究的状态，供get_progress_summary、save_state使用；
+        多个线程同时调用时state只反映最后开始的那次研究，并发研究请使用run_research并读取ctx.state
+        """
+        ctx = self.create_run(query, time_horizon=time_horizon, analysis_angles=analysis_angles)
+        self.state = ctx.state
+        return self.execute_run(ctx, save_report=save_report).final_report
+    
+    def create_run(self, query: str, time_horizon: Optional[str] = None,
+                   analysis_angles: Optional[List[str]] = None,
+                   event_bus: Optional[EventBus] = None) -> RunContext:
         """
-        # 如果提供了参数，更新配置
-        if time_horizon:
-            self.config.time_horizon = time_horizon
-        if analysis_angles:
-            self.config.analysis_angles = analysis_angles
+        创建一次研究的运行上下文
         
-        # 重新初始化节点以使用新的配置
-        if time_horizon or analysis_angles:
-            self._initialize_nodes()
+        Args:
+            query: 研究查询
+            time_horizon: 时间范围，不提供则使用配置
+            analysis_angles: 分析角度列表，不提供则使用配置
+            event_bus: 本次研究的事件总线，不提供则使用Agent的事件总线
+            
+        Returns:
+            运行上下文
+        """
+        time_horizon = time_horizon or self.config.time_horizon
+        analysis_angles = analysis_angles or self.config.analysis_angles
         
-        print(f"\n{'='*60}")
-        if self.config.time_horizon:
-            print(f"未来简事 - 时间范围: {self.config.time_horizon}")
-            if self.config.analysis_angles:
-                print(f"分析角度: {', '.join(self.config.analysis_angles)}")
-        print(f"开始深度研究: {query}")
-        print(f"{'='*60}")
+        # 时间范围与配置相同且不记忆节点输出时共用默认节点，否则为本次研究单独创建节点
+        if time_horizon == self.config.time_horizon and self.node_memo is None:
+            nodes = self._default_nodes()
+        else:
+            nodes = self._create_nodes(time_horizon, memo=self.node_memo)
         
-        try:
-            # Step 1: 生成报告结构
-            self._generate_report_structure(query)
+        return RunContext(
+            query=query,
+            time_horizon=time_horizon,
+            analysis_angles=analysis_angles,
+            nodes=nodes,
+            events=event_bus or self.events,
+            memo=self.node_memo
+        )
+    
+    def run_research(self, query: str, save_report: bool = True, time_horizon: Optional[str] = None,
+                     analysis_angles: Optional[List[str]] = None,
+                     event_bus: Optional[EventBus] = None) -> RunContext:
+        """
+        执行深度研究并返回运行上下文，可在多个线程中对同一个Agent并发调用
+        
+        Args:
+            query: 研究查询
+            save_report: 是否保存报告到文件
+            time_horizon: 时间范围，如果提供则覆盖配置（只对本次研究有效）
+            analysis_angles: 分析角度列表，如果提供则覆盖配置（只对本次研究有效）
+            event_bus: 本次研究的事件总线，不提供则使用Agent的事件总线
             
-            # Step 2: 处理每个段落
-            self._process_paragraphs()
+        Returns:
+            运行上下文，包含本次研究的状态、最终报告和报告文件路径
+        """
+        ctx = self.create_run(query, time_horizon=time_horizon, analysis_angles=analysis_angles,
+                              event_bus=event_bus)
+        return self.execute_run(ctx, save_report=save_report)
+    
+    def execute_run(self, ctx: RunContext, save_report: bool = True, refresh: bool = False) -> RunContext:
+        """
+        执行create_run创建的研究，可在多个线程中对同一个Agent并发调用
+        
+        Args:
+            ctx: 运行上下文
+            save_report: 是否保存报告到文件
+            refresh: 是否以刷新模式执行，ctx.state为上次研究的状态，只重新研究证据有变化的段落
             
-            # Step 3: 生成最终报告
-            final_report = self._generate_final_report()
+        Returns:
+            传入的运行上下文，包含本次研究的状态、最终报告和报告文件路径
+        """
+        query = ctx.query
+        if ctx.time_horizon:
+            logger.info("未来简事 - 时间范围: %s，分析角度: %s", ctx.time_horizon,
+                        ", ".join(ctx.analysis_angles or []) or "未指定")
+        logger.info("开始%s [%s]: %s", "刷新研究" if refresh else "深度研究", ctx.run_id, query)
+        
+        ctx.events.emit(ResearchStarted(
+            query=query,
+            time_horizon=ctx.time_horizon,
+            analysis_angles=ctx.analysis_angles
+        ))
+        
+        try:
+            # Step 1-3: 按工作流生成报告结构、处理各段落并生成最终报告
+            if refresh:
+                final_report = self._refresh(ctx)
+            else:
+                final_report = self._create_scheduler().run(self._build_workflow(ctx))["final_report"]
             
             # Step 4: 保存报告
             if save_report:
-                self._save_report(final_report)
+                ctx.report_path = self._save_report(final_report, ctx.state)
+            
+            ctx.events.emit(ReportReady(report=final_report, filepath=ctx.report_path))
             
-            print(f"\n{'='*60}")
-            print("深度研究完成！")
-            print(f"{'='*60}")
+            logger.info("深度研究完成 [%s]: %s", ctx.run_id, query)
+            # 累计用量：不开启请求合并时为本Agent的合计，开启时为共用同一后端的所有Agent的合计
+            logger.info("LLM累计用量: %s", self.llm_client.get_usage_stats())
+            if isinstance(self.llm_client, RoutingLLM):
+                logger.info("LLM路由指标: %s", self.llm_client.get_metrics())
+            if self.search_cache is not None:
+                logger.info("搜索缓存: %s", self.search_cache.get_stats())
+            if ctx.memo is not None:
+                logger.info("节点输出记忆: %s", ctx.memo.get_stats())
             
-            return final_report
+            return ctx
             
         except Exception as e:
-            print(f"研究过程中发生错误: {str(e)}")
+            logger.error("研究过程中发生错误 [%s]: %s", ctx.run_id, e)
+            ctx.events.emit(ResearchFailed(query=query, error=str(e)))
             raise e
+        
+        finally:
+            # 失败时也保存已完成节点的输出，重试时可以直接复用
+            if ctx.memo is not None:
+                ctx.memo.save()
+            if self.search_cache is not None:
+                self.search_cache.flush()
     
-    def _generate_report_structure(self, query: str):
-        """生成报告结构"""
-        print(f"\n[步骤 1] 生成报告结构...")
+    def refresh_research(self, state_file: str, save_report: bool = True, time_horizon: Optional[str] = None,
+                         analysis_angles: Optional[List[str]] = None,
+                         event_bus: Optional[EventBus] = None) -> RunContext:
+        """
+        刷新上次的研究：重新执行每个段落记录的搜索查询，只重新研究搜索结果有变化的段落
         
-        # 获取时间范围和角度（未来简事专用）
-        time_horizon = getattr(self.config, 'time_horizon', None)
-        analysis_angles = getattr(self.config, 'analysis_angles', None)
+        Args:
+            state_file: 上次研究保存的状态文件
+            save_report: 是否保存报告到文件
+            time_horizon: 时间范围，不提供则使用配置（状态文件中不记录时间范围）
+            analysis_angles: 分析角度列表，不提供则使用配置
+            event_bus: 本次研究的事件总线，不提供则使用Agent的事件总线
+            
+        Returns:
+            运行上下文，refreshed_paragraphs为重新研究的段落索引
+        """
+        state = State.load_from_file(state_file)
+        ctx = self.create_run(state.query, time_horizon=time_horizon, analysis_angles=analysis_angles,
+                              event_bus=event_bus)
+        ctx.state = state
+        return self.execute_run(ctx, save_report=save_report, refresh=True)
+    
+    def _create_scheduler(self) -> WorkflowScheduler:
+        """按配置的并发限制创建工作流调度器"""
+        return WorkflowScheduler(limits={
+            "llm": self.config.workflow_llm_concurrency,
+            "search": self.config.workflow_search_concurrency
+        })
+    
+    def _refresh(self, ctx: RunContext) -> str:
+        """
+        刷新模式：先并发重新执行所有段落记录的搜索查询，与搜索历史比较URL和内容哈希，
+        再只为证据有变化的段落重新总结和反思，有段落变化时重新生成最终报告
         
-        # 创建报告结构节点
-        report_structure_node = ReportStructureNode(
-            self.llm_client, 
-            query,
-            time_horizon=time_horizon,
-            analysis_angles=analysis_angles
+        Returns:
+            最终报告内容
+        """
+        logger.info("[步骤 1] 检查 %d 个段落的证据是否变化...", len(ctx.state.paragraphs))
+        check = Workflow()
+        for i in range(len(ctx.state.paragraphs)):
+            check.add(f"paragraph_{i}.check", lambda _, i=i: self._check_evidence(ctx, i), resource="search")
+        checks = self._create_scheduler().run(check)
+        
+        workflow = Workflow()
+        completed = []
+        ctx.refreshed_paragraphs = []
+        for i, paragraph in enumerate(ctx.state.paragraphs):
+            changed, fresh_results = checks[f"paragraph_{i}.check"]
+            if not changed:
+                continue
+            
+            first_query = next(iter(fresh_results), None)
+            first_search = (first_query, fresh_results[first_query]) if first_query is not None else None
+            paragraph.research = Research()
+            ctx.refreshed_paragraphs.append(i)
+            completed.append(self._add_paragraph_tasks(workflow, ctx, i, first_search=first_search))
+        
+        logger.info("证据有变化的段落: %d/%d", len(completed), len(ctx.state.paragraphs))
+        if not completed and ctx.state.final_report:
+            ctx.state.update_timestamp()
+            return ctx.state.final_report
+        
+        ctx.state.is_completed = False
+        ctx.state.update_timestamp()
+        workflow.add("final_report", lambda _: self._generate_final_report(ctx), deps=completed, resource="llm")
+        return self._create_scheduler().run(workflow)["final_report"]
+    
+    def _check_evidence(self, ctx: RunContext, paragraph_index: int) -> Tuple[bool, Dict[str, List[Dict[str, Any]]]]:
+        """
+        重新执行段落记录的搜索查询，比较结果的URL和内容哈希是否与搜索历史一致
+        
+        搜索绕过语义缓存和节点输出记忆，以获得最新结果。没有搜索历史或上次未完成的段落视为有变化。
+        搜索后端出错时返回空列表，因此上次有结果、这次为空的查询视为搜索失败，不参与比较，
+        也不作为最新结果返回；已完成段落的查询全部失败时视为未变化，保留上次的研究。
+        
+        Args:
+            ctx: 运行上下文
+            paragraph_index: 段落索引
+            
+        Returns:
+            (证据是否变化, 按原顺序排列的查询到最新搜索结果的字典，不包含搜索失败的查询)
+        """
+        research = ctx.state.paragraphs[paragraph_index].research
+        stored: Dict[str, set] = {}
+        for search in research.search_history:
+            stored.setdefault(search.query, set()).add(self._evidence_fingerprint(search.url, search.content))
+        
+        fresh_results = {}
+        for query in stored:
+            results = self._search(query, use_cache=False)
+            if results:
+                fresh_results[query] = results
+            else:
+                logger.warning("段落 %d 的搜索没有返回结果，视为搜索失败，沿用上次的证据: %s",
+                               paragraph_index + 1, query)
+        
+        if stored and not fresh_results and research.is_completed:
+            logger.warning("段落 %d 的搜索全部失败，保留上次的研究", paragraph_index + 1)
+            return False, fresh_results
+        
+        changed = not stored or not research.is_completed or any(
+            {self._evidence_fingerprint(r.get("url", ""), r.get("content", "")) for r in results} != stored[query]
+            for query, results in fresh_results.items()
         )
+        logger.info("段落 %d 证据%s", paragraph_index + 1, "有变化" if changed else "未变化")
+        return changed, fresh_results
+    
+    @staticmethod
+    def _evidence_fingerprint(url: str, content: str) -> Tuple[str, str]:
+        """搜索结果的指纹：URL和内容哈希"""
+        return url, hashlib.sha256(content.encode("utf-8")).hexdigest()
+    
+    def _generate_report_structure(self, ctx: RunContext):
+        """生成报告结构"""
+        logger.info("[步骤 1] 生成报告结构...")
+        query = ctx.query
+        
+        # 创建报告结构节点（时间范围和角度为未来简事专用）
+        report_structure_node = self._configure_node(ReportStructureNode(
+            self._memoize_llm(self.llm_client, ctx.memo), 
+            query,
+            time_horizon=ctx.time_horizon,
+            analysis_angles=ctx.analysis_angles
+        ))
         
         # 生成结构并更新状态
-        self.state = report_structure_node.mutate_state(state=self.state)
+        ctx.state = report_structure_node.mutate_state(state=ctx.state)
+        
+        logger.info("报告结构已生成，共 %d 个段落", len(ctx.state.paragraphs))
+        if logger.isEnabledFor(logging.DEBUG):
+            for i, paragraph in enumerate(ctx.state.paragraphs, 1):
+                logger.debug("  %d. %s", i, paragraph.title)
         
-        print(f"报告结构已生成，共 {len(self.state.paragraphs)} 个段落:")
-        for i, paragraph in enumerate(self.state.paragraphs, 1):
-            print(f"  {i}. {paragraph.title}")
+        ctx.events.emit(StructureGenerated(
+            query=query,
+            titles=[paragraph.title for paragraph in ctx.state.paragraphs]
+        ))
     
-    def _process_paragraphs(self):
-        """处理所有段落"""
-        total_paragraphs = len(self.state.paragraphs)
+    def _build_workflow(self, ctx: RunContext) -> Workflow:
+        """
+        声明一次研究的工作流
         
-        for i in range(total_paragraphs):
-            print(f"\n[步骤 2.{i+1}] 处理段落: {self.state.paragraphs[i].title}")
-            print("-" * 50)
+        报告结构生成后为每个段落添加任务链：查询生成 → 搜索 → 总结，每轮反思同样是查询 → 搜索 → 总结。
+        不同段落的任务之间没有依赖，由调度器在LLM和搜索的并发限制内交错执行；所有段落完成后生成最终报告。
+        """
+        workflow = Workflow()
+        
+        def structure(_: Dict[str, Any]):
+            self._generate_report_structure(ctx)
+            completed = [
+                self._add_paragraph_tasks(workflow, ctx, i, after="structure")
+                for i in range(len(ctx.state.paragraphs))
+            ]
+            workflow.add("final_report", lambda _: self._generate_final_report(ctx),
+                         deps=completed, resource="llm")
+        
+        workflow.add("structure", structure, resource="llm")
+        return workflow
+    
+    def _add_paragraph_tasks(self, workflow: Workflow, ctx: RunContext, paragraph_index: int,
+                             after: Optional[str] = None,
+                             first_search: Optional[Tuple[str, List[Dict[str, Any]]]] = None) -> str:
+        """
+        添加单个段落的任务链
+        
+        Args:
+            workflow: 工作流
+            ctx: 运行上下文
+            paragraph_index: 段落索引
+            after: 任务链依赖的任务名，None表示没有依赖
+            first_search: 刷新模式下首次搜索的(查询, 结果)，提供时直接使用，不再生成查询和搜索
             
-            # 初始搜索和总结
-            self._initial_search_and_summary(i)
+        Returns:
+            段落完成任务的任务名
+        """
+        previous = after
+        for reflection_i in [None] + list(range(self.config.max_reflections)):
+            prefix = f"paragraph_{paragraph_index}." + ("first" if reflection_i is None else f"reflection_{reflection_i}")
+            if reflection_i is None and first_search is not None:
+                search_task = workflow.add(
+                    f"{prefix}.search",
+                    lambda _: self._reuse_search(ctx, paragraph_index, *first_search),
+                    deps=[previous] if previous else []
+                )
+            else:
+                query_task = workflow.add(
+                    f"{prefix}.query",
+                    lambda _, it=reflection_i: self._generate_search_query(ctx, paragraph_index, it),
+                    deps=[previous] if previous else [], resource="llm"
+                )
+                search_task = workflow.add(
+                    f"{prefix}.search",
+                    lambda results, q=query_task, it=reflection_i: self._run_search(
+                        ctx, paragraph_index, results[q], it
+                    ),
+                    deps=[query_task], resource="search"
+                )
+            previous = workflow.add(
+                f"{prefix}.summary",
+                lambda results, r=search_task, it=reflection_i: self._update_summary(
+                    ctx, paragraph_index, *results[r], reflection_iteration=it
+                ),
+                deps=[search_task], resource="llm"
+            )
+        
+        return workflow.add(
+            f"paragraph_{paragraph_index}.completed",
+            lambda _: self._complete_paragraph(ctx, paragraph_index),
+            deps=[previous]
+        )
+    
+    def _generate_search_query(self, ctx: RunContext, paragraph_index: int,
+                               reflection_iteration: Optional[int] = None) -> Dict[str, Any]:
+        """
+        生成段落的搜索查询
+        
+        Args:
+            ctx: 运行上下文
+            paragraph_index: 段落索引
+            reflection_iteration: 反思轮次，None表示首次搜索
             
-            # 反思循环
-            self._reflection_loop(i)
+        Returns:
+            包含search_query和reasoning的字典
+        """
+        paragraph = ctx.state.paragraphs[paragraph_index]
+        
+        if reflection_iteration is None:
+            self._start_paragraph(ctx, paragraph_index)
             
-            # 标记段落完成
-            self.state.paragraphs[i].research.mark_completed()
+            logger.debug("生成搜索查询...")
+            output = ctx.nodes.first_search_node.run({
+                "title": paragraph.title,
+                "content": paragraph.content
+            })
+            logger.info("搜索查询: %s", output["search_query"])
+            logger.debug("推理: %s", output["reasoning"])
+        else:
+            logger.debug("反思 %d/%d...", reflection_iteration + 1, self.config.max_reflections)
             
-            progress = (i + 1) / total_paragraphs * 100
-            print(f"段落处理完成 ({progress:.1f}%)")
-    
-    def _initial_search_and_summary(self, paragraph_index: int):
-        """执行初始搜索和总结"""
-        paragraph = self.state.paragraphs[paragraph_index]
-        
-        # 准备搜索输入
-        search_input = {
-            "title": paragraph.title,
-            "content": paragraph.content
-        }
+            # 生成反思搜索查询，传递反思轮次信息
+            output = ctx.nodes.reflection_node.run(
+                {
+                    "title": paragraph.title,
+                    "content": paragraph.content,
+                    "paragraph_latest_state": paragraph.research.latest_summary
+                },
+                reflection_iteration=reflection_iteration
+            )
+            logger.info("反思查询: %s", output["search_query"])
+            logger.debug("反思推理: %s", output["reasoning"])
         
-        # 生成搜索查询
-        print("  - 生成搜索查询...")
-        search_output = self.first_search_node.run(search_input)
-        search_query = search_output["search_query"]
-        reasoning = search_output["reasoning"]
-        
-        print(f"  - 搜索查询: {search_query}")
-        print(f"  - 推理: {reasoning}")
-        
-        # 执行搜索
-        print("  - 执行网络搜索...")
-        search_results = tavily_search(
-            search_query,
-            max_results=self.config.max_search_results,
-            timeout=self.config.search_timeout,
-            api_key=self.config.tavily_api_key
+        return output
+    
+    def _start_paragraph(self, ctx: RunContext, paragraph_index: int):
+        """记录并发布段落开始处理"""
+        paragraph = ctx.state.paragraphs[paragraph_index]
+        logger.info("[步骤 2.%d] 处理段落: %s", paragraph_index + 1, paragraph.title)
+        ctx.events.emit(ParagraphStarted(
+            paragraph_index=paragraph_index,
+            total_paragraphs=len(ctx.state.paragraphs),
+            title=paragraph.title
+        ))
+    
+    def _reuse_search(self, ctx: RunContext, paragraph_index: int, search_query: str,
+                      search_results: List[Dict[str, Any]]) -> Tuple[str, List[Dict[str, Any]]]:
+        """刷新模式下开始处理段落，首次搜索直接使用检查证据时得到的最新结果"""
+        self._start_paragraph(ctx, paragraph_index)
+        return self._run_search(
+            ctx, paragraph_index, {"search_query": search_query, "reasoning": "刷新：沿用上次的搜索查询"},
+            search_results=search_results
         )
+    
+    def _run_search(self, ctx: RunContext, paragraph_index: int, query_output: Dict[str, Any],
+                    reflection_iteration: Optional[int] = None,
+                    search_results: Optional[List[Dict[str, Any]]] = None) -> Tuple[str, List[Dict[str, Any]]]:
+        """
+        执行段落的搜索并记录到搜索历史
+        
+        Args:
+            ctx: 运行上下文
+            paragraph_index: 段落索引
+            query_output: 查询生成节点的输出
+            reflection_iteration: 反思轮次，None表示首次搜索
+            search_results: 已有的搜索结果，提供时不再搜索
+            
+        Returns:
+            (搜索查询, 搜索结果列表)
+        """
+        search_query = query_output["search_query"]
+        ctx.events.emit(SearchStarted(
+            paragraph_index=paragraph_index,
+            search_query=search_query,
+            reasoning=query_output["reasoning"],
+            reflection_iteration=reflection_iteration
+        ))
+        if search_results is None:
+            search_results = self._memoized_search(ctx, search_query)
         
         if search_results:
-            print(f"  - 找到 {len(search_results)} 个搜索结果")
-            for j, result in enumerate(search_results, 1):
-                print(f"    {j}. {result['title'][:50]}...")
+            logger.info("找到 %d 个搜索结果", len(search_results))
+            if logger.isEnabledFor(logging.DEBUG):
+                for j, result in enumerate(search_results, 1):
+                    logger.debug("  %d. %s", j, result['title'][:50])
         else:
-            print("  - 未找到搜索结果")
+            logger.warning("未找到搜索结果: %s", search_query)
+        ctx.events.emit(SearchFinished(
+            paragraph_index=paragraph_index,
+            search_query=search_query,
+            result_count=len(search_results),
+            reflection_iteration=reflection_iteration
+        ))
         
         # 更新状态中的搜索历史
-        paragraph.research.add_search_results(search_query, search_results)
+        ctx.state.paragraphs[paragraph_index].research.add_search_results(search_query, search_results)
+        return search_query, search_results
+    
+    def _update_summary(self, ctx: RunContext, paragraph_index: int, search_query: str,
+                        search_results: List[Dict[str, Any]], reflection_iteration: Optional[int] = None):
+        """
+        根据搜索结果生成或更新段落总结
         
-        # 生成初始总结
-        print("  - 生成初始总结...")
+        Args:
+            ctx: 运行上下文
+            paragraph_index: 段落索引
+            search_query: 搜索查询
+            search_results: 搜索结果列表
+            reflection_iteration: 反思轮次，None表示首次总结
+        """
+        paragraph = ctx.state.paragraphs[paragraph_index]
         summary_input = {
             "title": paragraph.title,
             "content": paragraph.content,
@@ -224,80 +799,111 @@ class DeepSearchAgent:
             )
         }
         
-        # 更新状态
-        self.state = self.first_summary_node.mutate_state(
-            summary_input, self.state, paragraph_index
-        )
-        
-        print("  - 初始总结完成")
-    
-    def _reflection_loop(self, paragraph_index: int):
-        """执行反思循环"""
-        paragraph = self.state.paragraphs[paragraph_index]
-        
-        for reflection_i in range(self.config.max_reflections):
-            print(f"  - 反思 {reflection_i + 1}/{self.config.max_reflections}...")
-            
-            # 准备反思输入
-            reflection_input = {
-                "title": paragraph.title,
-                "content": paragraph.content,
-                "paragraph_latest_state": paragraph.research.latest_summary
-            }
-            
-            # 生成反思搜索查询，传递反思轮次信息
-            reflection_output = self.reflection_node.run(
-                reflection_input, 
-                reflection_iteration=reflection_i
-            )
-            search_query = reflection_output["search_query"]
-            reasoning = reflection_output["reasoning"]
-            
-            print(f"    反思查询: {search_query}")
-            print(f"    反思推理: {reasoning}")
-            
-            # 执行反思搜索
-            search_results = tavily_search(
-                search_query,
-                max_results=self.config.max_search_results,
-                timeout=self.config.search_timeout,
-                api_key=self.config.tavily_api_key
-            )
-            
-            if search_results:
-                print(f"    找到 {len(search_results)} 个反思搜索结果")
-            
-            # 更新搜索历史
-            paragraph.research.add_search_results(search_query, search_results)
-            
-            # 生成反思总结
-            reflection_summary_input = {
-                "title": paragraph.title,
-                "content": paragraph.content,
-                "search_query": search_query,
-                "search_results": format_search_results_for_prompt(
-                    search_results, self.config.max_content_length
-                ),
-                "paragraph_latest_state": paragraph.research.latest_summary
-            }
-            
+        if reflection_iteration is None:
+            logger.debug("生成初始总结...")
+            ctx.nodes.first_summary_node.mutate_state(summary_input, ctx.state, paragraph_index)
+            logger.debug("初始总结完成")
+        else:
+            summary_input["paragraph_latest_state"] = paragraph.research.latest_summary
             # 更新状态，传递反思轮次信息
-            self.state = self.reflection_summary_node.mutate_state(
-                reflection_summary_input, 
-                self.state, 
+            ctx.nodes.reflection_summary_node.mutate_state(
+                summary_input,
+                ctx.state,
                 paragraph_index,
-                reflection_iteration=reflection_i
+                reflection_iteration=reflection_iteration
             )
+            logger.debug("反思 %d 完成", reflection_iteration + 1)
+        
+        ctx.events.emit(SummaryUpdated(
+            paragraph_index=paragraph_index,
+            summary=paragraph.research.latest_summary,
+            reflection_iteration=reflection_iteration
+        ))
+        if reflection_iteration is not None:
+            ctx.events.emit(ReflectionDone(
+                paragraph_index=paragraph_index,
+                reflection_iteration=reflection_iteration,
+                max_reflections=self.config.max_reflections
+            ))
+    
+    def _complete_paragraph(self, ctx: RunContext, paragraph_index: int):
+        """标记段落完成并发布进度"""
+        ctx.state.paragraphs[paragraph_index].research.mark_completed()
+        ctx.state.update_timestamp()
+        
+        progress = ctx.state.progress
+        logger.info("段落处理完成 (%.1f%%)", progress.progress_percentage)
+        ctx.events.emit(ParagraphCompleted(
+            paragraph_index=paragraph_index,
+            total_paragraphs=progress.total_paragraphs
+        ))
+    
+    def _memoized_search(self, ctx: RunContext, search_query: str) -> List[Dict[str, Any]]:
+        """
+        执行搜索，启用节点输出记忆时相同的查询直接复用记录的结果
+        
+        复用搜索结果保证了上游查询不变时下游总结的输入也不变，记录才能命中。搜索结果会随时间变化，
+        记录在node_memo_search_ttl后过期，过期后重新搜索，下游节点的输入随之更新。
+        
+        搜索后端出错时返回空列表，与没有结果无法区分，因此空结果不记录（与语义缓存一致），
+        否则一次短暂的故障会让之后的研究一直得到空结果。
+        """
+        if ctx.memo is None:
+            return self._search(search_query)
+        key = MemoStore.make_key(
+            "search", search_query, self.config.max_search_results, self.config.get_search_backends()
+        )
+        results = ctx.memo.get(key)
+        if results is None:
+            results = self._search(search_query)
+            if results:
+                ctx.memo.put(key, results, ttl=self.config.node_memo_search_ttl)
+        return [dict(result) for result in results]
+    
+    def _search(self, search_query: str, use_cache: bool = True) -> List[Dict[str, Any]]:
+        """
+        执行网络搜索
+        
+        近似重复的查询直接使用语义缓存中的结果；规范化后相同的并发查询合并为一次请求。
+        
+        Args:
+            search_query: 搜索查询
+            use_cache: 是否读取语义缓存，为False时总是重新搜索（结果仍会写入缓存）
             
-            print(f"    反思 {reflection_i + 1} 完成")
+        Returns:
+            搜索结果列表
+        """
+        max_results = self.config.max_search_results
+        backends = tuple(self.config.get_search_backends())
+        # 不同搜索后端的结果不能互相复用，缓存按后端组合区分
+        backend_id = ",".join(backends)
+        if self.search_cache is not None and use_cache:
+            cached = self.search_cache.get(search_query, max_results, backend=backend_id)
+            if cached is not None:
+                return cached
+        
+        def fetch() -> List[Dict[str, Any]]:
+            results = [
+                result.to_dict() for result in self.search_backend.search(
+                    search_query, max_results=max_results, timeout=self.config.search_timeout
+                )
+            ]
+            if self.search_cache is not None:
+                self.search_cache.put(search_query, max_results, results, backend=backend_id)
+            return results
+        
+        key = (normalize_search_query(search_query), max_results, backends)
+        results, shared = self._search_flight.do(key, fetch)
+        # 共享的结果列表各自复制一份，避免调用方之间互相影响
+        return [dict(result) for result in results] if shared else results
     
-    def _generate_final_report(self) -> str:
+    def _generate_final_report(self, ctx: RunContext) -> str:
         """生成最终报告"""
-        print(f"\n[步骤 3] 生成最终报告...")
+        logger.info("[步骤 3] 生成最终报告...")
         
         # 准备报告数据
         report_data = []
-        for paragraph in self.state.paragraphs:
+        for paragraph in ctx.state.paragraphs:
             report_data.append({
                 "title": paragraph.title,
                 "paragraph_latest_state": paragraph.research.latest_summary
@@ -305,25 +911,27 @@ class DeepSearchAgent:
         
         # 格式化报告
         try:
-            final_report = self.report_formatting_node.run(report_data)
+            final_report = ctx.nodes.report_formatting_node.run(report_data)
         except Exception as e:
-            print(f"LLM格式化失败，使用备用方法: {str(e)}")
-            final_report = self.report_formatting_node.format_report_manually(
-                report_data, self.state.report_title
+            logger.warning("LLM格式化失败，使用备用方法: %s", e)
+            final_report = ctx.nodes.report_formatting_node.format_report_manually(
+                report_data, ctx.state.report_title
             )
         
         # 更新状态
-        self.state.final_report = final_report
-        self.state.mark_completed()
+        ctx.state.final_report = final_report
+        ctx.state.mark_completed()
         
-        print("最终报告生成完成")
+        logger.info("最终报告生成完成")
         return final_report
     
-    def _save_report(self, report_content: str):
-        """保存报告到文件"""
+    def _save_report(self, report_content: str, state: Optional[State] = None) -> str:
+        """保存报告到文件，返回报告文件路径；state不提供时保存Agent的state"""
+        state = state or self.state
+        
         # 生成文件名
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        query_safe = "".join(c for c in self.state.query if c.isalnum() or c in (' ', '-', '_')).rstrip()
+        query_safe = "".join(c for c in state.query if c.isalnum() or c in (' ', '-', '_')).rstrip()
         query_safe = query_safe.replace(' ', '_')[:30]
         
         filename = f"deep_search_report_{query_safe}_{timestamp}.md"
@@ -333,28 +941,76 @@ class DeepSearchAgent:
         with open(filepath, 'w', encoding='utf-8') as f:
             f.write(report_content)
         
-        print(f"报告已保存到: {filepath}")
+        logger.info("报告已保存到: %s", filepath)
         
         # 保存状态（如果配置允许）
         if self.config.save_intermediate_states:
-            state_filename = f"state_{query_safe}_{timestamp}.json"
+            extension = BINARY_STATE_EXTENSION if self.config.state_format == "binary" else ".json"
+            state_filename = f"state_{query_safe}_{timestamp}{extension}"
             state_filepath = os.path.join(self.config.output_dir, state_filename)
-            self.state.save_to_file(state_filepath)
-            print(f"状态已保存到: {state_filepath}")
+            state.save_to_file(state_filepath, format=self.config.state_format,
+                               compression=self.config.state_compression)
+            logger.info("状态已保存到: %s", state_filepath)
+        
+        return filepath
+    
+    def research_batch(self, queries: List[str], backend: Optional[BatchBackend] = None,
+                       save_report: bool = True) -> List[str]:
+        """
+        以批处理模式研究多个查询
+        
+        各查询的研究按阶段（结构、首次搜索、首次总结、反思、反思总结、格式化）分波推进，
+        每一波把所有查询当前阶段的LLM请求作为一个批处理任务提交，适合对延迟不敏感的离线任务。
+        
+        Args:
+            queries: 查询列表
+            backend: 批处理后端，不提供则使用基于本地文件的后端和当前LLM客户端（查询生成请求使用
+                     查询生成模型）；自定义后端（如OpenAIBatchBackend）的所有请求都使用该后端自己的模型
+            save_report: 是否保存报告到文件
+            
+        Returns:
+            与queries顺序一致的报告列表，失败的查询对应空字符串
+        """
+        query_model = None
+        if backend is None:
+            # 本地后端按请求中的模型选择客户端，查询生成请求使用查询生成模型
+            query_model = self._query_model_name()
+            backend = LocalFileBatchBackend(
+                self.llm_client, work_dir=os.path.join(self.config.output_dir, "batch_jobs"),
+                model_clients={query_model: self.llm_client.providers[QUERY_LLM_ROUTE]} if query_model else None
+            )
+        
+        runner = BatchResearchRunner(self, backend, poll_interval=self.config.batch_poll_interval,
+                                     query_model=query_model)
+        jobs = runner.run(queries, save_report=save_report)
+        
+        failed = [job.query for job in jobs if job.error]
+        logger.info("批处理研究完成: %d/%d 成功", len(jobs) - len(failed), len(jobs))
+        if failed:
+            logger.warning("失败的查询: %s", failed)
+        
+        return [job.state.final_report if not job.error else "" for job in jobs]
     
     def get_progress_summary(self) -> Dict[str, Any]:
-        """获取进度摘要"""
+        """获取Agent的state（research()最近一次开始的研究或load_state加载的状态）的进度摘要；
+        run_research/execute_run的进度请使用ctx.state.get_progress_summary()"""
         return self.state.get_progress_summary()
     
-    def load_state(self, filepath: str):
-        """从文件加载状态"""
-        self.state = State.load_from_file(filepath)
-        print(f"状态已从 {filepath} 加载")
+    def load_state(self, filepath: str, lazy: bool = False):
+        """
+        从文件加载状态
+        
+        Args:
+            filepath: 文件路径
+            lazy: 是否延迟加载搜索内容（仅二进制格式）
+        """
+        self.state = State.load_from_file(filepath, lazy=lazy)
+        logger.info("状态已从 %s 加载", filepath)
     
     def save_state(self, filepath: str):
-        """保存状态到文件"""
-        self.state.save_to_file(filepath)
-        print(f"状态已保存到 {filepath}")
+        """保存Agent的state到文件，扩展名为.dsa时使用二进制格式；单次运行的状态请使用ctx.state.save_to_file"""
+        self.state.save_to_file(filepath, compression=self.config.state_compression)
+        logger.info("状态已保存到 %s", filepath)
 
 
 def create_agent(config_file: Optional[str] = None) -> DeepSearchAgent:
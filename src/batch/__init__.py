@@ -0,0 +1,16 @@
+"""
+批处理模块
+把多个查询的研究过程按阶段分波，通过批处理接口提交LLM请求
+"""
+
+from .backends import BatchBackend, BatchRequest, LocalFileBatchBackend, OpenAIBatchBackend
+from .runner import BatchResearchJob, BatchResearchRunner
+
+__all__ = [
+    "BatchBackend",
+    "BatchRequest",
+    "LocalFileBatchBackend",
+    "OpenAIBatchBackend",
+    "BatchResearchJob",
+    "BatchResearchRunner"
+]
@@ -0,0 +1,328 @@
+"""
+批处理后端
+把一波LLM请求写成OpenAI Batch API格式的JSONL提交，完成后按custom_id取回结果
+"""
+
+import json
+import logging
+import os
+import time
+import uuid
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..llms.base import BaseLLM, build_chat_messages
+
+logger = logging.getLogger(__name__)
+
+# 批处理任务状态
+STATUS_PENDING = "pending"
+STATUS_COMPLETED = "completed"
+STATUS_FAILED = "failed"
+
+
+@dataclass
+class BatchRequest:
+    """批处理中的单个LLM请求"""
+    custom_id: str = ""                                            # 请求标识，用于匹配结果
+    system_prompt: str = ""                                        # 系统提示词
+    user_prompt: str = ""                                          # 用户输入
+    params: Dict[str, Any] = field(default_factory=dict)           # 调用参数，如max_tokens、stop
+    model: Optional[str] = None                                    # 本请求使用的模型，None表示后端的默认模型
+
+    def to_line(self, model: str) -> Dict[str, Any]:
+        """转换为OpenAI Batch API输入文件中的一行，model为后端的默认模型"""
+        body: Dict[str, Any] = {
+            "model": self.model or model,
+            "messages": build_chat_messages(self.system_prompt, self.user_prompt),
+            "temperature": self.params.get("temperature", 0.7),
+            "max_tokens": self.params.get("max_tokens", 4000)
+        }
+        if self.params.get("stop"):
+            body["stop"] = self.params["stop"]
+
+        return {
+            "custom_id": self.custom_id,
+            "method": "POST",
+            "url": "/v1/chat/completions",
+            "body": body
+        }
+
+
+def _write_jsonl(filepath: str, lines: List[Dict[str, Any]]):
+    """写入JSONL文件"""
+    with open(filepath, 'w', encoding='utf-8') as f:
+        for line in lines:
+            f.write(json.dumps(line, ensure_ascii=False) + "\n")
+
+
+def _parse_output_lines(text: str) -> Dict[str, str]:
+    """解析Batch API输出文件，返回custom_id到回复文本的映射，失败的请求不包含在内"""
+    results = {}
+    for raw_line in text.splitlines():
+        if not raw_line.strip():
+            continue
+        line = json.loads(raw_line)
+        response = line.get("response") or {}
+        if line.get("error") or response.get("status_code", 200) != 200:
+            logger.warning("批处理请求 %s 失败: %s", line.get("custom_id"), line.get("error"))
+            continue
+        choices = (response.get("body") or {}).get("choices") or []
+        if choices:
+            results[line["custom_id"]] = (choices[0].get("message") or {}).get("content") or ""
+    return results
+
+
+class BatchBackend(ABC):
+    """批处理后端基类"""
+
+    @abstractmethod
+    def submit(self, requests: List[BatchRequest]) -> str:
+        """
+        提交一批请求
+
+        Args:
+            requests: 请求列表
+
+        Returns:
+            任务ID
+        """
+        pass
+
+    @abstractmethod
+    def poll(self, job_id: str) -> str:
+        """
+        查询任务状态
+
+        Args:
+            job_id: 任务ID
+
+        Returns:
+            pending、completed或failed
+        """
+        pass
+
+    @abstractmethod
+    def fetch_results(self, job_id: str) -> Dict[str, str]:
+        """
+        获取已完成任务的结果
+
+        Args:
+            job_id: 任务ID
+
+        Returns:
+            custom_id到回复文本的映射，失败的请求不包含在内
+        """
+        pass
+
+    def run(self, requests: List[BatchRequest], poll_interval: float = 60.0,
+            timeout: Optional[float] = None) -> Dict[str, str]:
+        """
+        提交请求并等待完成
+
+        Args:
+            requests: 请求列表
+            poll_interval: 查询状态的间隔（秒）
+            timeout: 最长等待时间（秒），None表示一直等待
+
+        Returns:
+            custom_id到回复文本的映射
+        """
+        if not requests:
+            return {}
+
+        job_id = self.submit(requests)
+        logger.info("已提交批处理任务 %s，共 %d 个请求", job_id, len(requests))
+
+        start = time.monotonic()
+        while True:
+            status = self.poll(job_id)
+            if status == STATUS_COMPLETED:
+                break
+            if status == STATUS_FAILED:
+                raise RuntimeError(f"批处理任务 {job_id} 失败")
+            if timeout is not None and time.monotonic() - start > timeout:
+                raise TimeoutError(f"批处理任务 {job_id} 超过 {timeout} 秒仍未完成")
+            time.sleep(poll_interval)
+
+        results = self.fetch_results(job_id)
+        logger.info("批处理任务 %s 完成，成功 %d/%d", job_id, len(results), len(requests))
+        return results
+
+
+class LocalFileBatchBackend(BatchBackend):
+    """
+    基于本地文件的批处理后端
+
+    与OpenAI Batch API使用相同的输入/输出文件格式，在首次查询状态时用给定的LLM客户端执行整批请求，
+    用于测试和没有批处理接口的提供商。
+    """
+
+    def __init__(self, llm_client: BaseLLM, work_dir: str = "batch_jobs",
+                 model_clients: Optional[Dict[str, BaseLLM]] = None):
+        """
+        初始化本地批处理后端
+
+        Args:
+            llm_client: 执行请求的LLM客户端，使用其batch_invoke
+            work_dir: 存放输入/输出文件的目录
+            model_clients: 模型名称到LLM客户端的映射，请求指定的模型在其中时使用对应的客户端执行
+        """
+        self.llm_client = llm_client
+        self.model_clients = model_clients or {}
+        self.work_dir = work_dir
+        os.makedirs(work_dir, exist_ok=True)
+
+    def _input_path(self, job_id: str) -> str:
+        return os.path.join(self.work_dir, f"{job_id}_input.jsonl")
+
+    def _output_path(self, job_id: str) -> str:
+        return os.path.join(self.work_dir, f"{job_id}_output.jsonl")
+
+    def submit(self, requests: List[BatchRequest]) -> str:
+        """写入输入文件"""
+        job_id = f"batch_{uuid.uuid4().hex[:12]}"
+        model = getattr(self.llm_client, "default_model", None) or self.llm_client.model_name or "local"
+        _write_jsonl(self._input_path(job_id), [request.to_line(model) for request in requests])
+        return job_id
+
+    def poll(self, job_id: str) -> str:
+        """输出文件不存在时执行整批请求"""
+        if not os.path.exists(self._input_path(job_id)):
+            return STATUS_FAILED
+        if not os.path.exists(self._output_path(job_id)):
+            self._execute(job_id)
+        return STATUS_COMPLETED
+
+    def fetch_results(self, job_id: str) -> Dict[str, str]:
+        """读取输出文件"""
+        with open(self._output_path(job_id), 'r', encoding='utf-8') as f:
+            return _parse_output_lines(f.read())
+
+    def _execute(self, job_id: str):
+        """按模型和调用参数分组，通过batch_invoke执行输入文件中的请求并写出输出文件"""
+        with open(self._input_path(job_id), 'r', encoding='utf-8') as f:
+            lines = [json.loads(raw_line) for raw_line in f if raw_line.strip()]
+
+        groups: Dict[Tuple, List[Dict[str, Any]]] = {}
+        for line in lines:
+            body = line["body"]
+            key = (body.get("model"), body.get("temperature"), body.get("max_tokens"),
+                   tuple(body.get("stop") or ()))
+            groups.setdefault(key, []).append(line)
+
+        outputs = []
+        for (model, temperature, max_tokens, stop), group in groups.items():
+            params: Dict[str, Any] = {"temperature": temperature, "max_tokens": max_tokens}
+            if stop:
+                params["stop"] = list(stop)
+
+            llm_client = self.model_clients.get(model, self.llm_client)
+            try:
+                replies = list(llm_client.batch_invoke([self._to_prompts(line) for line in group], **params))
+            except Exception as e:
+                logger.error("本地批处理执行失败: %s", e)
+                outputs.extend(self._error_line(line, str(e)) for line in group)
+                continue
+
+            if len(replies) != len(group):
+                logger.error("本地批处理返回 %d 个回复，但提交了 %d 个请求", len(replies), len(group))
+
+            outputs.extend({
+                "custom_id": line["custom_id"],
+                "response": {
+                    "status_code": 200,
+                    "body": {"choices": [{"index": 0, "message": {"role": "assistant", "content": reply}}]}
+                },
+                "error": None
+            } for line, reply in zip(group, replies))
+
+            # 返回的回复少于请求数时，没有回复的请求写入错误记录，而不是从输出中消失
+            message = f"批处理后端返回 {len(replies)} 个回复，少于提交的 {len(group)} 个请求"
+            outputs.extend(self._error_line(line, message) for line in group[len(replies):])
+
+        _write_jsonl(self._output_path(job_id), outputs)
+
+    @staticmethod
+    def _error_line(line: Dict[str, Any], message: str) -> Dict[str, Any]:
+        """请求失败时的输出行"""
+        return {"custom_id": line["custom_id"], "response": None, "error": {"message": message}}
+
+    @staticmethod
+    def _to_prompts(line: Dict[str, Any]) -> Tuple[str, str]:
+        """从输入行还原(系统提示词, 用户输入)，系统提示词为单条system消息（见build_chat_messages）"""
+        messages = line["body"]["messages"]
+        system_prompt = next((message["content"] for message in messages if message["role"] == "system"), "")
+        user_prompt = next((message["content"] for message in messages if message["role"] == "user"), "")
+        return system_prompt, user_prompt
+
+
+class OpenAIBatchBackend(BatchBackend):
+    """OpenAI Batch API后端，费用约为同步调用的一半，24小时内完成"""
+
+    def __init__(self, api_key: Optional[str] = None, model_name: str = "gpt-4o-mini",
+                 base_url: Optional[str] = None, completion_window: str = "24h",
+                 work_dir: str = "batch_jobs"):
+        """
+        初始化OpenAI批处理后端
+
+        Args:
+            api_key: API密钥，如果不提供则从环境变量OPENAI_API_KEY读取
+            model_name: 模型名称
+            base_url: 兼容Batch API的服务地址，None表示OpenAI官方接口
+            completion_window: 任务完成时限
+            work_dir: 存放上传前输入文件的目录
+        """
+        api_key = api_key or os.getenv("OPENAI_API_KEY")
+        if not api_key:
+            raise ValueError("OpenAI API Key未找到！请设置OPENAI_API_KEY环境变量或在初始化时提供")
+
+        self.api_key = api_key
+        self.base_url = base_url
+        # OpenAI客户端在首次提交时创建
+        self._client = None
+        self.model_name = model_name
+        self.completion_window = completion_window
+        self.work_dir = work_dir
+        os.makedirs(work_dir, exist_ok=True)
+
+    @property
+    def client(self):
+        """OpenAI客户端，首次访问时才导入openai并创建"""
+        if self._client is None:
+            from openai import OpenAI
+            self._client = OpenAI(api_key=self.api_key, base_url=self.base_url) if self.base_url \
+                else OpenAI(api_key=self.api_key)
+        return self._client
+
+    def submit(self, requests: List[BatchRequest]) -> str:
+        """上传输入文件并创建批处理任务"""
+        filepath = os.path.join(self.work_dir, f"openai_batch_{uuid.uuid4().hex[:12]}_input.jsonl")
+        _write_jsonl(filepath, [request.to_line(self.model_name) for request in requests])
+
+        with open(filepath, 'rb') as f:
+            input_file = self.client.files.create(file=f, purpose="batch")
+
+        batch = self.client.batches.create(
+            input_file_id=input_file.id,
+            endpoint="/v1/chat/completions",
+            completion_window=self.completion_window
+        )
+        return batch.id
+
+    def poll(self, job_id: str) -> str:
+        """查询任务状态"""
+        status = self.client.batches.retrieve(job_id).status
+        if status == "completed":
+            return STATUS_COMPLETED
+        if status in ("failed", "expired", "cancelled"):
+            return STATUS_FAILED
+        return STATUS_PENDING
+
+    def fetch_results(self, job_id: str) -> Dict[str, str]:
+        """下载输出文件"""
+        batch = self.client.batches.retrieve(job_id)
+        if not batch.output_file_id:
+            return {}
+        return _parse_output_lines(self.client.files.content(batch.output_file_id).text)
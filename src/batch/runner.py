@@ -0,0 +1,318 @@
+"""
+批处理研究执行器
+把多个查询的研究过程按阶段分波推进：每一波收集所有任务当前阶段的LLM请求，作为一个批处理任务提交，
+结果返回后每个任务前进一个阶段
+"""
+
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from ..events import ReportReady, ResearchFailed, StructureGenerated
+from ..nodes import ReportStructureNode
+from ..nodes.base_node import BaseNode
+from ..state import State
+from ..utils import format_search_results_for_prompt
+from .backends import BatchBackend, BatchRequest
+
+logger = logging.getLogger(__name__)
+
+# 研究阶段
+STAGE_STRUCTURE = "structure"
+STAGE_FIRST_SEARCH = "first_search"
+STAGE_FIRST_SUMMARY = "first_summary"
+STAGE_REFLECTION = "reflection"
+STAGE_REFLECTION_SUMMARY = "reflection_summary"
+STAGE_FORMATTING = "formatting"
+STAGE_DONE = "done"
+STAGE_FAILED = "failed"
+
+
+@dataclass
+class BatchResearchJob:
+    """批处理中单个查询的研究任务"""
+    index: int = 0                                                 # 任务序号
+    query: str = ""                                                # 研究查询
+    state: State = field(default_factory=State)                    # 研究状态
+    stage: str = STAGE_STRUCTURE                                   # 当前阶段
+    reflection_iteration: int = 0                                  # 当前反思轮次
+    pending_queries: Dict[int, str] = field(default_factory=dict)  # 本阶段各段落待执行的搜索查询
+    search_results: Dict[int, List[Dict[str, Any]]] = field(default_factory=dict)  # 各段落最近一次搜索结果
+    report_path: Optional[str] = None                              # 报告文件路径
+    error: Optional[str] = None                                    # 失败原因
+
+    @property
+    def is_active(self) -> bool:
+        """任务是否仍需推进"""
+        return self.stage not in (STAGE_DONE, STAGE_FAILED)
+
+
+# 单个请求的结果处理函数，参数为LLM原始输出（请求失败时为None）
+ResultHandler = Callable[[Optional[str]], None]
+
+
+class BatchResearchRunner:
+    """按阶段分波推进多个研究任务的执行器"""
+
+    def __init__(self, agent: Any, backend: BatchBackend, poll_interval: float = 60.0,
+                 timeout: Optional[float] = None, max_search_workers: int = 8,
+                 query_model: Optional[str] = None):
+        """
+        初始化执行器
+
+        Args:
+            agent: DeepSearchAgent实例，提供配置、节点、搜索和报告保存
+            backend: 批处理后端
+            poll_interval: 查询批处理任务状态的间隔（秒）
+            timeout: 每一波的最长等待时间（秒），None表示一直等待
+            max_search_workers: 并发执行搜索的最大线程数
+            query_model: 搜索查询生成请求使用的模型，None表示使用后端的默认模型
+        """
+        self.agent = agent
+        self.backend = backend
+        self.poll_interval = poll_interval
+        self.timeout = timeout
+        self.max_search_workers = max_search_workers
+        self.query_model = query_model
+        self.jobs: List[BatchResearchJob] = []
+
+    def run(self, queries: List[str], save_report: bool = True) -> List[BatchResearchJob]:
+        """
+        执行所有查询的研究
+
+        Args:
+            queries: 查询列表
+            save_report: 是否保存报告到文件
+
+        Returns:
+            研究任务列表，顺序与queries一致
+        """
+        self.jobs = [BatchResearchJob(index=i, query=query) for i, query in enumerate(queries)]
+        wave = 0
+
+        while any(job.is_active for job in self.jobs):
+            wave += 1
+            requests: List[BatchRequest] = []
+            handlers: Dict[str, ResultHandler] = {}
+
+            for job in self.jobs:
+                if job.is_active:
+                    self._collect(job, requests, handlers)
+
+            stages = sorted({job.stage for job in self.jobs if job.is_active})
+            logger.info("[批处理第 %d 波] 阶段: %s，请求数: %d", wave, ", ".join(stages), len(requests))
+
+            results = self.backend.run(requests, poll_interval=self.poll_interval, timeout=self.timeout)
+            for custom_id, handler in handlers.items():
+                handler(results.get(custom_id))
+
+            self._run_searches()
+
+            for job in self.jobs:
+                if job.is_active:
+                    self._advance(job, save_report)
+
+        return self.jobs
+
+    # ===== 收集请求 =====
+
+    def _add_request(self, requests: List[BatchRequest], handlers: Dict[str, ResultHandler],
+                     job: BatchResearchJob, key: str, node: BaseNode, input_data: Any,
+                     on_result: Callable[[Any], None], model: Optional[str] = None, **kwargs):
+        """构建节点请求，结果返回后用节点解析并交给on_result；model为本请求使用的模型"""
+        custom_id = f"job{job.index}-{job.stage}-{key}"
+        system_prompt, user_prompt = node.build_request(input_data, **kwargs)
+        params = node.get_llm_params()
+        params.pop("node_name", None)
+        requests.append(BatchRequest(custom_id, system_prompt, user_prompt, params, model=model))
+
+        def handle(response: Optional[str]):
+            # 请求失败时保持原状态：段落沿用原总结，报告改用备用格式化方法
+            if response is None:
+                logger.warning("请求 %s 没有返回结果", custom_id)
+                return
+            try:
+                on_result(node.parse_response(response, **kwargs))
+            except Exception as e:
+                self._fail(job, e)
+
+        handlers[custom_id] = handle
+
+    def _collect(self, job: BatchResearchJob, requests: List[BatchRequest], handlers: Dict[str, ResultHandler]):
+        """收集任务当前阶段的所有请求"""
+        agent = self.agent
+        paragraphs = job.state.paragraphs
+
+        if job.stage == STAGE_STRUCTURE:
+            node = agent._configure_node(ReportStructureNode(
+                agent.llm_client,
+                job.query,
+                time_horizon=agent.config.time_horizon,
+                analysis_angles=agent.config.analysis_angles
+            ))
+            self._add_request(requests, handlers, job, "0", node, None,
+                              lambda structure: node.apply_structure(structure, job.state))
+
+        elif job.stage in (STAGE_FIRST_SEARCH, STAGE_REFLECTION):
+            for i, paragraph in enumerate(paragraphs):
+                if job.stage == STAGE_FIRST_SEARCH:
+                    node = agent.first_search_node
+                    input_data = {"title": paragraph.title, "content": paragraph.content}
+                    kwargs = {}
+                else:
+                    node = agent.reflection_node
+                    input_data = {
+                        "title": paragraph.title,
+                        "content": paragraph.content,
+                        "paragraph_latest_state": paragraph.research.latest_summary
+                    }
+                    kwargs = {"reflection_iteration": job.reflection_iteration}
+
+                self._add_request(requests, handlers, job, str(i), node, input_data,
+                                  self._query_setter(job, i), model=self.query_model, **kwargs)
+
+        elif job.stage in (STAGE_FIRST_SUMMARY, STAGE_REFLECTION_SUMMARY):
+            for i, paragraph in enumerate(paragraphs):
+                search_query = job.pending_queries.get(i, "")
+                input_data = {
+                    "title": paragraph.title,
+                    "content": paragraph.content,
+                    "search_query": search_query,
+                    "search_results": format_search_results_for_prompt(
+                        job.search_results.get(i, []), agent.config.max_content_length
+                    )
+                }
+                if job.stage == STAGE_FIRST_SUMMARY:
+                    node = agent.first_summary_node
+                    kwargs = {}
+                else:
+                    node = agent.reflection_summary_node
+                    input_data["paragraph_latest_state"] = paragraph.research.latest_summary
+                    kwargs = {"reflection_iteration": job.reflection_iteration}
+
+                self._add_request(requests, handlers, job, str(i), node, input_data,
+                                  self._summary_setter(job, i), **kwargs)
+
+        elif job.stage == STAGE_FORMATTING:
+            report_data = [
+                {"title": paragraph.title, "paragraph_latest_state": paragraph.research.latest_summary}
+                for paragraph in paragraphs
+            ]
+            node = agent.report_formatting_node
+
+            def set_report(report: str):
+                job.state.final_report = report
+
+            self._add_request(requests, handlers, job, "0", node, report_data, set_report)
+
+    def _query_setter(self, job: BatchResearchJob, paragraph_index: int) -> Callable[[Dict[str, str]], None]:
+        """记录段落待执行的搜索查询"""
+        def set_query(output: Dict[str, str]):
+            job.pending_queries[paragraph_index] = output["search_query"]
+        return set_query
+
+    def _summary_setter(self, job: BatchResearchJob, paragraph_index: int) -> Callable[[str], None]:
+        """更新段落总结，解析结果为空时保留原总结"""
+        def set_summary(summary: str):
+            if summary:
+                job.state.paragraphs[paragraph_index].research.latest_summary = summary
+                job.state.update_timestamp()
+        return set_summary
+
+    # ===== 搜索与阶段推进 =====
+
+    def _run_searches(self):
+        """并发执行本波所有搜索阶段任务的搜索"""
+        tasks: List[Tuple[BatchResearchJob, int, str]] = [
+            (job, i, query)
+            for job in self.jobs
+            if job.is_active and job.stage in (STAGE_FIRST_SEARCH, STAGE_REFLECTION)
+            for i, query in job.pending_queries.items()
+        ]
+        if not tasks:
+            return
+
+        def search(task: Tuple[BatchResearchJob, int, str]) -> List[Dict[str, Any]]:
+            try:
+                return self.agent._search(task[2])
+            except Exception as e:
+                logger.warning("搜索失败 (%s): %s", task[2], e)
+                return []
+
+        with ThreadPoolExecutor(max_workers=self.max_search_workers) as executor:
+            all_results = list(executor.map(search, tasks))
+
+        for (job, i, query), results in zip(tasks, all_results):
+            job.search_results[i] = results
+            job.state.paragraphs[i].research.add_search_results(query, results)
+
+    def _advance(self, job: BatchResearchJob, save_report: bool):
+        """任务前进一个阶段"""
+        config = self.agent.config
+
+        if job.stage == STAGE_STRUCTURE:
+            if not job.state.paragraphs:
+                self._fail(job, ValueError("报告结构为空"))
+                return
+            self.agent.events.emit(StructureGenerated(
+                query=job.query,
+                titles=[paragraph.title for paragraph in job.state.paragraphs]
+            ))
+            job.stage = STAGE_FIRST_SEARCH
+
+        elif job.stage == STAGE_FIRST_SEARCH:
+            job.stage = STAGE_FIRST_SUMMARY
+
+        elif job.stage == STAGE_FIRST_SUMMARY:
+            job.stage = STAGE_REFLECTION if config.max_reflections > 0 else STAGE_FORMATTING
+
+        elif job.stage == STAGE_REFLECTION:
+            job.stage = STAGE_REFLECTION_SUMMARY
+
+        elif job.stage == STAGE_REFLECTION_SUMMARY:
+            for paragraph in job.state.paragraphs:
+                paragraph.research.increment_reflection()
+            job.reflection_iteration += 1
+            job.stage = STAGE_REFLECTION if job.reflection_iteration < config.max_reflections else STAGE_FORMATTING
+
+        elif job.stage == STAGE_FORMATTING:
+            self._finish(job, save_report)
+            return
+
+        if job.stage == STAGE_FORMATTING:
+            for paragraph in job.state.paragraphs:
+                paragraph.research.mark_completed()
+            job.state.update_timestamp()
+
+        if job.stage in (STAGE_FIRST_SEARCH, STAGE_REFLECTION):
+            job.pending_queries = {}
+            job.search_results = {}
+
+    def _finish(self, job: BatchResearchJob, save_report: bool):
+        """完成任务：格式化请求失败时使用备用格式化方法，并保存报告"""
+        if not job.state.final_report:
+            report_data = [
+                {"title": paragraph.title, "paragraph_latest_state": paragraph.research.latest_summary}
+                for paragraph in job.state.paragraphs
+            ]
+            job.state.final_report = self.agent.report_formatting_node.format_report_manually(
+                report_data, job.state.report_title
+            )
+
+        job.state.mark_completed()
+        if save_report:
+            job.report_path = self.agent._save_report(job.state.final_report, job.state)
+
+        job.stage = STAGE_DONE
+        self.agent.events.emit(ReportReady(report=job.state.final_report, filepath=job.report_path))
+        logger.info("批处理研究完成: %s", job.query)
+
+    def _fail(self, job: BatchResearchJob, error: Exception):
+        """标记任务失败，其他任务继续推进"""
+        if job.stage == STAGE_FAILED:
+            return
+        logger.error("批处理研究失败 (%s): %s", job.query, error)
+        job.error = str(error)
+        job.stage = STAGE_FAILED
+        self.agent.events.emit(ResearchFailed(query=job.query, error=str(error)))
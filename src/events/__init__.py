@@ -0,0 +1,34 @@
+"""
+事件模块
+提供研究进度的事件类型和事件总线
+"""
+
+from .events import (
+    Event,
+    ResearchStarted,
+    StructureGenerated,
+    ParagraphStarted,
+    SearchStarted,
+    SearchFinished,
+    SummaryUpdated,
+    ReflectionDone,
+    ParagraphCompleted,
+    ReportReady,
+    ResearchFailed,
+    EventBus
+)
+
+__all__ = [
+    "Event",
+    "ResearchStarted",
+    "StructureGenerated",
+    "ParagraphStarted",
+    "SearchStarted",
+    "SearchFinished",
+    "SummaryUpdated",
+    "ReflectionDone",
+    "ParagraphCompleted",
+    "ReportReady",
+    "ResearchFailed",
+    "EventBus"
+]
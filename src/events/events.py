@@ -0,0 +1,227 @@
+"""
+研究进度事件定义与事件总线
+支持同步和异步订阅者，无订阅者时发布事件几乎没有开销
+"""
+
+import asyncio
+import inspect
+import logging
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple, Type
+
+logger = logging.getLogger(__name__)
+
+
+# ===== 事件类型定义 =====
+
+@dataclass
+class Event:
+    """事件基类，订阅Event即可接收所有事件"""
+    pass
+
+
+@dataclass
+class ResearchStarted(Event):
+    """研究开始"""
+    query: str = ""
+    time_horizon: Optional[str] = None
+    analysis_angles: Optional[List[str]] = None
+
+
+@dataclass
+class StructureGenerated(Event):
+    """报告结构已生成"""
+    query: str = ""
+    titles: List[str] = field(default_factory=list)
+
+
+@dataclass
+class ParagraphStarted(Event):
+    """开始处理段落"""
+    paragraph_index: int = 0
+    total_paragraphs: int = 0
+    title: str = ""
+
+
+@dataclass
+class SearchStarted(Event):
+    """开始执行搜索，reflection_iteration为None表示首次搜索"""
+    paragraph_index: int = 0
+    search_query: str = ""
+    reasoning: str = ""
+    reflection_iteration: Optional[int] = None
+
+
+@dataclass
+class SearchFinished(Event):
+    """搜索完成"""
+    paragraph_index: int = 0
+    search_query: str = ""
+    result_count: int = 0
+    reflection_iteration: Optional[int] = None
+
+
+@dataclass
+class SummaryUpdated(Event):
+    """段落总结已更新，reflection_iteration为None表示首次总结"""
+    paragraph_index: int = 0
+    summary: str = ""
+    reflection_iteration: Optional[int] = None
+
+
+@dataclass
+class ReflectionDone(Event):
+    """一轮反思完成"""
+    paragraph_index: int = 0
+    reflection_iteration: int = 0
+    max_reflections: int = 0
+
+
+@dataclass
+class ParagraphCompleted(Event):
+    """段落处理完成"""
+    paragraph_index: int = 0
+    total_paragraphs: int = 0
+
+
+@dataclass
+class ReportReady(Event):
+    """最终报告已生成，filepath为None表示未保存到文件"""
+    report: str = ""
+    filepath: Optional[str] = None
+
+
+@dataclass
+class ResearchFailed(Event):
+    """研究过程失败"""
+    query: str = ""
+    error: str = ""
+
+
+# ===== 事件总线 =====
+
+@dataclass(frozen=True)
+class _Subscription:
+    """单个订阅记录"""
+    handler: Callable[[Any], Any]
+    is_async: bool
+    loop: Optional[asyncio.AbstractEventLoop]
+
+
+class EventBus:
+    """
+    类型化的事件总线
+
+    订阅某个事件类型会同时收到其子类事件，按事件类的MRO从具体到一般依次分发，订阅Event即可接收所有事件。
+    订阅表采用写时复制，发布事件时无需加锁，处理函数在emit期间订阅或取消订阅只影响之后发布的事件；
+    没有任何订阅者时emit直接返回。
+    """
+
+    def __init__(self):
+        """初始化事件总线"""
+        self._subscriptions: Dict[Type[Event], Tuple[_Subscription, ...]] = {}
+        self._lock = threading.Lock()
+
+    def subscribe(self, event_type: Type[Event], handler: Callable[[Any], Any],
+                  loop: Optional[asyncio.AbstractEventLoop] = None) -> Callable[[], None]:
+        """
+        订阅事件
+
+        Args:
+            event_type: 事件类型，同时接收其子类事件，传入Event表示订阅所有事件
+            handler: 处理函数，可以是普通函数或协程函数
+            loop: 协程处理函数运行的事件循环，不提供则使用订阅时正在运行的循环
+
+        Returns:
+            取消订阅的函数
+        """
+        is_async = inspect.iscoroutinefunction(handler)
+        if is_async and loop is None:
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                loop = None
+
+        subscription = _Subscription(handler=handler, is_async=is_async, loop=loop)
+        with self._lock:
+            subscriptions = dict(self._subscriptions)
+            subscriptions[event_type] = subscriptions.get(event_type, ()) + (subscription,)
+            self._subscriptions = subscriptions
+
+        return lambda: self._remove(event_type, subscription)
+
+    def unsubscribe(self, event_type: Type[Event], handler: Callable[[Any], Any]):
+        """
+        取消某个处理函数对事件的订阅
+
+        Args:
+            event_type: 事件类型
+            handler: 处理函数
+        """
+        for subscription in self._subscriptions.get(event_type, ()):
+            if subscription.handler == handler:
+                self._remove(event_type, subscription)
+
+    def _remove(self, event_type: Type[Event], subscription: _Subscription):
+        """移除订阅记录"""
+        with self._lock:
+            subscriptions = dict(self._subscriptions)
+            remaining = tuple(s for s in subscriptions.get(event_type, ()) if s is not subscription)
+            if remaining:
+                subscriptions[event_type] = remaining
+            else:
+                subscriptions.pop(event_type, None)
+            self._subscriptions = subscriptions
+
+    def has_subscribers(self, event_type: Optional[Type[Event]] = None) -> bool:
+        """
+        检查是否有订阅者，可用于跳过构造代价较高的事件
+
+        Args:
+            event_type: 事件类型，不提供则检查是否存在任何订阅者
+        """
+        subscriptions = self._subscriptions
+        if event_type is None:
+            return bool(subscriptions)
+        return any(cls in subscriptions for cls in event_type.__mro__)
+
+    def emit(self, event: Event):
+        """
+        发布事件，处理函数抛出的异常不会影响发布者
+
+        Args:
+            event: 事件对象
+        """
+        subscriptions = self._subscriptions
+        if not subscriptions:
+            return
+
+        targets = ()
+        for cls in type(event).__mro__:
+            targets += subscriptions.get(cls, ())
+
+        for subscription in targets:
+            try:
+                if subscription.is_async:
+                    self._dispatch_async(subscription, event)
+                else:
+                    subscription.handler(event)
+            except Exception:
+                logger.exception("事件处理函数执行失败 (%s)", type(event).__name__)
+
+    def _dispatch_async(self, subscription: _Subscription, event: Event):
+        """将协程处理函数调度到对应的事件循环"""
+        try:
+            running_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            running_loop = None
+
+        loop = subscription.loop or running_loop
+        if loop is None:
+            # 没有可用的事件循环，同步执行协程
+            asyncio.run(subscription.handler(event))
+        elif loop is running_loop:
+            loop.create_task(subscription.handler(event))
+        else:
+            asyncio.run_coroutine_threadsafe(subscription.handler(event), loop)
@@ -6,5 +6,11 @@ LLM调用模块
 from .base import BaseLLM
 from .deepseek import DeepSeekLLM
 from .openai_llm import OpenAILLM
+from .local_llm import LocalLLM
+from .router import RoutingLLM
+from .batching import BatchingLLM
+from .coalescing import CoalescingLLM
+from .memoized import MemoizedLLM
 
-__all__ = ["BaseLLM", "DeepSeekLLM", "OpenAILLM"]
+__all__ = ["BaseLLM", "DeepSeekLLM", "OpenAILLM", "LocalLLM", "RoutingLLM", "BatchingLLM", "CoalescingLLM",
+           "MemoizedLLM"]
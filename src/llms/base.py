@@ -3,8 +3,33 @@ LLM基础抽象类
 定义所有LLM实现需要遵循的接口标准
 """
 
+import logging
+import threading
 from abc import ABC, abstractmethod
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def build_chat_messages(system_prompt: str, user_prompt: str) -> List[Dict[str, str]]:
+    """
+    构建对话消息
+    
+    只使用一条系统消息：很多聊天模板（ChatML、llama.cpp、vLLM等）和部分提供商只接受开头的一条系统消息。
+    带有prefix/suffix的提示词（见prompts.RenderedPrompt）本身就是稳定前缀在前、日期和反思轮次等
+    可变内容在末尾的完整字符串，放在同一条系统消息中前缀仍可被服务端缓存；用户输入放在最后。
+    
+    Args:
+        system_prompt: 系统提示词
+        user_prompt: 用户输入
+        
+    Returns:
+        消息列表
+    """
+    return [
+        {"role": "system", "content": str(system_prompt)},
+        {"role": "user", "content": user_prompt}
+    ]
 
 
 class BaseLLM(ABC):
@@ -21,6 +46,10 @@ class BaseLLM(ABC):
         self.api_key = api_key
         self.model_name = model_name
         
+        # 累计用量统计（含服务端前缀缓存命中的token数）
+        self._usage = {"calls": 0, "prompt_tokens": 0, "completion_tokens": 0, "cached_tokens": 0}
+        self._usage_lock = threading.Lock()
+        
     @abstractmethod
     def invoke(self, system_prompt: str, user_prompt: str, **kwargs) -> str:
         """
@@ -29,13 +58,26 @@ class BaseLLM(ABC):
         Args:
             system_prompt: 系统提示词
             user_prompt: 用户输入
-            **kwargs: 其他参数，如temperature、max_tokens等
+            **kwargs: 其他参数，如temperature、max_tokens、stop等；节点调用时会附带node_name
             
         Returns:
             LLM生成的回复文本
         """
         pass
     
+    def batch_invoke(self, requests: List[Tuple[str, str]], **kwargs) -> List[str]:
+        """
+        批量调用LLM，默认逐个调用，支持并发或批处理的实现可以覆盖
+        
+        Args:
+            requests: (系统提示词, 用户输入)列表
+            **kwargs: 所有请求共用的调用参数
+            
+        Returns:
+            与requests顺序一致的回复文本列表
+        """
+        return [self.invoke(system_prompt, user_prompt, **kwargs) for system_prompt, user_prompt in requests]
+    
     @abstractmethod
     def get_default_model(self) -> str:
         """
@@ -59,3 +101,68 @@ class BaseLLM(ABC):
         if response is None:
             return ""
         return response.strip()
+    
+    def build_messages(self, system_prompt: str, user_prompt: str) -> List[Dict[str, str]]:
+        """
+        构建对话消息，使不同段落和反思轮次之间共享尽可能长的提示词前缀
+        
+        Args:
+            system_prompt: 系统提示词
+            user_prompt: 用户输入
+            
+        Returns:
+            消息列表
+        """
+        return build_chat_messages(system_prompt, user_prompt)
+    
+    def get_cached_tokens(self, usage: Any) -> int:
+        """
+        从响应的usage中读取命中前缀缓存的token数
+        
+        Args:
+            usage: API响应中的usage对象
+            
+        Returns:
+            命中缓存的token数
+        """
+        details = getattr(usage, "prompt_tokens_details", None)
+        cached_tokens = getattr(details, "cached_tokens", None) if details is not None else None
+        return cached_tokens or 0
+    
+    def record_usage(self, usage: Any):
+        """
+        记录一次调用的token用量
+        
+        Args:
+            usage: API响应中的usage对象，可以为None
+        """
+        if usage is None:
+            return
+        
+        prompt_tokens = getattr(usage, "prompt_tokens", 0) or 0
+        completion_tokens = getattr(usage, "completion_tokens", 0) or 0
+        cached_tokens = self.get_cached_tokens(usage)
+        
+        with self._usage_lock:
+            self._usage["calls"] += 1
+            self._usage["prompt_tokens"] += prompt_tokens
+            self._usage["completion_tokens"] += completion_tokens
+            self._usage["cached_tokens"] += cached_tokens
+        
+        logger.debug("token用量: prompt=%d (缓存命中 %d), completion=%d",
+                     prompt_tokens, cached_tokens, completion_tokens)
+    
+    def get_usage_stats(self) -> Dict[str, Any]:
+        """
+        获取累计用量统计
+        
+        Returns:
+            包含调用次数、token数和前缀缓存命中率的字典
+        """
+        with self._usage_lock:
+            stats = dict(self._usage)
+        
+        stats["cache_hit_ratio"] = (
+            stats["cached_tokens"] / stats["prompt_tokens"] if stats["prompt_tokens"] else 0.0
+        )
+        return stats
@@ -0,0 +1,264 @@
+"""
+请求微批处理
+把同一进程内多个Agent并发发出的请求攒成一批，通过后端的batch_invoke一次提交
+"""
+
+import logging
+import threading
+import time
+import weakref
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+from .base import BaseLLM
+
+logger = logging.getLogger(__name__)
+
+
+class _PendingRequest:
+    """等待批处理的单个请求"""
+
+    __slots__ = ("system_prompt", "user_prompt", "kwargs", "future")
+
+    def __init__(self, system_prompt: str, user_prompt: str, kwargs: Dict[str, Any]):
+        self.system_prompt = system_prompt
+        self.user_prompt = user_prompt
+        self.kwargs = kwargs
+        self.future: Future = Future()
+
+
+def _params_key(kwargs: Dict[str, Any]) -> Tuple:
+    """生成调用参数的分组键，只有参数相同的请求才能放进同一批；node_name不影响生成结果"""
+    return tuple(sorted(
+        (key, tuple(value) if isinstance(value, list) else value)
+        for key, value in kwargs.items() if key != "node_name"
+    ))
+
+
+def _shutdown(condition: threading.Condition, queue: List[_PendingRequest], closed: threading.Event,
+              executor: ThreadPoolExecutor):
+    """关闭批处理器：停止后台线程，队列中尚未提交的请求收到异常，已提交的批次照常完成"""
+    with condition:
+        closed.set()
+        pending = list(queue)
+        queue.clear()
+        condition.notify_all()
+    for request in pending:
+        request.future.set_exception(RuntimeError("批处理器已关闭"))
+    executor.shutdown(wait=False)
+
+
+def _dispatch_loop(batcher_ref: "weakref.ref[BatchingLLM]", condition: threading.Condition,
+                   queue: List[_PendingRequest], closed: threading.Event,
+                   max_batch_size: int, max_wait: float):
+    """
+    后台线程：攒批并提交
+
+    线程只在提交批次时短暂持有批处理器，等待期间不引用它，批处理器不再被使用时可以被回收，
+    回收时的finalize会关闭线程。
+    """
+    while True:
+        with condition:
+            while not queue and not closed.is_set():
+                condition.wait()
+            if closed.is_set():
+                return
+
+            # 收到第一个请求后，在时间窗口内继续等待，直到攒满一批
+            deadline = time.monotonic() + max_wait
+            while len(queue) < max_batch_size and not closed.is_set():
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                condition.wait(remaining)
+
+            batch = queue[:max_batch_size]
+            del queue[:max_batch_size]
+
+        groups: Dict[Tuple, List[_PendingRequest]] = {}
+        for request in batch:
+            groups.setdefault(_params_key(request.kwargs), []).append(request)
+
+        batcher = batcher_ref()
+        try:
+            for group in groups.values():
+                if batcher is None:
+                    for request in group:
+                        request.future.set_exception(RuntimeError("批处理器已关闭"))
+                else:
+                    batcher._executor.submit(batcher._run_batch, group)
+        except RuntimeError as e:
+            # 提交过程中批处理器被关闭
+            for group in groups.values():
+                for request in group:
+                    if not request.future.done():
+                        request.future.set_exception(e)
+        finally:
+            del batcher
+
+
+class BatchingLLM(BaseLLM):
+    """
+    微批处理LLM
+
+    invoke会把请求放进队列并阻塞等待结果；后台线程在收到第一个请求后最多再等待max_wait_ms，
+    把这段时间内到达的请求按调用参数分组，每组通过后端的batch_invoke一次提交。
+    调用close()或实例被回收时停止后台线程和线程池。
+    """
+
+    # 进程内共享的批处理器，键由调用方的键和批处理参数组成；只保存弱引用，没有Agent使用时自动回收
+    _shared: "weakref.WeakValueDictionary[Hashable, BatchingLLM]" = weakref.WeakValueDictionary()
+    _shared_lock = threading.Lock()
+
+    def __init__(self, backend: BaseLLM, max_batch_size: int = 16, max_wait_ms: float = 5.0,
+                 max_inflight_batches: int = 4):
+        """
+        初始化微批处理LLM
+
+        Args:
+            backend: 实际执行请求的LLM客户端，应实现batch_invoke
+            max_batch_size: 每批最多包含的请求数
+            max_wait_ms: 收到第一个请求后等待更多请求的最长时间（毫秒）
+            max_inflight_batches: 同时执行的批次数
+        """
+        super().__init__(backend.api_key, backend.model_name)
+        self.backend = backend
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+
+        self._queue: List[_PendingRequest] = []
+        self._condition = threading.Condition()
+        self._closed = threading.Event()
+        self._executor = ThreadPoolExecutor(max_workers=max_inflight_batches, thread_name_prefix="llm-batch")
+        self._stats = {"requests": 0, "batches": 0, "max_batch_size": 0}
+        # finalize和后台线程都不能持有self，否则实例永远不会被回收
+        self._finalizer = weakref.finalize(self, _shutdown, self._condition, self._queue, self._closed,
+                                           self._executor)
+        self._dispatcher = threading.Thread(
+            target=_dispatch_loop, name="llm-batcher", daemon=True,
+            args=(weakref.ref(self), self._condition, self._queue, self._closed, self.max_batch_size, self.max_wait)
+        )
+        self._dispatcher.start()
+
+    @classmethod
+    def shared(cls, key: Hashable, factory: Callable[[], BaseLLM], **options: Any) -> "BatchingLLM":
+        """
+        获取进程内共享的批处理器，同一后端的所有Agent共用一个实例才能互相攒批
+
+        批处理参数不同的调用方使用不同的实例。调用方需要持有返回的实例；所有调用方都释放后，
+        实例被回收，后台线程随之停止，下次获取时重新创建。
+
+        Args:
+            key: 后端标识，如(服务地址, 模型名称)
+            factory: 首次创建时用于构造后端客户端的函数
+            **options: 传给BatchingLLM的参数
+
+        Returns:
+            共享的BatchingLLM实例
+        """
+        shared_key = (key, tuple(sorted(options.items())))
+        with cls._shared_lock:
+            batcher = cls._shared.get(shared_key)
+            if batcher is None:
+                batcher = cls(factory(), **options)
+                cls._shared[shared_key] = batcher
+            return batcher
+
+    def close(self):
+        """停止后台线程和线程池，队列中尚未提交的请求收到异常；可重复调用"""
+        self._finalizer()
+
+    @property
+    def closed(self) -> bool:
+        """是否已关闭"""
+        return self._closed.is_set()
+
+    @property
+    def default_model(self) -> str:
+        """后端调用时使用的模型名称（本地模型首次访问时才向服务端查询）"""
+        return getattr(self.backend, "default_model", self.backend.model_name)
+
+    def get_default_model(self) -> str:
+        """获取默认模型名称（后端的模型）"""
+        return self.backend.get_default_model()
+
+    def invoke(self, system_prompt: str, user_prompt: str, **kwargs) -> str:
+        """
+        提交请求并等待所在批次完成
+
+        Args:
+            system_prompt: 系统提示词
+            user_prompt: 用户输入
+            **kwargs: 其他参数，如temperature、max_tokens、stop等
+
+        Returns:
+            LLM生成的回复文本
+        """
+        request = _PendingRequest(system_prompt, user_prompt, kwargs)
+        with self._condition:
+            if self._closed.is_set():
+                raise RuntimeError("批处理器已关闭")
+            self._queue.append(request)
+            self._condition.notify()
+        return request.future.result()
+
+    def batch_invoke(self, requests: List[Tuple[str, str]], **kwargs) -> List[str]:
+        """批量请求直接交给后端"""
+        return self.backend.batch_invoke(requests, **kwargs)
+
+    def _run_batch(self, group: List[_PendingRequest]):
+        """执行一批参数相同的请求，并把结果或异常分发给各个等待者"""
+        with self._condition:
+            self._stats["requests"] += len(group)
+            self._stats["batches"] += 1
+            self._stats["max_batch_size"] = max(self._stats["max_batch_size"], len(group))
+
+        logger.debug("提交批次: %d 个请求", len(group))
+        try:
+            results = list(self.backend.batch_invoke(
+                [(request.system_prompt, request.user_prompt) for request in group],
+                **group[0].kwargs
+            ))
+        except Exception as e:
+            for request in group:
+                request.future.set_exception(e)
+            return
+
+        if len(results) != len(group):
+            logger.error("批次返回 %d 个结果，但提交了 %d 个请求", len(results), len(group))
+
+        for request, result in zip(group, results):
+            request.future.set_result(result)
+
+        # 后端返回的结果少于请求数时，没有对应结果的等待者收到异常，而不是一直阻塞
+        if len(results) < len(group):
+            error = RuntimeError(f"批处理后端返回 {len(results)} 个结果，少于提交的 {len(group)} 个请求")
+            for request in group[len(results):]:
+                request.future.set_exception(error)
+
+    def get_batch_stats(self) -> Dict[str, Any]:
+        """
+        获取批处理统计
+
+        Returns:
+            包含请求数、批次数、平均和最大批大小的字典
+        """
+        with self._condition:
+            stats = dict(self._stats)
+        stats["avg_batch_size"] = stats["requests"] / stats["batches"] if stats["batches"] else 0.0
+        return stats
+
+    def get_usage_stats(self) -> Dict[str, Any]:
+        """获取后端的累计用量统计"""
+        return self.backend.get_usage_stats()
+
+    def get_model_info(self) -> Dict[str, Any]:
+        """
+        获取模型信息
+
+        Returns:
+            后端模型信息，附带批处理参数
+        """
+        info = dict(self.backend.get_model_info()) if hasattr(self.backend, "get_model_info") else {}
+        info["batching"] = {"max_batch_size": self.max_batch_size, "max_wait_ms": self.max_wait * 1000.0}
+        return info
@@ -0,0 +1,182 @@
+"""
+相同请求合并
+多个调用方同时发出完全相同的请求时，只向提供商发出一次调用，所有等待者共享结果
+"""
+
+import hashlib
+import json
+import logging
+import threading
+import weakref
+from concurrent.futures import CancelledError, Future, TimeoutError as FutureTimeoutError
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+from .base import BaseLLM
+from .batching import _params_key
+
+logger = logging.getLogger(__name__)
+
+
+def _request_key(system_prompt: str, user_prompt: str, kwargs: Dict[str, Any]) -> str:
+    """按提示词和调用参数（不含node_name）计算请求哈希"""
+    payload = json.dumps([str(system_prompt), user_prompt, _params_key(kwargs)],
+                         ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class CoalescingLLM(BaseLLM):
+    """
+    合并并发相同请求的LLM
+
+    第一个到达的调用方在自己的线程里调用后端，调用期间到达的相同请求（提示词和调用参数都相同）
+    等待这次调用的结果。后端抛出异常时所有等待者收到同一异常；发起调用的线程被中断
+    （如KeyboardInterrupt）时等待者不会收到该中断，而是重新发起请求。调用结束后立即移除，
+    不缓存结果。temperature大于0时合并的请求会得到同一个采样结果。
+
+    通过shared()共享的合并器只有一个后端，用量统计是所有共用它的Agent的合计。
+    """
+
+    # 进程内共享的合并器，键由调用方决定（如提供商和模型）；只保存弱引用，没有Agent使用时自动移除
+    _shared: "weakref.WeakValueDictionary[Hashable, CoalescingLLM]" = weakref.WeakValueDictionary()
+    _shared_lock = threading.Lock()
+
+    def __init__(self, backend: BaseLLM, wait_timeout: Optional[float] = None):
+        """
+        初始化请求合并LLM
+
+        Args:
+            backend: 实际执行请求的LLM客户端
+            wait_timeout: 等待其他调用方发起的请求的最长时间（秒），超时后放弃等待并抛出TimeoutError，
+                          不影响发起调用的线程和其他等待者；None表示一直等待
+        """
+        super().__init__(backend.api_key, backend.model_name)
+        self.backend = backend
+        self.wait_timeout = wait_timeout
+
+        self._inflight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._stats = {"requests": 0, "provider_calls": 0, "coalesced": 0, "abandoned": 0}
+
+    @classmethod
+    def shared(cls, key: Hashable, factory: Callable[[], BaseLLM], **options: Any) -> "CoalescingLLM":
+        """
+        获取进程内共享的合并器，使用同一后端的所有Agent共用一个实例才能互相合并请求
+
+        调用方需要持有返回的实例；所有调用方都释放后，下次获取时会重新创建后端。
+
+        Args:
+            key: 后端标识，如(提供商, 模型名称)
+            factory: 首次创建时用于构造后端客户端的函数
+            **options: 首次创建时传给CoalescingLLM的参数
+
+        Returns:
+            共享的CoalescingLLM实例
+        """
+        with cls._shared_lock:
+            coalescer = cls._shared.get(key)
+            if coalescer is None:
+                coalescer = cls(factory(), **options)
+                cls._shared[key] = coalescer
+            return coalescer
+
+    @property
+    def default_model(self) -> str:
+        """后端调用时使用的模型名称（本地模型首次访问时才向服务端查询）"""
+        return getattr(self.backend, "default_model", self.backend.model_name)
+
+    def get_default_model(self) -> str:
+        """获取默认模型名称（后端的模型）"""
+        return self.backend.get_default_model()
+
+    def invoke(self, system_prompt: str, user_prompt: str, **kwargs) -> str:
+        """
+        调用后端，或等待进行中的相同请求
+
+        Args:
+            system_prompt: 系统提示词
+            user_prompt: 用户输入
+            **kwargs: 其他参数，如temperature、max_tokens、stop等
+
+        Returns:
+            LLM生成的回复文本
+        """
+        key = _request_key(system_prompt, user_prompt, kwargs)
+        with self._lock:
+            self._stats["requests"] += 1
+
+        while True:
+            with self._lock:
+                future = self._inflight.get(key)
+                leader = future is None
+                if leader:
+                    future = Future()
+                    self._inflight[key] = future
+                    self._stats["provider_calls"] += 1
+                else:
+                    self._stats["coalesced"] += 1
+
+            if leader:
+                return self._execute(key, future, system_prompt, user_prompt, **kwargs)
+
+            logger.debug("合并相同请求: %s", key[:12])
+            try:
+                return future.result(timeout=self.wait_timeout)
+            except CancelledError:
+                # 发起调用的线程被中断，重新发起请求
+                continue
+            except FutureTimeoutError:
+                with self._lock:
+                    self._stats["abandoned"] += 1
+                raise TimeoutError(f"等待相同请求超过 {self.wait_timeout} 秒仍未完成")
+
+    def _execute(self, key: str, future: Future, system_prompt: str, user_prompt: str, **kwargs) -> str:
+        """调用后端并把结果或异常交给等待者；先移除进行中的记录，之后到达的请求重新调用"""
+        try:
+            result = self.backend.invoke(system_prompt, user_prompt, **kwargs)
+        except Exception as e:
+            self._release(key)
+            future.set_exception(e)
+            raise
+        except BaseException:
+            self._release(key)
+            future.cancel()
+            raise
+
+        self._release(key)
+        future.set_result(result)
+        return result
+
+    def _release(self, key: str):
+        with self._lock:
+            self._inflight.pop(key, None)
+
+    def batch_invoke(self, requests: List[Tuple[str, str]], **kwargs) -> List[str]:
+        """批量请求直接交给后端"""
+        return self.backend.batch_invoke(requests, **kwargs)
+
+    def get_coalescing_stats(self) -> Dict[str, Any]:
+        """
+        获取请求合并统计
+
+        Returns:
+            包含请求数、实际调用数、合并数、放弃等待数和合并率的字典
+        """
+        with self._lock:
+            stats = dict(self._stats)
+        stats["coalesced_ratio"] = stats["coalesced"] / stats["requests"] if stats["requests"] else 0.0
+        return stats
+
+    def get_usage_stats(self) -> Dict[str, Any]:
+        """获取后端的累计用量统计（共享时为所有共用该后端的调用方的合计）"""
+        return self.backend.get_usage_stats()
+
+    def get_model_info(self) -> Dict[str, Any]:
+        """
+        获取模型信息
+
+        Returns:
+            后端模型信息，附带请求合并标记
+        """
+        info = dict(self.backend.get_model_info()) if hasattr(self.backend, "get_model_info") else {}
+        info["coalescing"] = True
+        return info
@@ -4,10 +4,12 @@ DeepSeek LLM实现
 """
 
 import os
+import logging
 from typing import Optional, Dict, Any
-from openai import OpenAI
 from .base import BaseLLM
 
+logger = logging.getLogger(__name__)
+
 
 class DeepSeekLLM(BaseLLM):
     """DeepSeek LLM实现类"""
@@ -27,14 +29,22 @@ class DeepSeekLLM(BaseLLM):
         
         super().__init__(api_key, model_name)
         
-        # 初始化OpenAI客户端，使用DeepSeek的endpoint
-        self.client = OpenAI(
-            api_key=self.api_key,
-            base_url="https://api.deepseek.com"
-        )
+        # OpenAI客户端在首次调用时创建
+        self._client = None
         
         self.default_model = model_name or self.get_default_model()
     
+    @property
+    def client(self):
+        """OpenAI客户端，使用DeepSeek的endpoint，首次访问时才导入openai并创建"""
+        if self._client is None:
+            from openai import OpenAI
+            self._client = OpenAI(
+                api_key=self.api_key,
+                base_url="https://api.deepseek.com"
+            )
+        return self._client
+    
     def get_default_model(self) -> str:
         """获取默认模型名称"""
         return "deepseek-chat"
@@ -46,17 +56,14 @@ class DeepSeekLLM(BaseLLM):
         Args:
             system_prompt: 系统提示词
             user_prompt: 用户输入
-            **kwargs: 其他参数，如temperature、max_tokens等
+            **kwargs: 其他参数，如temperature、max_tokens、stop等
             
         Returns:
             DeepSeek生成的回复文本
         """
         try:
             # 构建消息
-            messages = [
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt}
-            ]
+            messages = self.build_messages(system_prompt, user_prompt)
             
             # 设置默认参数
             params = {
@@ -67,8 +74,12 @@ class DeepSeekLLM(BaseLLM):
                 "stream": False
             }
             
+            if kwargs.get("stop"):
+                params["stop"] = kwargs["stop"]
+            
             # 调用API
             response = self.client.chat.completions.create(**params)
+            self.record_usage(getattr(response, "usage", None))
             
             # 提取回复内容
             if response.choices and response.choices[0].message:
@@ -90,7 +101,7 @@ class DeepSeekLLM(BaseLLM):
                     "3. 检查 API Key 是否正确配置\n"
                     f"错误详情: {error_message}"
                 )
-                print(detailed_error)
+                logger.error(detailed_error)
                 raise ValueError(detailed_error) from e
             elif "401" in error_message or "Invalid API Key" in error_message or "Unauthorized" in error_message:
                 detailed_error = (
@@ -101,7 +112,7 @@ class DeepSeekLLM(BaseLLM):
                     "3. 确保 API Key 没有过期或被撤销\n"
                     f"错误详情: {error_message}"
                 )
-                print(detailed_error)
+                logger.error(detailed_error)
                 raise ValueError(detailed_error) from e
             elif "429" in error_message or "Rate limit" in error_message:
                 detailed_error = (
@@ -112,13 +123,28 @@ class DeepSeekLLM(BaseLLM):
                     "3. 考虑升级 API 套餐以提高速率限制\n"
                     f"错误详情: {error_message}"
                 )
-                print(detailed_error)
+                logger.error(detailed_error)
                 raise ValueError(detailed_error) from e
             else:
                 detailed_error = f"DeepSeek API调用错误: {error_message}"
-                print(detailed_error)
+                logger.error(detailed_error)
                 raise e
     
+    def get_cached_tokens(self, usage: Any) -> int:
+        """
+        读取DeepSeek上下文硬盘缓存命中的token数
+        
+        Args:
+            usage: API响应中的usage对象
+            
+        Returns:
+            命中缓存的token数
+        """
+        cache_hit_tokens = getattr(usage, "prompt_cache_hit_tokens", None)
+        if cache_hit_tokens is not None:
+            return cache_hit_tokens
+        return super().get_cached_tokens(usage)
+    
     def get_model_info(self) -> Dict[str, Any]:
         """
         获取当前模型信息
@@ -0,0 +1,229 @@
+"""
+本地LLM实现
+通过OpenAI兼容接口调用本地部署的模型服务（如vLLM、llama.cpp server、Ollama）
+"""
+
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, Any, List, Tuple
+from .base import BaseLLM
+
+logger = logging.getLogger(__name__)
+
+# ChatML对话模板（Qwen等模型使用），completions批处理模式下用于把对话拼成单个提示词
+CHATML_TEMPLATE = (
+    "<|im_start|>system\n{system}<|im_end|>\n"
+    "<|im_start|>user\n{user}<|im_end|>\n"
+    "<|im_start|>assistant\n"
+)
+
+# 查询服务端模型列表失败后，至少间隔多久（秒）再重新查询
+MODEL_RETRY_INTERVAL = 60.0
+
+
+class LocalLLM(BaseLLM):
+    """本地OpenAI兼容模型服务的LLM实现类"""
+
+    def __init__(self, base_url: str = "http://localhost:8000/v1", model_name: Optional[str] = None,
+                 api_key: Optional[str] = None, max_concurrency: int = 4, timeout: float = 300.0,
+                 batch_mode: str = "concurrent", chat_template: str = CHATML_TEMPLATE,
+                 fallback_model: str = "default", model_list_timeout: float = 5.0):
+        """
+        初始化本地模型客户端
+
+        Args:
+            base_url: 本地服务的OpenAI兼容接口地址
+            model_name: 模型名称，不提供则使用服务端加载的第一个模型
+            api_key: 服务端要求的API密钥，大多数本地服务不需要
+            max_concurrency: 同时发往本地服务的最大请求数，避免CPU/GPU过载
+            timeout: 单次请求超时时间（秒），本地CPU模型生成较慢
+            batch_mode: 批量调用方式，concurrent为并发发出多个对话请求；
+                        completions为把多个提示词放进一次completions请求（需服务端支持提示词列表，如vLLM）
+            chat_template: completions模式下拼接对话的模板，包含{system}和{user}占位符
+            fallback_model: 未指定模型且无法从服务端获取模型列表时使用的模型名称
+            model_list_timeout: 查询服务端模型列表的超时时间（秒）
+        """
+        if batch_mode not in ("concurrent", "completions"):
+            raise ValueError(f"不支持的批量调用方式: {batch_mode}")
+
+        super().__init__(api_key or "EMPTY", model_name)
+
+        self.base_url = base_url
+        self.max_concurrency = max_concurrency
+        self.batch_mode = batch_mode
+        self.chat_template = chat_template
+        self.timeout = timeout
+        self.fallback_model = fallback_model
+        self.model_list_timeout = model_list_timeout
+        self._semaphore = threading.BoundedSemaphore(max_concurrency)
+
+        # OpenAI客户端在首次调用时创建；未指定模型时在首次调用时向服务端查询并缓存
+        self._client = None
+        self._default_model = model_name
+        self._default_model_lock = threading.Lock()
+        self._next_model_query = 0.0
+
+    @property
+    def client(self):
+        """OpenAI兼容客户端，首次访问时才导入openai并创建"""
+        if self._client is None:
+            from openai import OpenAI
+            # 本地服务不经过公网，失败时快速暴露问题而不是反复重试
+            self._client = OpenAI(api_key=self.api_key, base_url=self.base_url, timeout=self.timeout,
+                                  max_retries=1)
+        return self._client
+
+    @property
+    def default_model(self) -> str:
+        """
+        调用时使用的模型名称
+
+        未指定模型时首次访问才向服务端查询（超时为model_list_timeout），构造客户端时不发出网络请求；
+        查询成功后缓存，不再查询。服务端不可用时使用fallback_model而不抛出异常，
+        MODEL_RETRY_INTERVAL秒内的访问直接使用fallback_model，之后的访问再重新查询。
+        """
+        if self._default_model is not None:
+            return self._default_model
+        with self._default_model_lock:
+            if self._default_model is None:
+                if time.monotonic() < self._next_model_query:
+                    return self.fallback_model
+                model = self._fetch_server_model()
+                if model is None:
+                    self._next_model_query = time.monotonic() + MODEL_RETRY_INTERVAL
+                    return self.fallback_model
+                self._default_model = model
+            return self._default_model
+
+    def _fetch_server_model(self) -> Optional[str]:
+        """查询服务端加载的第一个模型，失败时返回None"""
+        try:
+            models = self.client.models.list(timeout=self.model_list_timeout)
+            if models.data:
+                return models.data[0].id
+        except Exception as e:
+            logger.warning("无法从本地服务 %s 获取模型列表: %s", self.base_url, e)
+        return None
+
+    def get_default_model(self) -> str:
+        """获取默认模型名称，与default_model相同（查询结果被缓存，失败时返回fallback_model，不抛出异常）"""
+        return self.default_model
+
+    def invoke(self, system_prompt: str, user_prompt: str, **kwargs) -> str:
+        """
+        调用本地模型生成回复，并发请求数受max_concurrency限制
+
+        Args:
+            system_prompt: 系统提示词
+            user_prompt: 用户输入
+            **kwargs: 其他参数，如temperature、max_tokens、stop等
+
+        Returns:
+            本地模型生成的回复文本
+        """
+        messages = self.build_messages(system_prompt, user_prompt)
+
+        params = {
+            "model": self.default_model,
+            "messages": messages,
+            "temperature": kwargs.get("temperature", 0.7),
+            "max_tokens": kwargs.get("max_tokens", 4000)
+        }
+
+        if kwargs.get("stop"):
+            params["stop"] = kwargs["stop"]
+
+        try:
+            with self._semaphore:
+                response = self.client.chat.completions.create(**params)
+            self.record_usage(getattr(response, "usage", None))
+
+            if response.choices and response.choices[0].message:
+                return self.validate_response(response.choices[0].message.content)
+            return ""
+
+        except Exception as e:
+            error_message = str(e)
+            if "Connection" in error_message or "connect" in error_message.lower():
+                detailed_error = (
+                    f"❌ 无法连接本地模型服务 {self.base_url}！\n"
+                    "📋 解决方案：\n"
+                    "1. 确认本地模型服务已启动\n"
+                    "2. 检查 config.py 中的 LOCAL_BASE_URL 是否正确（需包含 /v1）\n"
+                    f"错误详情: {error_message}"
+                )
+                logger.error(detailed_error)
+                raise ValueError(detailed_error) from e
+            logger.error("本地模型调用错误: %s", error_message)
+            raise e
+
+    def batch_invoke(self, requests: List[Tuple[str, str]], **kwargs) -> List[str]:
+        """
+        批量调用本地模型
+
+        concurrent模式下并发发出对话请求，实际并发数受max_concurrency限制；
+        completions模式下所有提示词通过一次请求提交，由服务端一起调度。
+
+        Args:
+            requests: (系统提示词, 用户输入)列表
+            **kwargs: 所有请求共用的调用参数
+
+        Returns:
+            与requests顺序一致的回复文本列表
+        """
+        if len(requests) <= 1:
+            return super().batch_invoke(requests, **kwargs)
+
+        if self.batch_mode == "completions":
+            return self._batch_complete(requests, **kwargs)
+
+        with ThreadPoolExecutor(max_workers=min(self.max_concurrency, len(requests))) as executor:
+            futures = [
+                executor.submit(self.invoke, system_prompt, user_prompt, **kwargs)
+                for system_prompt, user_prompt in requests
+            ]
+            return [future.result() for future in futures]
+
+    def _batch_complete(self, requests: List[Tuple[str, str]], **kwargs) -> List[str]:
+        """通过一次completions请求提交多个提示词"""
+        prompts = [
+            self.chat_template.format(system=str(system_prompt), user=user_prompt)
+            for system_prompt, user_prompt in requests
+        ]
+
+        params = {
+            "model": self.default_model,
+            "prompt": prompts,
+            "temperature": kwargs.get("temperature", 0.7),
+            "max_tokens": kwargs.get("max_tokens", 4000)
+        }
+
+        if kwargs.get("stop"):
+            params["stop"] = kwargs["stop"]
+
+        with self._semaphore:
+            response = self.client.completions.create(**params)
+        self.record_usage(getattr(response, "usage", None))
+
+        results = [""] * len(prompts)
+        for choice in response.choices:
+            results[choice.index] = self.validate_response(choice.text)
+        return results
+
+    def get_model_info(self) -> Dict[str, Any]:
+        """
+        获取当前模型信息
+
+        Returns:
+            模型信息字典
+        """
+        return {
+            "provider": "Local",
+            # 只报告配置的模型，不为获取模型信息向服务端查询；None表示使用服务端加载的模型
+            "model": self.model_name,
+            "api_base": self.base_url,
+            "max_concurrency": self.max_concurrency,
+            "batch_mode": self.batch_mode
+        }
@@ -0,0 +1,85 @@
+"""
+记忆节点输出的LLM
+相同的请求（节点、模型、提示词和调用参数都相同）直接返回记忆表中上次的回复
+"""
+
+import logging
+from typing import Any, Dict
+
+from .base import BaseLLM
+from .batching import _params_key
+from ..utils.memo import MemoStore
+
+logger = logging.getLogger(__name__)
+
+
+class MemoizedLLM(BaseLLM):
+    """
+    按请求记忆回复的LLM
+
+    键包含节点名（路由可能按节点选择模型）、后端模型信息、完整的提示词和调用参数，
+    提示词中的上游结果（段落内容、搜索结果、上一轮总结）变化时键也随之变化，
+    因此只有输入完全不变的节点会复用记录的回复。记录的是LLM原始回复，节点的解析照常执行。
+    """
+
+    def __init__(self, backend: BaseLLM, memo: MemoStore):
+        """
+        初始化记忆LLM
+
+        Args:
+            backend: 实际执行请求的LLM客户端
+            memo: 记忆表，可在多个研究和多个客户端之间共享
+        """
+        super().__init__(backend.api_key, backend.model_name)
+        self.backend = backend
+        self.memo = memo
+        self._model_info = backend.get_model_info() if hasattr(backend, "get_model_info") else {}
+
+    @property
+    def default_model(self) -> str:
+        """后端调用时使用的模型名称（本地模型首次访问时才向服务端查询）"""
+        return getattr(self.backend, "default_model", self.backend.model_name)
+
+    def get_default_model(self) -> str:
+        """获取默认模型名称（后端的模型）"""
+        return self.backend.get_default_model()
+
+    def invoke(self, system_prompt: str, user_prompt: str, **kwargs) -> str:
+        """
+        返回记录的回复，没有记录时调用后端并记录
+
+        Args:
+            system_prompt: 系统提示词
+            user_prompt: 用户输入
+            **kwargs: 其他参数，如temperature、max_tokens、stop等；节点调用时会附带node_name
+
+        Returns:
+            LLM生成的回复文本
+        """
+        key = MemoStore.make_key(
+            "llm", kwargs.get("node_name"), self._model_info,
+            str(system_prompt), user_prompt, _params_key(kwargs)
+        )
+        response = self.memo.get(key)
+        if response is not None:
+            logger.debug("复用节点输出: %s %s", kwargs.get("node_name"), key[:12])
+            return response
+
+        response = self.backend.invoke(system_prompt, user_prompt, **kwargs)
+        self.memo.put(key, response)
+        return response
+
+    def get_usage_stats(self) -> Dict[str, Any]:
+        """获取后端的累计用量统计（复用的回复不计入）"""
+        return self.backend.get_usage_stats()
+
+    def get_model_info(self) -> Dict[str, Any]:
+        """
+        获取模型信息
+
+        Returns:
+            后端模型信息，附带记忆标记
+        """
+        info = dict(self._model_info)
+        info["memoized"] = True
+        return info
@@ -4,10 +4,12 @@ OpenAI LLM实现
 """
 
 import os
+import logging
 from typing import Optional, Dict, Any
-from openai import OpenAI
 from .base import BaseLLM
 
+logger = logging.getLogger(__name__)
+
 
 class OpenAILLM(BaseLLM):
     """OpenAI LLM实现类"""
@@ -27,10 +29,18 @@ class OpenAILLM(BaseLLM):
         
         super().__init__(api_key, model_name)
         
-        # 初始化OpenAI客户端
-        self.client = OpenAI(api_key=self.api_key)
+        # OpenAI客户端在首次调用时创建
+        self._client = None
         self.default_model = model_name or self.get_default_model()
     
+    @property
+    def client(self):
+        """OpenAI客户端，首次访问时才导入openai并创建"""
+        if self._client is None:
+            from openai import OpenAI
+            self._client = OpenAI(api_key=self.api_key)
+        return self._client
+    
     def get_default_model(self) -> str:
         """获取默认模型名称"""
         return "gpt-4o-mini"
@@ -42,17 +52,14 @@ class OpenAILLM(BaseLLM):
         Args:
             system_prompt: 系统提示词
             user_prompt: 用户输入
-            **kwargs: 其他参数，如temperature、max_tokens等
+            **kwargs: 其他参数，如temperature、max_tokens、stop等
             
         Returns:
             OpenAI生成的回复文本
         """
         try:
             # 构建消息
-            messages = [
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt}
-            ]
+            messages = self.build_messages(system_prompt, user_prompt)
             
             # 设置默认参数
             params = {
@@ -62,8 +69,12 @@ class OpenAILLM(BaseLLM):
                 "max_tokens": kwargs.get("max_tokens", 4000)
             }
             
+            if kwargs.get("stop"):
+                params["stop"] = kwargs["stop"]
+            
             # 调用API
             response = self.client.chat.completions.create(**params)
+            self.record_usage(getattr(response, "usage", None))
             
             # 提取回复内容
             if response.choices and response.choices[0].message:
@@ -85,7 +96,7 @@ class OpenAILLM(BaseLLM):
                     "3. 或者切换到 DeepSeek 模型（在 config.py 中设置 DEEPSEEK_API_KEY 和 DEFAULT_LLM_PROVIDER='deepseek'）\n"
                     f"错误详情: {error_message}"
                 )
-                print(detailed_error)
+                logger.error(detailed_error)
                 raise ValueError(detailed_error) from e
             elif "401" in error_message or "Invalid API Key" in error_message or "Unauthorized" in error_message:
                 detailed_error = (
@@ -96,7 +107,7 @@ class OpenAILLM(BaseLLM):
                     "3. 确保 API Key 没有过期或被撤销\n"
                     f"错误详情: {error_message}"
                 )
-                print(detailed_error)
+                logger.error(detailed_error)
                 raise ValueError(detailed_error) from e
             elif "429" in error_message or "Rate limit" in error_message.lower():
                 detailed_error = (
@@ -107,11 +118,11 @@ class OpenAILLM(BaseLLM):
                     "3. 考虑升级 API 套餐以提高速率限制\n"
                     f"错误详情: {error_message}"
                 )
-                print(detailed_error)
+                logger.error(detailed_error)
                 raise ValueError(detailed_error) from e
             else:
                 detailed_error = f"OpenAI API调用错误: {error_message}"
-                print(detailed_error)
+                logger.error(detailed_error)
                 raise e
     
     def get_model_info(self) -> Dict[str, Any]:
@@ -0,0 +1,248 @@
+"""
+多提供商LLM路由
+按节点类型选择提供商，出错时故障转移，并可在超过延迟阈值后发出对冲请求
+"""
+
+import logging
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Dict, List, Optional
+
+from .base import BaseLLM
+
+logger = logging.getLogger(__name__)
+
+
+class RoutingLLM(BaseLLM):
+    """多提供商路由LLM实现类"""
+
+    def __init__(self, providers: Dict[str, BaseLLM], default_route: Optional[List[str]] = None,
+                 routes: Optional[Dict[str, List[str]]] = None, hedge_after: Optional[float] = None,
+                 max_workers: int = 16):
+        """
+        初始化路由LLM
+
+        Args:
+            providers: 提供商名称到LLM客户端的映射
+            default_route: 默认的提供商顺序，第一个为主提供商，其余依次用于故障转移和对冲
+            routes: 节点名称到提供商顺序的映射，如{"FirstSearchNode": ["openai", "deepseek"]}
+            hedge_after: 对冲阈值（秒），主请求超过该时间未返回时向下一个提供商发出对冲请求，
+                         None表示不对冲
+            max_workers: 执行请求的最大线程数
+        """
+        if not providers:
+            raise ValueError("RoutingLLM至少需要一个提供商")
+
+        self.providers = providers
+        self.default_route = default_route or list(providers)
+        self.routes = routes or {}
+        self.hedge_after = hedge_after
+
+        for name in self.default_route + [name for route in self.routes.values() for name in route]:
+            if name not in providers:
+                raise ValueError(f"路由中引用了未配置的提供商: {name}")
+
+        primary = providers[self.default_route[0]]
+        super().__init__(primary.api_key, primary.model_name)
+
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="llm-router")
+        self._metrics_lock = threading.Lock()
+        self._metrics = {
+            "requests": 0,
+            "failovers": 0,
+            "hedges_issued": 0,
+            "hedges_won": 0,
+            "providers": {name: {"calls": 0, "errors": 0, "total_latency": 0.0} for name in providers}
+        }
+
+    @property
+    def default_model(self) -> str:
+        """主提供商调用时使用的模型名称"""
+        primary = self.providers[self.default_route[0]]
+        return getattr(primary, "default_model", primary.model_name)
+
+    def get_default_model(self) -> str:
+        """获取默认模型名称（主提供商的模型）"""
+        return self.providers[self.default_route[0]].get_default_model()
+
+    def get_route(self, node_name: Optional[str] = None) -> List[str]:
+        """
+        获取节点对应的提供商顺序
+
+        Args:
+            node_name: 节点名称
+
+        Returns:
+            提供商名称列表
+        """
+        if node_name and node_name in self.routes:
+            return self.routes[node_name]
+        return self.default_route
+
+    def invoke(self, system_prompt: str, user_prompt: str, **kwargs) -> str:
+        """
+        按路由调用LLM
+
+        Args:
+            system_prompt: 系统提示词
+            user_prompt: 用户输入
+            **kwargs: 其他参数，node_name用于选择路由
+
+        Returns:
+            最先成功返回的回复文本
+        """
+        route = self.get_route(kwargs.get("node_name"))
+        self._increment("requests")
+
+        if self.hedge_after is None or len(route) < 2:
+            return self._invoke_with_failover(route, system_prompt, user_prompt, **kwargs)
+        return self._invoke_hedged(route, system_prompt, user_prompt, **kwargs)
+
+    def _call_provider(self, name: str, system_prompt: str, user_prompt: str, **kwargs) -> str:
+        """调用单个提供商并记录延迟和错误"""
+        start = time.perf_counter()
+        try:
+            return self.providers[name].invoke(system_prompt, user_prompt, **kwargs)
+        except Exception:
+            with self._metrics_lock:
+                self._metrics["providers"][name]["errors"] += 1
+            raise
+        finally:
+            with self._metrics_lock:
+                provider_metrics = self._metrics["providers"][name]
+                provider_metrics["calls"] += 1
+                provider_metrics["total_latency"] += time.perf_counter() - start
+
+    def _invoke_with_failover(self, route: List[str], system_prompt: str, user_prompt: str, **kwargs) -> str:
+        """依次尝试路由中的提供商，直到成功"""
+        last_error: Optional[Exception] = None
+        for i, name in enumerate(route):
+            if i > 0:
+                self._increment("failovers")
+                logger.warning("LLM提供商故障转移: %s -> %s", route[i - 1], name)
+            try:
+                return self._call_provider(name, system_prompt, user_prompt, **kwargs)
+            except Exception as e:
+                last_error = e
+                logger.warning("LLM提供商 %s 调用失败: %s", name, e)
+        raise last_error
+
+    def _invoke_hedged(self, route: List[str], system_prompt: str, user_prompt: str, **kwargs) -> str:
+        """
+        对冲调用：主请求超过阈值未返回时，向下一个提供商再发一个请求，取最先成功的结果；
+        请求失败时立即转移到下一个提供商
+        """
+        remaining = list(route)
+        pending: Dict[Future, str] = {}
+        hedge_names = set()
+        last_error: Optional[Exception] = None
+
+        def submit(name: str):
+            future = self._executor.submit(self._call_provider, name, system_prompt, user_prompt, **kwargs)
+            pending[future] = name
+
+        submit(remaining.pop(0))
+        hedged = False
+
+        try:
+            while pending:
+                timeout = self.hedge_after if (not hedged and remaining) else None
+                done, _ = wait(list(pending), timeout=timeout, return_when=FIRST_COMPLETED)
+
+                if not done:
+                    # 超过阈值仍未返回，发出对冲请求
+                    name = remaining.pop(0)
+                    hedged = True
+                    hedge_names.add(name)
+                    self._increment("hedges_issued")
+                    logger.debug("LLM请求超过 %.2f 秒，向 %s 发出对冲请求", self.hedge_after, name)
+                    submit(name)
+                    continue
+
+                for future in done:
+                    name = pending.pop(future)
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        last_error = e
+                        logger.warning("LLM提供商 %s 调用失败: %s", name, e)
+                        continue
+
+                    if name in hedge_names:
+                        self._increment("hedges_won")
+                    return result
+
+                # 所有在途请求都失败时转移到下一个提供商
+                if not pending and remaining:
+                    self._increment("failovers")
+                    submit(remaining.pop(0))
+        finally:
+            # 尚未开始的请求直接取消，已在执行的请求结果将被丢弃
+            for future in pending:
+                future.cancel()
+
+        raise last_error
+
+    def _increment(self, metric: str):
+        """累加路由指标"""
+        with self._metrics_lock:
+            self._metrics[metric] += 1
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """
+        获取路由指标
+
+        Returns:
+            包含请求数、故障转移次数、对冲发出/获胜次数以及各提供商调用统计的字典
+        """
+        with self._metrics_lock:
+            metrics = {key: value for key, value in self._metrics.items() if key != "providers"}
+            metrics["providers"] = {}
+            for name, provider_metrics in self._metrics["providers"].items():
+                calls = provider_metrics["calls"]
+                metrics["providers"][name] = {
+                    "calls": calls,
+                    "errors": provider_metrics["errors"],
+                    "avg_latency": provider_metrics["total_latency"] / calls if calls else 0.0
+                }
+        return metrics
+
+    def get_usage_stats(self) -> Dict[str, Any]:
+        """
+        汇总所有提供商的用量统计
+
+        Returns:
+            累计用量统计字典
+        """
+        totals = {"calls": 0, "prompt_tokens": 0, "completion_tokens": 0, "cached_tokens": 0}
+        for provider in self.providers.values():
+            stats = provider.get_usage_stats()
+            for key in totals:
+                totals[key] += stats.get(key, 0)
+
+        totals["cache_hit_ratio"] = (
+            totals["cached_tokens"] / totals["prompt_tokens"] if totals["prompt_tokens"] else 0.0
+        )
+        return totals
+
+    def get_model_info(self) -> Dict[str, Any]:
+        """
+        获取路由及各提供商的模型信息
+
+        Returns:
+            模型信息字典
+        """
+        providers = {
+            name: provider.get_model_info() if hasattr(provider, "get_model_info") else {}
+            for name, provider in self.providers.items()
+        }
+        return {
+            "provider": "Router",
+            # 使用主提供商报告的模型，不为获取模型信息触发本地模型的服务端查询
+            "model": providers[self.default_route[0]].get("model", self.model_name),
+            "default_route": self.default_route,
+            "routes": self.routes,
+            "hedge_after": self.hedge_after,
+            "providers": providers
+        }
@@ -3,25 +3,37 @@
 定义所有处理节点的基础接口
 """
 
+import logging
 from abc import ABC, abstractmethod
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional, Tuple
 from ..llms.base import BaseLLM
 from ..state.state import State
+from ..utils.text_processing import restore_stop_sequence
 
 
 class BaseNode(ABC):
     """节点基类"""
     
-    def __init__(self, llm_client: BaseLLM, node_name: str = ""):
+    # 节点默认的最大输出长度，None表示使用客户端默认值
+    DEFAULT_MAX_TOKENS: Optional[int] = None
+    
+    # 节点默认的停止序列，输出JSON的节点在闭合括号处停止，避免模型在JSON之后继续生成
+    STOP_SEQUENCES: Optional[List[str]] = None
+    
+    def __init__(self, llm_client: BaseLLM, node_name: str = "", max_tokens: Optional[int] = None):
         """
         初始化节点
         
         Args:
             llm_client: LLM客户端
             node_name: 节点名称
+            max_tokens: 该节点调用LLM时的最大输出长度，None表示使用DEFAULT_MAX_TOKENS
         """
         self.llm_client = llm_client
         self.node_name = node_name or self.__class__.__name__
+        self.max_tokens = max_tokens if max_tokens is not None else self.DEFAULT_MAX_TOKENS
+        self.stop_sequences = list(self.STOP_SEQUENCES) if self.STOP_SEQUENCES else None
+        self.logger = logging.getLogger(f"{__package__}.{self.node_name}")
     
     @abstractmethod
     def run(self, input_data: Any, **kwargs) -> Any:
@@ -61,13 +73,76 @@ class BaseNode(ABC):
         """
         return output
     
+    @abstractmethod
+    def build_request(self, input_data: Any, **kwargs) -> Tuple[str, str]:
+        """
+        构建LLM请求但不调用LLM
+        
+        run用它构建请求后调用LLM；批处理模式用它收集各节点的请求，统一提交后再用parse_response解析结果
+        
+        Args:
+            input_data: 输入数据
+            **kwargs: 额外参数
+            
+        Returns:
+            (系统提示词, 用户输入)
+        """
+        pass
+    
+    def parse_response(self, response: str, **kwargs) -> Any:
+        """
+        将LLM原始输出解析为节点结果
+        
+        停止序列不会出现在模型输出中，这里先补回被截掉的闭合括号，再交给process_output
+        
+        Args:
+            response: LLM原始输出
+            **kwargs: 额外参数
+            
+        Returns:
+            节点结果
+        """
+        if self.stop_sequences:
+            response = restore_stop_sequence(response, self.stop_sequences)
+        return self.process_output(response)
+    
+    def get_llm_params(self) -> Dict[str, Any]:
+        """
+        获取节点调用LLM时使用的参数
+        
+        Returns:
+            包含node_name以及（如有）max_tokens和stop的字典
+        """
+        params: Dict[str, Any] = {"node_name": self.node_name}
+        if self.max_tokens is not None:
+            params["max_tokens"] = self.max_tokens
+        if self.stop_sequences:
+            params["stop"] = list(self.stop_sequences)
+        return params
+    
+    def invoke_llm(self, system_prompt: str, user_prompt: str, **kwargs) -> str:
+        """
+        调用LLM，附带节点名称以便路由到对应的模型，以及节点的最大输出长度和停止序列
+        
+        Args:
+            system_prompt: 系统提示词
+            user_prompt: 用户输入
+            **kwargs: 其他调用参数，优先于节点参数
+            
+        Returns:
+            LLM生成的回复文本
+        """
+        for key, value in self.get_llm_params().items():
+            kwargs.setdefault(key, value)
+        return self.llm_client.invoke(system_prompt, user_prompt, **kwargs)
+    
     def log_info(self, message: str):
         """记录信息日志"""
-        print(f"[{self.node_name}] {message}")
+        self.logger.info(message)
     
     def log_error(self, message: str):
         """记录错误日志"""
-        print(f"[{self.node_name}] 错误: {message}")
+        self.logger.error(message)
 
 
 class StateMutationNode(BaseNode):
@@ -4,11 +4,12 @@
 """
 
 import json
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple
 
 from .base_node import BaseNode
-from ..prompts import SYSTEM_PROMPT_REPORT_FORMATTING, get_report_formatting_prompt
+from ..prompts import SYSTEM_PROMPT_REPORT_FORMATTING, prompt_registry
 from ..utils.text_processing import (
+    dump_prompt_input,
     remove_reasoning_from_output,
     clean_markdown_tags
 )
@@ -17,15 +18,19 @@ from ..utils.text_processing import (
 class ReportFormattingNode(BaseNode):
     """格式化最终报告的节点"""
     
-    def __init__(self, llm_client, time_horizon: str = None):
+    # 输出完整的Markdown报告，不设置停止序列
+    DEFAULT_MAX_TOKENS = 4000
+    
+    def __init__(self, llm_client, time_horizon: str = None, max_tokens: Optional[int] = None):
         """
         初始化报告格式化节点
         
         Args:
             llm_client: LLM客户端
             time_horizon: 时间范围（未来简事专用）
+            max_tokens: 最大输出长度，None表示使用节点默认值DEFAULT_MAX_TOKENS
         """
-        super().__init__(llm_client, "ReportFormattingNode")
+        super().__init__(llm_client, "ReportFormattingNode", max_tokens=max_tokens)
         self.time_horizon = time_horizon
     
     def validate_input(self, input_data: Any) -> bool:
@@ -61,25 +66,14 @@ class ReportFormattingNode(BaseNode):
             if not self.validate_input(input_data):
                 raise ValueError("输入数据格式错误，需要包含title和paragraph_latest_state的列表")
             
-            # 准备输入数据
-            if isinstance(input_data, str):
-                message = input_data
-            else:
-                message = json.dumps(input_data, ensure_ascii=False)
-            
             self.log_info("正在格式化最终报告")
             
-            # 选择提示词
-            if self.time_horizon:
-                prompt = get_report_formatting_prompt(self.time_horizon)
-            else:
-                prompt = SYSTEM_PROMPT_REPORT_FORMATTING
-            
             # 调用LLM
-            response = self.llm_client.invoke(prompt, message)
+            prompt, message = self.build_request(input_data, **kwargs)
+            response = self.invoke_llm(prompt, message)
             
             # 处理响应
-            processed_response = self.process_output(response)
+            processed_response = self.parse_response(response, **kwargs)
             
             self.log_info("成功生成格式化报告")
             return processed_response
@@ -88,6 +82,31 @@ class ReportFormattingNode(BaseNode):
             self.log_error(f"报告格式化失败: {str(e)}")
             raise e
     
+    def build_request(self, input_data: Any, **kwargs) -> Tuple[str, str]:
+        """
+        构建报告格式化请求
+        
+        Args:
+            input_data: 包含所有段落信息的列表
+            **kwargs: 额外参数
+            
+        Returns:
+            (系统提示词, 用户输入)
+        """
+        # 准备输入数据
+        if isinstance(input_data, str):
+            message = input_data
+        else:
+            message = dump_prompt_input(input_data)
+        
+        # 选择提示词
+        if self.time_horizon:
+            prompt = prompt_registry.render("report_formatting", time_horizon=self.time_horizon)
+        else:
+            prompt = SYSTEM_PROMPT_REPORT_FORMATTING
+        
+        return prompt, message
+    
     def process_output(self, output: str) -> str:
         """
         处理LLM输出，清理Markdown格式
@@ -4,12 +4,12 @@
 """
 
 import json
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Tuple
 from json.decoder import JSONDecodeError
 
 from .base_node import StateMutationNode
 from ..state.state import State
-from ..prompts import SYSTEM_PROMPT_REPORT_STRUCTURE, get_report_structure_prompt
+from ..prompts import SYSTEM_PROMPT_REPORT_STRUCTURE, prompt_registry
 from ..utils.text_processing import (
     remove_reasoning_from_output,
     clean_json_tags,
@@ -20,7 +20,12 @@ from ..utils.text_processing import (
 class ReportStructureNode(StateMutationNode):
     """生成报告结构的节点"""
     
-    def __init__(self, llm_client, query: str, time_horizon: str = None, analysis_angles: list = None):
+    # 输出段落列表（JSON数组），在数组闭合处停止
+    DEFAULT_MAX_TOKENS = 1500
+    STOP_SEQUENCES = ["\n]"]
+    
+    def __init__(self, llm_client, query: str, time_horizon: str = None, analysis_angles: list = None,
+                 max_tokens: Optional[int] = None):
         """
         初始化报告结构节点
         
@@ -29,8 +34,9 @@ class ReportStructureNode(StateMutationNode):
             query: 用户查询
             time_horizon: 时间范围（未来简事专用）
             analysis_angles: 分析角度列表（未来简事专用）
+            max_tokens: 最大输出长度，None表示使用节点默认值DEFAULT_MAX_TOKENS
         """
-        super().__init__(llm_client, "ReportStructureNode")
+        super().__init__(llm_client, "ReportStructureNode", max_tokens=max_tokens)
         self.query = query
         self.time_horizon = time_horizon
         self.analysis_angles = analysis_angles
@@ -83,27 +89,12 @@ class ReportStructureNode(StateMutationNode):
         try:
             self.log_info(f"正在为查询生成报告结构: {self.query}")
             
-            # 澄清模糊查询
-            clarified_query = self._clarify_vague_query(self.query)
-            
-            # 选择提示词
-            if self.time_horizon:
-                # 使用未来简事专用提示词
-                prompt = get_report_structure_prompt(self.time_horizon, self.analysis_angles)
-                # 构建增强的查询
-                enhanced_query = clarified_query
-                if self.time_horizon:
-                    enhanced_query = f"未来{self.time_horizon}内，{clarified_query}"
-            else:
-                # 使用默认提示词
-                prompt = SYSTEM_PROMPT_REPORT_STRUCTURE
-                enhanced_query = clarified_query
-            
             # 调用LLM
-            response = self.llm_client.invoke(prompt, enhanced_query)
+            prompt, enhanced_query = self.build_request(input_data, **kwargs)
+            response = self.invoke_llm(prompt, enhanced_query)
             
             # 处理响应
-            processed_response = self.process_output(response)
+            processed_response = self.parse_response(response, **kwargs)
             
             self.log_info(f"成功生成 {len(processed_response)} 个段落结构")
             return processed_response
@@ -112,6 +103,37 @@ class ReportStructureNode(StateMutationNode):
             self.log_error(f"生成报告结构失败: {str(e)}")
             raise e
     
+    def build_request(self, input_data: Any = None, **kwargs) -> Tuple[str, str]:
+        """
+        构建报告结构请求
+        
+        Args:
+            input_data: 输入数据（这里不使用，使用初始化时的query）
+            **kwargs: 额外参数
+            
+        Returns:
+            (系统提示词, 增强后的查询)
+        """
+        # 澄清模糊查询
+        clarified_query = self._clarify_vague_query(self.query)
+        
+        # 选择提示词
+        if self.time_horizon:
+            # 使用未来简事专用提示词
+            prompt = prompt_registry.render(
+                "report_structure",
+                time_horizon=self.time_horizon,
+                analysis_angles=self.analysis_angles
+            )
+            # 构建增强的查询
+            enhanced_query = f"未来{self.time_horizon}内，{clarified_query}"
+        else:
+            # 使用默认提示词
+            prompt = SYSTEM_PROMPT_REPORT_STRUCTURE
+            enhanced_query = clarified_query
+        
+        return prompt, enhanced_query
+    
     def process_output(self, output: str) -> List[Dict[str, str]]:
         """
         处理LLM输出，提取报告结构
@@ -188,7 +210,24 @@ class ReportStructureNode(StateMutationNode):
         try:
             # 生成报告结构
             report_structure = self.run(input_data, **kwargs)
+            return self.apply_structure(report_structure, state)
             
+        except Exception as e:
+            self.log_error(f"状态更新失败: {str(e)}")
+            raise e
+    
+    def apply_structure(self, report_structure: List[Dict[str, str]], state: State) -> State:
+        """
+        将已生成的报告结构写入状态
+        
+        Args:
+            report_structure: 报告结构列表
+            state: 当前状态
+            
+        Returns:
+            更新后的状态
+        """
+        try:
             # 设置查询和报告标题
             state.query = self.query
             if not state.report_title:
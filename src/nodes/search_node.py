@@ -4,13 +4,14 @@
 """
 
 import json
-from typing import Dict, Any
+from typing import Dict, Any, Optional, Tuple
 from datetime import datetime
 from json.decoder import JSONDecodeError
 
 from .base_node import BaseNode
-from ..prompts import SYSTEM_PROMPT_FIRST_SEARCH, SYSTEM_PROMPT_REFLECTION, get_first_search_prompt, get_reflection_prompt
+from ..prompts import SYSTEM_PROMPT_FIRST_SEARCH, SYSTEM_PROMPT_REFLECTION, prompt_registry
 from ..utils.text_processing import (
+    dump_prompt_input,
     remove_reasoning_from_output,
     clean_json_tags,
     extract_clean_response
@@ -20,15 +21,20 @@ from ..utils.text_processing import (
 class FirstSearchNode(BaseNode):
     """为段落生成首次搜索查询的节点"""
     
-    def __init__(self, llm_client, time_horizon: str = None):
+    # 只输出包含search_query和reasoning的小JSON对象
+    DEFAULT_MAX_TOKENS = 512
+    STOP_SEQUENCES = ["\n}"]
+    
+    def __init__(self, llm_client, time_horizon: str = None, max_tokens: Optional[int] = None):
         """
         初始化首次搜索节点
         
         Args:
             llm_client: LLM客户端
             time_horizon: 时间范围（未来简事专用）
+            max_tokens: 最大输出长度，None表示使用节点默认值DEFAULT_MAX_TOKENS
         """
-        super().__init__(llm_client, "FirstSearchNode")
+        super().__init__(llm_client, "FirstSearchNode", max_tokens=max_tokens)
         self.time_horizon = time_horizon
     
     def validate_input(self, input_data: Any) -> bool:
@@ -58,51 +64,14 @@ class FirstSearchNode(BaseNode):
             if not self.validate_input(input_data):
                 raise ValueError("输入数据格式错误，需要包含title和content字段")
             
-            # 准备输入数据
-            if isinstance(input_data, str):
-                message = input_data
-            else:
-                message = json.dumps(input_data, ensure_ascii=False)
-            
             self.log_info("正在生成首次搜索查询")
             
-            # 优化输入：移除段落内容中的模糊关键词，保留核心信息
-            if isinstance(input_data, dict):
-                title = input_data.get("title", "")
-                content = input_data.get("content", "")
-                # 从标题和内容中提取关键信息，移除模糊词汇
-                optimized_input = {
-                    "title": self._extract_key_concepts(title),
-                    "content": self._extract_key_concepts(content)
-                }
-                message = json.dumps(optimized_input, ensure_ascii=False)
-            
-            # 选择提示词
-            if self.time_horizon:
-                # 获取当前日期
-                now = datetime.now()
-                current_date = f"{now.year}年{now.month}月{now.day}日"
-                prompt = get_first_search_prompt(self.time_horizon, current_date)
-            else:
-                prompt = SYSTEM_PROMPT_FIRST_SEARCH
-            
             # 调用LLM
-            response = self.llm_client.invoke(prompt, message)
+            prompt, message = self.build_request(input_data, **kwargs)
+            response = self.invoke_llm(prompt, message)
             
             # 处理响应
-            processed_response = self.process_output(response)
-            
-            # 清理搜索查询中的模糊关键词
-            if processed_response.get('search_query'):
-                processed_response['search_query'] = self._clean_search_query(
-                    processed_response['search_query']
-                )
-            
-            # 确保搜索查询包含正确的日期信息
-            if self.time_horizon and processed_response.get('search_query'):
-                processed_response = self._enhance_search_query_with_date(
-                    processed_response, self.time_horizon
-                )
+            processed_response = self.parse_response(response, **kwargs)
             
             self.log_info(f"生成搜索查询: {processed_response.get('search_query', 'N/A')}")
             return processed_response
@@ -111,6 +80,68 @@ class FirstSearchNode(BaseNode):
             self.log_error(f"生成首次搜索查询失败: {str(e)}")
             raise e
     
+    def build_request(self, input_data: Any, **kwargs) -> Tuple[str, str]:
+        """
+        构建首次搜索查询请求
+        
+        Args:
+            input_data: 包含title和content的字符串或字典
+            **kwargs: 额外参数
+            
+        Returns:
+            (系统提示词, 用户输入)
+        """
+        # 准备输入数据
+        if isinstance(input_data, str):
+            message = input_data
+        else:
+            # 优化输入：移除段落内容中的模糊关键词，保留核心信息
+            optimized_input = {
+                "title": self._extract_key_concepts(input_data.get("title", "")),
+                "content": self._extract_key_concepts(input_data.get("content", ""))
+            }
+            message = dump_prompt_input(optimized_input)
+        
+        # 选择提示词
+        if self.time_horizon:
+            # 获取当前日期
+            now = datetime.now()
+            current_date = f"{now.year}年{now.month}月{now.day}日"
+            prompt = prompt_registry.render(
+                "first_search", time_horizon=self.time_horizon, current_date=current_date
+            )
+        else:
+            prompt = SYSTEM_PROMPT_FIRST_SEARCH
+        
+        return prompt, message
+    
+    def parse_response(self, response: str, **kwargs) -> Dict[str, str]:
+        """
+        解析LLM输出，并清理和补全搜索查询
+        
+        Args:
+            response: LLM原始输出
+            **kwargs: 额外参数
+            
+        Returns:
+            包含search_query和reasoning的字典
+        """
+        processed_response = super().parse_response(response, **kwargs)
+        
+        # 清理搜索查询中的模糊关键词
+        if processed_response.get('search_query'):
+            processed_response['search_query'] = self._clean_search_query(
+                processed_response['search_query']
+            )
+        
+        # 确保搜索查询包含正确的日期信息
+        if self.time_horizon and processed_response.get('search_query'):
+            processed_response = self._enhance_search_query_with_date(
+                processed_response, self.time_horizon
+            )
+        
+        return processed_response
+    
     def process_output(self, output: str) -> Dict[str, str]:
         """
         处理LLM输出，提取搜索查询和推理
@@ -270,15 +301,19 @@ class FirstSearchNode(BaseNode):
 class ReflectionNode(BaseNode):
     """反思段落并生成新搜索查询的节点"""
     
-    def __init__(self, llm_client, time_horizon: str = None):
+    DEFAULT_MAX_TOKENS = 512
+    STOP_SEQUENCES = ["\n}"]
+    
+    def __init__(self, llm_client, time_horizon: str = None, max_tokens: Optional[int] = None):
         """
         初始化反思节点
         
         Args:
             llm_client: LLM客户端
             time_horizon: 时间范围（未来简事专用）
+            max_tokens: 最大输出长度，None表示使用节点默认值DEFAULT_MAX_TOKENS
         """
-        super().__init__(llm_client, "ReflectionNode")
+        super().__init__(llm_client, "ReflectionNode", max_tokens=max_tokens)
         self.time_horizon = time_horizon
     
     def validate_input(self, input_data: Any) -> bool:
@@ -301,7 +336,7 @@ class ReflectionNode(BaseNode):
         
         Args:
             input_data: 包含title、content和paragraph_latest_state的字符串或字典
-            **kwargs: 额外参数
+            **kwargs: 额外参数，reflection_iteration为反思轮次
             
         Returns:
             包含search_query和reasoning的字典
@@ -310,43 +345,14 @@ class ReflectionNode(BaseNode):
             if not self.validate_input(input_data):
                 raise ValueError("输入数据格式错误，需要包含title、content和paragraph_latest_state字段")
             
-            # 准备输入数据
-            if isinstance(input_data, str):
-                message = input_data
-            else:
-                message = json.dumps(input_data, ensure_ascii=False)
-            
             self.log_info("正在进行反思并生成新搜索查询")
             
-            # 获取反思轮次（从kwargs中获取，如果没有则默认为0）
-            reflection_iteration = kwargs.get('reflection_iteration', 0)
-            
-            # 选择提示词
-            if self.time_horizon:
-                # 获取当前日期
-                now = datetime.now()
-                current_date = f"{now.year}年{now.month}月{now.day}日"
-                prompt = get_reflection_prompt(self.time_horizon, current_date, reflection_iteration)
-            else:
-                prompt = SYSTEM_PROMPT_REFLECTION
-            
             # 调用LLM
-            response = self.llm_client.invoke(prompt, message)
+            prompt, message = self.build_request(input_data, **kwargs)
+            response = self.invoke_llm(prompt, message)
             
             # 处理响应
-            processed_response = self.process_output(response)
-            
-            # 清理搜索查询中的模糊关键词
-            if processed_response.get('search_query'):
-                processed_response['search_query'] = self._clean_search_query(
-                    processed_response['search_query']
-                )
-            
-            # 确保搜索查询包含正确的日期信息
-            if self.time_horizon and processed_response.get('search_query'):
-                processed_response = self._enhance_search_query_with_date(
-                    processed_response, self.time_horizon
-                )
+            processed_response = self.parse_response(response, **kwargs)
             
             self.log_info(f"反思生成搜索查询: {processed_response.get('search_query', 'N/A')}")
             return processed_response
@@ -355,6 +361,70 @@ class ReflectionNode(BaseNode):
             self.log_error(f"反思生成搜索查询失败: {str(e)}")
             raise e
     
+    def build_request(self, input_data: Any, **kwargs) -> Tuple[str, str]:
+        """
+        构建反思搜索查询请求
+        
+        Args:
+            input_data: 包含title、content和paragraph_latest_state的字符串或字典
+            **kwargs: 额外参数，reflection_iteration为反思轮次
+            
+        Returns:
+            (系统提示词, 用户输入)
+        """
+        # 准备输入数据
+        if isinstance(input_data, str):
+            message = input_data
+        else:
+            message = dump_prompt_input(input_data)
+        
+        # 获取反思轮次（从kwargs中获取，如果没有则默认为0）
+        reflection_iteration = kwargs.get('reflection_iteration', 0)
+        
+        # 选择提示词
+        if self.time_horizon:
+            # 获取当前日期
+            now = datetime.now()
+            current_date = f"{now.year}年{now.month}月{now.day}日"
+            # 第二轮及以后的反思使用相同的提示词，按轮次阶段缓存
+            prompt = prompt_registry.render(
+                "reflection",
+                time_horizon=self.time_horizon,
+                current_date=current_date,
+                reflection_iteration=min(reflection_iteration, 1)
+            )
+        else:
+            prompt = SYSTEM_PROMPT_REFLECTION
+        
+        return prompt, message
+    
+    def parse_response(self, response: str, **kwargs) -> Dict[str, str]:
+        """
+        解析LLM输出，并清理和补全搜索查询
+        
+        Args:
+            response: LLM原始输出
+            **kwargs: 额外参数
+            
+        Returns:
+            包含search_query和reasoning的字典
+        """
+        processed_response = super().parse_response(response, **kwargs)
+        
+        # 清理搜索查询中的模糊关键词
+        if processed_response.get('search_query'):
+            processed_response['search_query'] = self._clean_search_query(
+                processed_response['search_query']
+            )
+        
+        # 确保搜索查询包含正确的日期信息
+        if self.time_horizon and processed_response.get('search_query'):
+            processed_response = self._enhance_search_query_with_date(
+                processed_response, self.time_horizon
+            )
+        
+        return processed_response
+    
     def process_output(self, output: str) -> Dict[str, str]:
         """
         处理LLM输出，提取搜索查询和推理
@@ -4,16 +4,17 @@
 """
 
 import json
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Tuple
 from json.decoder import JSONDecodeError
 
 from .base_node import StateMutationNode
 from ..state.state import State
 from ..prompts import (
     SYSTEM_PROMPT_FIRST_SUMMARY, SYSTEM_PROMPT_REFLECTION_SUMMARY,
-    get_first_summary_prompt, get_reflection_summary_prompt
+    prompt_registry
 )
 from ..utils.text_processing import (
+    dump_prompt_input,
     remove_reasoning_from_output,
     clean_json_tags,
     extract_clean_response,
@@ -24,15 +25,20 @@ from ..utils.text_processing import (
 class FirstSummaryNode(StateMutationNode):
     """根据搜索结果生成段落首次总结的节点"""
     
-    def __init__(self, llm_client, time_horizon: str = None):
+    # 输出只包含一个字段的JSON对象，字段值为段落总结
+    DEFAULT_MAX_TOKENS = 2500
+    STOP_SEQUENCES = ["\n}"]
+    
+    def __init__(self, llm_client, time_horizon: str = None, max_tokens: Optional[int] = None):
         """
         初始化首次总结节点
         
         Args:
             llm_client: LLM客户端
             time_horizon: 时间范围（未来简事专用）
+            max_tokens: 最大输出长度，None表示使用节点默认值DEFAULT_MAX_TOKENS
         """
-        super().__init__(llm_client, "FirstSummaryNode")
+        super().__init__(llm_client, "FirstSummaryNode", max_tokens=max_tokens)
         self.time_horizon = time_horizon
     
     def validate_input(self, input_data: Any) -> bool:
@@ -64,25 +70,14 @@ class FirstSummaryNode(StateMutationNode):
             if not self.validate_input(input_data):
                 raise ValueError("输入数据格式错误")
             
-            # 准备输入数据
-            if isinstance(input_data, str):
-                message = input_data
-            else:
-                message = json.dumps(input_data, ensure_ascii=False)
-            
             self.log_info("正在生成首次段落总结")
             
-            # 选择提示词
-            if self.time_horizon:
-                prompt = get_first_summary_prompt(self.time_horizon)
-            else:
-                prompt = SYSTEM_PROMPT_FIRST_SUMMARY
-            
             # 调用LLM
-            response = self.llm_client.invoke(prompt, message)
+            prompt, message = self.build_request(input_data, **kwargs)
+            response = self.invoke_llm(prompt, message)
             
             # 处理响应
-            processed_response = self.process_output(response)
+            processed_response = self.parse_response(response, **kwargs)
             
             self.log_info("成功生成首次段落总结")
             return processed_response
@@ -91,6 +86,31 @@ class FirstSummaryNode(StateMutationNode):
             self.log_error(f"生成首次总结失败: {str(e)}")
             raise e
     
+    def build_request(self, input_data: Any, **kwargs) -> Tuple[str, str]:
+        """
+        构建首次总结请求
+        
+        Args:
+            input_data: 包含title、content、search_query和search_results的数据
+            **kwargs: 额外参数
+            
+        Returns:
+            (系统提示词, 用户输入)
+        """
+        # 准备输入数据
+        if isinstance(input_data, str):
+            message = input_data
+        else:
+            message = dump_prompt_input(input_data)
+        
+        # 选择提示词
+        if self.time_horizon:
+            prompt = prompt_registry.render("first_summary", time_horizon=self.time_horizon)
+        else:
+            prompt = SYSTEM_PROMPT_FIRST_SUMMARY
+        
+        return prompt, message
+    
     def process_output(self, output: str) -> str:
         """
         处理LLM输出，提取段落总结
@@ -161,15 +181,19 @@ class FirstSummaryNode(StateMutationNode):
 class ReflectionSummaryNode(StateMutationNode):
     """根据反思搜索结果更新段落总结的节点"""
     
-    def __init__(self, llm_client, time_horizon: str = None):
+    DEFAULT_MAX_TOKENS = 2500
+    STOP_SEQUENCES = ["\n}"]
+    
+    def __init__(self, llm_client, time_horizon: str = None, max_tokens: Optional[int] = None):
         """
         初始化反思总结节点
         
         Args:
             llm_client: LLM客户端
             time_horizon: 时间范围（未来简事专用）
+            max_tokens: 最大输出长度，None表示使用节点默认值DEFAULT_MAX_TOKENS
         """
-        super().__init__(llm_client, "ReflectionSummaryNode")
+        super().__init__(llm_client, "ReflectionSummaryNode", max_tokens=max_tokens)
         self.time_horizon = time_horizon
     
     def validate_input(self, input_data: Any) -> bool:
@@ -192,7 +216,7 @@ class ReflectionSummaryNode(StateMutationNode):
         
         Args:
             input_data: 包含完整反思信息的数据
-            **kwargs: 额外参数
+            **kwargs: 额外参数，reflection_iteration为反思轮次
             
         Returns:
             更新后的段落内容
@@ -201,29 +225,14 @@ class ReflectionSummaryNode(StateMutationNode):
             if not self.validate_input(input_data):
                 raise ValueError("输入数据格式错误")
             
-            # 准备输入数据
-            if isinstance(input_data, str):
-                message = input_data
-            else:
-                message = json.dumps(input_data, ensure_ascii=False)
-            
             self.log_info("正在生成反思总结")
             
-            # 获取反思轮次（从kwargs中获取）
-            reflection_iteration = kwargs.get('reflection_iteration', 0)
-            is_critical_reflection = reflection_iteration > 0  # 第二轮及以后为质疑性反思
-            
-            # 选择提示词
-            if self.time_horizon:
-                prompt = get_reflection_summary_prompt(self.time_horizon, is_critical_reflection)
-            else:
-                prompt = SYSTEM_PROMPT_REFLECTION_SUMMARY
-            
             # 调用LLM
-            response = self.llm_client.invoke(prompt, message)
+            prompt, message = self.build_request(input_data, **kwargs)
+            response = self.invoke_llm(prompt, message)
             
             # 处理响应
-            processed_response = self.process_output(response)
+            processed_response = self.parse_response(response, **kwargs)
             
             self.log_info("成功生成反思总结")
             return processed_response
@@ -232,6 +241,39 @@ class ReflectionSummaryNode(StateMutationNode):
             self.log_error(f"生成反思总结失败: {str(e)}")
             raise e
     
+    def build_request(self, input_data: Any, **kwargs) -> Tuple[str, str]:
+        """
+        构建反思总结请求
+        
+        Args:
+            input_data: 包含完整反思信息的数据
+            **kwargs: 额外参数，reflection_iteration为反思轮次
+            
+        Returns:
+            (系统提示词, 用户输入)
+        """
+        # 准备输入数据
+        if isinstance(input_data, str):
+            message = input_data
+        else:
+            message = dump_prompt_input(input_data)
+        
+        # 获取反思轮次（从kwargs中获取）
+        reflection_iteration = kwargs.get('reflection_iteration', 0)
+        is_critical_reflection = reflection_iteration > 0  # 第二轮及以后为质疑性反思
+        
+        # 选择提示词
+        if self.time_horizon:
+            prompt = prompt_registry.render(
+                "reflection_summary",
+                time_horizon=self.time_horizon,
+                is_critical_reflection=is_critical_reflection
+            )
+        else:
+            prompt = SYSTEM_PROMPT_REFLECTION_SUMMARY
+        
+        return prompt, message
+    
     def process_output(self, output: str) -> str:
         """
         处理LLM输出，提取更新后的段落内容
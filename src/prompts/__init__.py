@@ -23,6 +23,7 @@ from .prompts import (
     output_schema_reflection_summary,
     input_schema_report_formatting
 )
+from .registry import PromptRegistry, RenderedPrompt, prompt_registry
 
 __all__ = [
     "SYSTEM_PROMPT_REPORT_STRUCTURE",
@@ -42,5 +43,8 @@ __all__ = [
     "output_schema_first_summary", 
     "output_schema_reflection",
     "output_schema_reflection_summary",
-    "input_schema_report_formatting"
+    "input_schema_report_formatting",
+    "PromptRegistry",
+    "RenderedPrompt",
+    "prompt_registry"
 ]
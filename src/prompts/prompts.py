@@ -4,6 +4,8 @@ Deep Search Agent 的所有提示词定义
 """
 
 import json
+from datetime import datetime
+from typing import Tuple
 
 # ===== JSON Schema 定义 =====
 
@@ -115,20 +117,16 @@ input_schema_report_formatting = {
 
 # ===== 系统提示词定义 =====
 
-def get_report_structure_prompt(time_horizon: str = "3个月", analysis_angles: list = None) -> str:
+def _build_report_structure_prompt(time_horizon: str = "3个月", analysis_angles: list = None) -> Tuple[str, str]:
     """
-    生成报告结构的系统提示词（未来简事专用）
+    构建报告结构提示词的(稳定前缀, 可变后缀)
     
     Args:
         time_horizon: 时间范围，如"3个月"、"1年"等
         analysis_angles: 分析角度列表，如["技术", "经济", "社会"]
     """
-    angles_text = ""
-    if analysis_angles:
-        angles_text = f"\n分析角度：{', '.join(analysis_angles)}。请根据这些角度来规划报告结构。"
-    
-    return f"""
-你是一位未来趋势预测专家。给定一个关于未来的查询，你需要规划一个关于未来{time_horizon}内可能发生事件的报告结构。{angles_text}
+    prefix = f"""
+你是一位未来趋势预测专家。给定一个关于未来的查询，你需要规划一个关于未来{time_horizon}内可能发生事件的报告结构。
 报告应该专注于预测和分析未来趋势，而不是回顾历史。
 最多五个段落，每个段落应该从不同角度分析未来可能发生的情况。
 确保段落的排序合理有序，从总体趋势到具体预测。
@@ -143,6 +141,23 @@ def get_report_structure_prompt(time_horizon: str = "3个月", analysis_angles:
 确保输出是一个符合上述输出JSON模式定义的JSON对象。
 只返回JSON对象，不要有解释或额外文本。
 """
+    
+    suffix = ""
+    if analysis_angles:
+        suffix = f"\n分析角度：{', '.join(analysis_angles)}。请根据这些角度来规划报告结构。\n"
+    
+    return prefix, suffix
+
+
+def get_report_structure_prompt(time_horizon: str = "3个月", analysis_angles: list = None) -> str:
+    """
+    生成报告结构的系统提示词（未来简事专用）
+    
+    Args:
+        time_horizon: 时间范围，如"3个月"、"1年"等
+        analysis_angles: 分析角度列表，如["技术", "经济", "社会"]
+    """
+    return "".join(_build_report_structure_prompt(time_horizon, analysis_angles))
 
 # 生成报告结构的系统提示词（默认，保持向后兼容）
 SYSTEM_PROMPT_REPORT_STRUCTURE = f"""
@@ -175,26 +190,35 @@ def _remove_vague_keywords(query: str) -> str:
     cleaned_words = [w for w in words if w not in vague_keywords]
     return " ".join(cleaned_words) if cleaned_words else query
 
-def get_first_search_prompt(time_horizon: str = "3个月", current_date: str = None) -> str:
+def _format_current_date(now: datetime = None) -> str:
     """
-    生成首次搜索的系统提示词（未来简事专用）
+    格式化当前日期（格式：YYYY年MM月DD日）
     
     Args:
-        time_horizon: 时间范围
-        current_date: 当前日期（格式：YYYY年MM月DD日）
+        now: 当前时间，不提供则使用datetime.now()
     """
-    from datetime import datetime, timedelta
-    if current_date is None:
-        now = datetime.now()
-        current_date = f"{now.year}年{now.month}月{now.day}日"
+    now = now or datetime.now()
+    return f"{now.year}年{now.month}月{now.day}日"
+
+
+def _compute_future_date_str(time_horizon: str, now: datetime = None) -> str:
+    """
+    计算预测时间范围的截止日期描述
     
-    # 计算未来日期范围
-    now = datetime.now()
+    Args:
+        time_horizon: 时间范围，如"3个月"、"1年"
+        now: 当前时间，不提供则使用datetime.now()
+        
+    Returns:
+        截止日期描述，如"2026年1月"、"2027年"
+    """
+    now = now or datetime.now()
     if "个月" in time_horizon:
         months = int(time_horizon.replace("个月", ""))
         try:
             from dateutil.relativedelta import relativedelta
             future_date = now + relativedelta(months=months)
+            return f"{future_date.year}年{future_date.month}月"
         except ImportError:
             # 如果没有dateutil，使用简单的月份计算
             future_year = now.year
@@ -202,31 +226,55 @@ def get_first_search_prompt(time_horizon: str = "3个月", current_date: str = N
             while future_month > 12:
                 future_year += 1
                 future_month -= 12
-            future_date = datetime(future_year, future_month, now.day)
-        future_date_str = f"{future_date.year}年{future_date.month}月"
+            return f"{future_year}年{future_month}月"
     elif "年" in time_horizon:
         years = int(time_horizon.replace("年", ""))
-        future_date = datetime(now.year + years, now.month, now.day)
-        future_date_str = f"{future_date.year}年"
+        return f"{now.year + years}年"
     else:
-        future_date_str = "未来"
+        return "未来"
+
+
+def _build_time_info(time_horizon: str, current_date: str = None) -> str:
+    """
+    构建提示词末尾的时间信息（随日期变化，放在可缓存前缀之后）
+    
+    Args:
+        time_horizon: 时间范围
+        current_date: 当前日期（格式：YYYY年MM月DD日）
+    """
+    now = datetime.now()
+    if current_date is None:
+        current_date = _format_current_date(now)
+    future_date_str = _compute_future_date_str(time_horizon, now)
     
     return f"""
+**重要时间信息：**
+- 当前日期：{current_date}
+- 预测时间范围：未来{time_horizon}（即从现在到{future_date_str}）
+- 搜索查询中的时间请使用当前年份或未来日期（如"{future_date_str}"），不要使用{now.year}年以前的过时日期
+"""
+
+
+def _build_first_search_prompt(time_horizon: str = "3个月", current_date: str = None) -> Tuple[str, str]:
+    """
+    构建首次搜索提示词的(稳定前缀, 可变后缀)
+    
+    Args:
+        time_horizon: 时间范围
+        current_date: 当前日期（格式：YYYY年MM月DD日）
+    """
+    prefix = f"""
 你是一位未来趋势预测专家。你将获得报告中的一个段落，其标题和预期内容将按照以下JSON模式定义提供：
 
 <INPUT JSON SCHEMA>
 {json.dumps(input_schema_first_search, indent=2, ensure_ascii=False)}
 </INPUT JSON SCHEMA>
 
-**重要时间信息：**
-- 当前日期：{current_date}
-- 预测时间范围：未来{time_horizon}（即从现在到{future_date_str}）
-
 你可以使用一个网络搜索工具，该工具接受'search_query'作为参数。
-你的任务是思考这个主题在未来{time_horizon}内（从现在到{future_date_str}）可能的发展趋势，并提供最佳的网络搜索查询来获取相关的未来预测、趋势分析、专家观点等信息。
+你的任务是思考这个主题在未来{time_horizon}内（具体日期见文末的时间信息）可能的发展趋势，并提供最佳的网络搜索查询来获取相关的未来预测、趋势分析、专家观点等信息。
 
 **搜索查询要求：**
-1. 必须包含具体的时间范围，使用当前日期和未来日期（如"{future_date_str}"、"2025年"、"2026年"等），不要使用过时的日期（如2024年及以前）
+1. 必须包含具体的时间范围，使用文末时间信息中的当前日期和预测截止日期，不要使用过时的日期
 2. 必须包含预测相关的关键词（如"趋势"、"预测"、"展望"、"发展"、"未来"等）
 3. 搜索查询应该针对未来时间段，而不是历史信息
 
@@ -239,6 +287,19 @@ def get_first_search_prompt(time_horizon: str = "3个月", current_date: str = N
 确保输出是一个符合上述输出JSON模式定义的JSON对象。
 只返回JSON对象，不要有解释或额外文本。
 """
+    
+    return prefix, _build_time_info(time_horizon, current_date)
+
+
+def get_first_search_prompt(time_horizon: str = "3个月", current_date: str = None) -> str:
+    """
+    生成首次搜索的系统提示词（未来简事专用）
+    
+    Args:
+        time_horizon: 时间范围
+        current_date: 当前日期（格式：YYYY年MM月DD日）
+    """
+    return "".join(_build_first_search_prompt(time_horizon, current_date))
 
 # 每个段落第一次搜索的系统提示词（默认，保持向后兼容）
 SYSTEM_PROMPT_FIRST_SEARCH = f"""
@@ -310,48 +371,49 @@ SYSTEM_PROMPT_FIRST_SUMMARY = f"""
 只返回JSON对象，不要有解释或额外文本。
 """
 
-def get_reflection_prompt(time_horizon: str = "3个月", current_date: str = None, reflection_iteration: int = 0) -> str:
+def _build_reflection_prompt(time_horizon: str = "3个月", current_date: str = None,
+                             reflection_iteration: int = 0) -> Tuple[str, str]:
     """
-    生成反思的系统提示词（未来简事专用）
+    构建反思提示词的(稳定前缀, 可变后缀)
     
     Args:
         time_horizon: 时间范围
         current_date: 当前日期（格式：YYYY年MM月DD日）
         reflection_iteration: 反思轮次（0表示第一轮，1表示第二轮等）
     """
-    from datetime import datetime, timedelta
-    if current_date is None:
-        now = datetime.now()
-        current_date = f"{now.year}年{now.month}月{now.day}日"
-    
-    # 计算未来日期范围
-    now = datetime.now()
-    if "个月" in time_horizon:
-        months = int(time_horizon.replace("个月", ""))
-        try:
-            from dateutil.relativedelta import relativedelta
-            future_date = now + relativedelta(months=months)
-        except ImportError:
-            # 如果没有dateutil，使用简单的月份计算
-            future_year = now.year
-            future_month = now.month + months
-            while future_month > 12:
-                future_year += 1
-                future_month -= 12
-            future_date = datetime(future_year, future_month, now.day)
-        future_date_str = f"{future_date.year}年{future_date.month}月"
-    elif "年" in time_horizon:
-        years = int(time_horizon.replace("年", ""))
-        future_date = datetime(now.year + years, now.month, now.day)
-        future_date_str = f"{future_date.year}年"
-    else:
-        future_date_str = "未来"
+    prefix = f"""
+你是一位未来趋势预测专家。你负责为未来预测报告构建全面的段落。你将获得段落标题、计划内容摘要，以及你已经创建的段落最新状态，所有这些都将按照以下JSON模式定义提供：
+
+<INPUT JSON SCHEMA>
+{json.dumps(input_schema_reflection, indent=2, ensure_ascii=False)}
+</INPUT JSON SCHEMA>
+
+你可以使用一个网络搜索工具，该工具接受'search_query'作为参数。
+你需要按照文末的本轮反思任务审视段落内容，并提供最佳的网络搜索查询来获取更多未来预测信息，丰富或修正最新状态。
+
+**搜索查询要求：**
+1. 必须包含具体的时间范围，使用文末时间信息中的当前日期和预测截止日期，不要使用过时的日期
+2. 必须包含预测相关的关键词（如"趋势"、"预测"、"展望"、"发展"、"未来"等）
+3. 如果是质疑性或对比性反思，可以包含"不同观点"、"争议"、"风险"、"挑战"等关键词
+4. 搜索查询应该针对未来时间段，而不是历史信息
+5. 避免使用模糊词汇（如"未来简事"、"简事"等）
+
+请按照以下JSON模式定义格式化输出：
+
+<OUTPUT JSON SCHEMA>
+{json.dumps(output_schema_reflection, indent=2, ensure_ascii=False)}
+</OUTPUT JSON SCHEMA>
+
+确保输出是一个符合上述输出JSON模式定义的JSON对象。
+只返回JSON对象，不要有解释或额外文本。
+"""
     
     # 根据反思轮次调整反思策略
     if reflection_iteration == 0:
         # 第一轮反思：补充遗漏信息
-        reflection_focus = """
-你的任务是反思段落文本的当前状态，思考是否遗漏了关于未来{time_horizon}内（从现在到{future_date_str}）可能发生事件的某些关键方面，例如：
+        reflection_focus = f"""
+**本轮反思任务：**
+反思段落文本的当前状态，思考是否遗漏了关于未来{time_horizon}内可能发生事件的某些关键方面，例如：
 - 其他可能的未来场景
 - 不同的预测观点
 - 潜在的风险和机遇
@@ -360,7 +422,8 @@ def get_reflection_prompt(time_horizon: str = "3个月", current_date: str = Non
     else:
         # 后续反思：质疑性和对比性反思
         reflection_focus = """
-你的任务是进行深度反思，从以下角度审视段落内容：
+**本轮反思任务：**
+进行深度反思，从以下角度审视段落内容：
 1. **质疑性反思**：检查当前内容是否存在矛盾、过时信息或过于乐观/悲观的预测
 2. **对比性反思**：寻找与当前预测不同的观点、相反的趋势或替代性场景
 3. **补充性反思**：发现遗漏的重要维度、边缘案例或意外因素
@@ -373,37 +436,19 @@ def get_reflection_prompt(time_horizon: str = "3个月", current_date: str = Non
 - 预测的假设条件是否合理
 """
     
-    return f"""
-你是一位未来趋势预测专家。你负责为未来预测报告构建全面的段落。你将获得段落标题、计划内容摘要，以及你已经创建的段落最新状态，所有这些都将按照以下JSON模式定义提供：
+    return prefix, _build_time_info(time_horizon, current_date) + reflection_focus
 
-<INPUT JSON SCHEMA>
-{json.dumps(input_schema_reflection, indent=2, ensure_ascii=False)}
-</INPUT JSON SCHEMA>
 
-**重要时间信息：**
-- 当前日期：{current_date}
-- 预测时间范围：未来{time_horizon}（即从现在到{future_date_str}）
-
-你可以使用一个网络搜索工具，该工具接受'search_query'作为参数。
-{reflection_focus}
-
-**搜索查询要求：**
-1. 必须包含具体的时间范围，使用当前日期和未来日期（如"{future_date_str}"、"2025年"、"2026年"等），不要使用过时的日期（如2024年及以前）
-2. 必须包含预测相关的关键词（如"趋势"、"预测"、"展望"、"发展"、"未来"等）
-3. 如果是质疑性或对比性反思，可以包含"不同观点"、"争议"、"风险"、"挑战"等关键词
-4. 搜索查询应该针对未来时间段，而不是历史信息
-5. 避免使用模糊词汇（如"未来简事"、"简事"等）
-
-并提供最佳的网络搜索查询来获取更多未来预测信息，丰富或修正最新状态。
-请按照以下JSON模式定义格式化输出：
-
-<OUTPUT JSON SCHEMA>
-{json.dumps(output_schema_reflection, indent=2, ensure_ascii=False)}
-</OUTPUT JSON SCHEMA>
-
-确保输出是一个符合上述输出JSON模式定义的JSON对象。
-只返回JSON对象，不要有解释或额外文本。
-"""
+def get_reflection_prompt(time_horizon: str = "3个月", current_date: str = None, reflection_iteration: int = 0) -> str:
+    """
+    生成反思的系统提示词（未来简事专用）
+    
+    Args:
+        time_horizon: 时间范围
+        current_date: 当前日期（格式：YYYY年MM月DD日）
+        reflection_iteration: 反思轮次（0表示第一轮，1表示第二轮等）
+    """
+    return "".join(_build_reflection_prompt(time_horizon, current_date, reflection_iteration))
 
 # 反思(Reflect)的系统提示词（默认，保持向后兼容）
 SYSTEM_PROMPT_REFLECTION = f"""
@@ -425,30 +470,16 @@ SYSTEM_PROMPT_REFLECTION = f"""
 只返回JSON对象，不要有解释或额外文本。
 """
 
-def get_reflection_summary_prompt(time_horizon: str = "3个月", is_critical_reflection: bool = False) -> str:
+def _build_reflection_summary_prompt(time_horizon: str = "3个月",
+                                     is_critical_reflection: bool = False) -> Tuple[str, str]:
     """
-    生成反思总结的系统提示词（未来简事专用）
+    构建反思总结提示词的(稳定前缀, 可变后缀)
     
     Args:
         time_horizon: 时间范围
         is_critical_reflection: 是否为质疑性/对比性反思
     """
-    if is_critical_reflection:
-        focus_text = """你的任务是根据搜索结果中的未来预测信息，更新段落的当前最新状态。这是质疑性和对比性反思，重点关注：
-1. 修正或质疑当前内容中的矛盾、过时信息或过于乐观/悲观的预测
-2. 整合与当前预测不同的观点和相反的趋势
-3. 添加被忽略的风险因素、不确定性或黑天鹅事件
-4. 评估和调整预测的可信度
-5. 保持内容的平衡性和客观性
-6. 如果发现与当前内容矛盾的信息，应该修正或补充说明，而不是简单叠加"""
-    else:
-        focus_text = """你的任务是根据搜索结果中的未来预测信息，丰富段落的当前最新状态。重点关注：
-1. 补充遗漏的未来趋势和预测
-2. 整合不同的预测观点
-3. 添加潜在的影响和意义
-不要删除最新状态中的关键信息，尽量丰富它，只添加缺失的信息。"""
-    
-    return f"""
+    prefix = f"""
 你是一位未来趋势预测专家。
 你将获得搜索查询、搜索结果、段落标题以及你正在研究的报告段落的预期内容。
 你正在迭代完善这个关于未来{time_horizon}内可能发生事件的段落，并且段落的最新状态也会提供给你。
@@ -458,8 +489,7 @@ def get_reflection_summary_prompt(time_horizon: str = "3个月", is_critical_ref
 {json.dumps(input_schema_reflection_summary, indent=2, ensure_ascii=False)}
 </INPUT JSON SCHEMA>
 
-{focus_text}
-适当地组织段落结构以便纳入报告中。
+你需要按照文末的本轮任务更新段落，并适当地组织段落结构以便纳入报告中。
 请按照以下JSON模式定义格式化输出：
 
 <OUTPUT JSON SCHEMA>
@@ -469,6 +499,40 @@ def get_reflection_summary_prompt(time_horizon: str = "3个月", is_critical_ref
 确保输出是一个符合上述输出JSON模式定义的JSON对象。
 只返回JSON对象，不要有解释或额外文本。
 """
+    
+    if is_critical_reflection:
+        focus_text = """
+**本轮任务：**
+根据搜索结果中的未来预测信息，更新段落的当前最新状态。这是质疑性和对比性反思，重点关注：
+1. 修正或质疑当前内容中的矛盾、过时信息或过于乐观/悲观的预测
+2. 整合与当前预测不同的观点和相反的趋势
+3. 添加被忽略的风险因素、不确定性或黑天鹅事件
+4. 评估和调整预测的可信度
+5. 保持内容的平衡性和客观性
+6. 如果发现与当前内容矛盾的信息，应该修正或补充说明，而不是简单叠加
+"""
+    else:
+        focus_text = """
+**本轮任务：**
+根据搜索结果中的未来预测信息，丰富段落的当前最新状态。重点关注：
+1. 补充遗漏的未来趋势和预测
+2. 整合不同的预测观点
+3. 添加潜在的影响和意义
+不要删除最新状态中的关键信息，尽量丰富它，只添加缺失的信息。
+"""
+    
+    return prefix, focus_text
+
+
+def get_reflection_summary_prompt(time_horizon: str = "3个月", is_critical_reflection: bool = False) -> str:
+    """
+    生成反思总结的系统提示词（未来简事专用）
+    
+    Args:
+        time_horizon: 时间范围
+        is_critical_reflection: 是否为质疑性/对比性反思
+    """
+    return "".join(_build_reflection_summary_prompt(time_horizon, is_critical_reflection))
 
 # 总结反思的系统提示词（默认，保持向后兼容）
 SYSTEM_PROMPT_REFLECTION_SUMMARY = f"""
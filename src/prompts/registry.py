@@ -0,0 +1,143 @@
+"""
+提示词注册表
+按(模板, 参数)缓存渲染后的系统提示词，并统计提示词大小
+"""
+
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Tuple, Union
+
+from .prompts import (
+    _build_report_structure_prompt,
+    _build_first_search_prompt,
+    _build_reflection_prompt,
+    _build_reflection_summary_prompt,
+    get_first_summary_prompt,
+    get_report_formatting_prompt
+)
+
+logger = logging.getLogger(__name__)
+
+# 模板构建函数返回完整提示词，或(稳定前缀, 可变后缀)
+PromptBuilder = Callable[..., Union[str, Tuple[str, str]]]
+
+
+class RenderedPrompt(str):
+    """
+    渲染后的提示词
+
+    本身就是完整的提示词字符串，可直接传给LLM；同时保留稳定前缀和可变后缀，
+    便于LLM层把可变部分放在最后以利用服务端的前缀缓存。
+    """
+
+    __slots__ = ("prefix", "suffix")
+
+    def __new__(cls, prefix: str, suffix: str = ""):
+        prompt = super().__new__(cls, prefix + suffix)
+        prompt.prefix = prefix
+        prompt.suffix = suffix
+        return prompt
+
+
+class PromptRegistry:
+    """带缓存的提示词注册表"""
+
+    def __init__(self, max_entries: int = 256):
+        """
+        初始化提示词注册表
+
+        Args:
+            max_entries: 最多缓存的渲染结果数量
+        """
+        self.max_entries = max_entries
+        self._builders: Dict[str, PromptBuilder] = {}
+        self._cache: "OrderedDict[Tuple, RenderedPrompt]" = OrderedDict()
+        self._stats: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+
+    def register(self, name: str, builder: PromptBuilder):
+        """
+        注册提示词模板
+
+        Args:
+            name: 模板名称
+            builder: 构建函数，接受关键字参数
+        """
+        with self._lock:
+            self._builders[name] = builder
+            self._stats.setdefault(name, {"renders": 0, "hits": 0, "chars": 0,
+                                          "prefix_chars": 0, "suffix_chars": 0})
+            # 模板变化后旧的缓存失效
+            for key in [key for key in self._cache if key[0] == name]:
+                del self._cache[key]
+
+    def render(self, name: str, **params: Any) -> RenderedPrompt:
+        """
+        渲染提示词，相同参数直接返回缓存结果
+
+        Args:
+            name: 模板名称
+            **params: 模板参数，如time_horizon、current_date、reflection_iteration
+
+        Returns:
+            渲染后的提示词
+        """
+        key = (name,) + tuple(sorted(
+            (param, tuple(value) if isinstance(value, list) else value)
+            for param, value in params.items()
+        ))
+
+        with self._lock:
+            prompt = self._cache.get(key)
+            if prompt is not None:
+                self._cache.move_to_end(key)
+                self._stats[name]["hits"] += 1
+                return prompt
+            builder = self._builders.get(name)
+
+        if builder is None:
+            raise KeyError(f"未注册的提示词模板: {name}")
+
+        built = builder(**params)
+        prompt = RenderedPrompt(*built) if isinstance(built, tuple) else RenderedPrompt(built)
+
+        with self._lock:
+            self._cache[key] = prompt
+            if len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+            stats = self._stats[name]
+            stats["renders"] += 1
+            stats["chars"] = len(prompt)
+            stats["prefix_chars"] = len(prompt.prefix)
+            stats["suffix_chars"] = len(prompt.suffix)
+
+        logger.debug("渲染提示词 %s: %d 字符（前缀 %d，后缀 %d）",
+                     name, len(prompt), len(prompt.prefix), len(prompt.suffix))
+        return prompt
+
+    def get_stats(self) -> Dict[str, Dict[str, int]]:
+        """
+        获取各模板的渲染统计
+
+        Returns:
+            {模板名称: {"renders", "hits", "chars", "prefix_chars", "suffix_chars"}}，
+            其中字符数为最近一次渲染结果的大小
+        """
+        with self._lock:
+            return {name: dict(stats) for name, stats in self._stats.items()}
+
+    def clear(self):
+        """清空渲染缓存"""
+        with self._lock:
+            self._cache.clear()
+
+
+# 全局提示词注册表
+prompt_registry = PromptRegistry()
+prompt_registry.register("report_structure", _build_report_structure_prompt)
+prompt_registry.register("first_search", _build_first_search_prompt)
+prompt_registry.register("first_summary", get_first_summary_prompt)
+prompt_registry.register("reflection", _build_reflection_prompt)
+prompt_registry.register("reflection_summary", _build_reflection_summary_prompt)
+prompt_registry.register("report_formatting", get_report_formatting_prompt)
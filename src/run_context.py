@@ -0,0 +1,50 @@
+"""
+单次研究的运行上下文
+每次研究的参数、节点和状态都保存在RunContext中，Agent本身只持有配置和共享的客户端，
+因此同一个Agent可以同时执行多个研究
+"""
+
+import uuid
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+from .events import EventBus
+from .nodes import (
+    FirstSearchNode,
+    ReflectionNode,
+    FirstSummaryNode,
+    ReflectionSummaryNode,
+    ReportFormattingNode
+)
+from .state import State
+from .utils import MemoStore
+
+
+@dataclass
+class ResearchNodes:
+    """一次研究使用的处理节点（报告结构节点与查询相关，每次研究单独创建）"""
+    first_search_node: FirstSearchNode
+    reflection_node: ReflectionNode
+    first_summary_node: FirstSummaryNode
+    reflection_summary_node: ReflectionSummaryNode
+    report_formatting_node: ReportFormattingNode
+
+
+@dataclass
+class RunContext:
+    """单次研究的运行上下文"""
+    query: str = ""                                                # 研究查询
+    time_horizon: Optional[str] = None                             # 时间范围
+    analysis_angles: Optional[List[str]] = None                    # 分析角度
+    nodes: Optional[ResearchNodes] = None                          # 本次研究使用的节点
+    events: Optional[EventBus] = None                              # 本次研究的事件总线
+    state: State = field(default_factory=State)                    # 研究状态
+    report_path: Optional[str] = None                              # 报告文件路径
+    memo: Optional[MemoStore] = None                               # 节点输出记忆，None表示不复用
+    refreshed_paragraphs: Optional[List[int]] = None               # 刷新模式下重新研究的段落索引
+    run_id: str = field(default_factory=lambda: uuid.uuid4().hex[:12])  # 运行ID，用于区分并发研究的日志
+
+    @property
+    def final_report(self) -> str:
+        """最终报告内容"""
+        return self.state.final_report
@@ -0,0 +1,380 @@
+"""
+状态的二进制序列化
+元数据以紧凑JSON保存，搜索内容和最终报告等大段文本作为独立的文本块，可逐块压缩
+
+文件布局（小端序，版本2）：
+    magic "DSAS" | u8 版本 | u8 默认压缩方式
+    文本块数据（依次排列）
+    元数据JSON（其中blobs字段记录每个文本块的偏移、长度和压缩方式）
+    u64 元数据偏移 | u32 元数据长度 | magic "DSAS"
+
+元数据位于文件末尾并带有文本块索引，读取时先读尾部定位元数据，再按需读取文本块。
+open_state通过内存映射延迟加载搜索内容，只查看进度或报告时不会读取任何搜索内容。
+版本1（文本块按顺序带长度前缀写在元数据之后）仍可读取。
+"""
+
+import json
+import lzma
+import mmap
+import struct
+import zlib
+from array import array
+from collections.abc import Sequence
+from typing import Any, BinaryIO, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from .state import Paragraph, Research, SearchTable, State
+
+MAGIC = b"DSAS"
+FORMAT_VERSION = 2
+
+# 文本块压缩方式
+CODEC_NONE = 0
+CODEC_ZLIB = 1
+CODEC_LZMA = 2
+
+COMPRESSION_CODECS = {None: CODEC_NONE, "none": CODEC_NONE, "zlib": CODEC_ZLIB, "lzma": CODEC_LZMA}
+
+# 小于该长度的文本块不压缩，压缩头部开销得不偿失
+MIN_COMPRESS_SIZE = 256
+
+_HEADER = struct.Struct("<4sBB")
+_FOOTER = struct.Struct("<QI4s")
+_U32 = struct.Struct("<I")
+_BLOB_HEADER = struct.Struct("<BI")
+
+
+def _get_codec(compression: Optional[str]) -> int:
+    if compression not in COMPRESSION_CODECS:
+        raise ValueError(f"不支持的压缩方式: {compression}（可用: zlib、lzma）")
+    return COMPRESSION_CODECS[compression]
+
+
+def encode_blob(text: str, codec: int) -> Tuple[int, bytes]:
+    """
+    编码文本块，压缩后没有变小时保存原文
+
+    Args:
+        text: 文本
+        codec: 压缩方式
+
+    Returns:
+        (实际使用的压缩方式, 数据)
+    """
+    data = text.encode("utf-8")
+    if codec == CODEC_NONE or len(data) < MIN_COMPRESS_SIZE:
+        return CODEC_NONE, data
+
+    compressed = zlib.compress(data, 6) if codec == CODEC_ZLIB else lzma.compress(data)
+    if len(compressed) >= len(data):
+        return CODEC_NONE, data
+    return codec, compressed
+
+
+def decode_blob(codec: int, data: bytes) -> str:
+    """解码文本块"""
+    if codec == CODEC_ZLIB:
+        data = zlib.decompress(data)
+    elif codec == CODEC_LZMA:
+        data = lzma.decompress(data)
+    elif codec != CODEC_NONE:
+        raise ValueError(f"未知的文本块压缩方式: {codec}")
+    return data.decode("utf-8")
+
+
+def state_to_meta(state: State) -> Tuple[Dict[str, Any], List[str]]:
+    """
+    拆分状态为元数据和文本块
+
+    Args:
+        state: 状态对象
+
+    Returns:
+        (元数据字典, 文本块列表)，元数据中的大段文本替换为文本块编号
+    """
+    blobs: List[str] = []
+
+    def add_blob(text: str) -> int:
+        blobs.append(text)
+        return len(blobs) - 1
+
+    paragraphs = []
+    for paragraph in state.paragraphs:
+        columns = paragraph.research.search_history.to_columns()
+        columns["contents"] = [add_blob(content) for content in columns["contents"]]
+        paragraphs.append({
+            "title": paragraph.title,
+            "content": paragraph.content,
+            "order": paragraph.order,
+            "research": {
+                "latest_summary": paragraph.research.latest_summary,
+                "reflection_iteration": paragraph.research.reflection_iteration,
+                "is_completed": paragraph.research.is_completed,
+                "searches": columns
+            }
+        })
+
+    meta = {
+        "query": state.query,
+        "report_title": state.report_title,
+        "paragraphs": paragraphs,
+        "final_report": add_blob(state.final_report),
+        "is_completed": state.is_completed,
+        "created_at": state.created_at,
+        "updated_at": state.updated_at
+    }
+    return meta, blobs
+
+
+class LazyTextList(Sequence):
+    """
+    延迟加载的文本列
+    
+    只保存文本块编号，按下标访问时才读取并解码对应的文本块，不缓存结果。
+    新追加的文本直接保存在内存中，因此可以作为SearchTable的内容列继续添加记录。
+    """
+    
+    __slots__ = ("_get_blob", "_blob_ids", "_appended")
+    
+    def __init__(self, get_blob: Callable[[int], str], blob_ids: Iterable[int]):
+        """
+        创建延迟加载的文本列
+        
+        Args:
+            get_blob: 按编号读取文本块的函数
+            blob_ids: 各行对应的文本块编号
+        """
+        self._get_blob = get_blob
+        self._blob_ids = array('I', blob_ids)
+        self._appended: List[str] = []
+    
+    def __len__(self) -> int:
+        return len(self._blob_ids) + len(self._appended)
+    
+    def __getitem__(self, index: Union[int, slice]) -> Union[str, List[str]]:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("文本列下标越界")
+        if index < len(self._blob_ids):
+            return self._get_blob(self._blob_ids[index])
+        return self._appended[index - len(self._blob_ids)]
+    
+    def __iter__(self) -> Iterator[str]:
+        for index in range(len(self)):
+            yield self[index]
+    
+    def append(self, text: str):
+        """追加一条文本"""
+        self._appended.append(text)
+
+
+class MappedBlobs:
+    """
+    内存映射的文本块
+    
+    文件只映射不读取，get按索引中的偏移切出文本块并解码，由操作系统按页加载实际用到的部分。
+    """
+    
+    def __init__(self, mapped: mmap.mmap, index: Dict[str, List[int]]):
+        """
+        创建文本块读取器
+        
+        Args:
+            mapped: 只读的内存映射
+            index: 文本块索引，包含offsets、lengths和codecs三列
+        """
+        self._mapped = mapped
+        self._offsets = array('Q', index.get("offsets", []))
+        self._lengths = array('I', index.get("lengths", []))
+        self._codecs = array('B', index.get("codecs", []))
+    
+    def __len__(self) -> int:
+        return len(self._offsets)
+    
+    def get(self, blob_id: int) -> str:
+        """读取并解码一个文本块"""
+        offset = self._offsets[blob_id]
+        return decode_blob(self._codecs[blob_id], self._mapped[offset:offset + self._lengths[blob_id]])
+    
+    def close(self):
+        """释放内存映射，之后不能再读取文本块"""
+        self._mapped.close()
+
+
+def state_from_meta(meta: Dict[str, Any], get_blob: Callable[[int], str], lazy: bool = False) -> State:
+    """
+    由元数据和文本块还原状态
+    
+    Args:
+        meta: state_to_meta生成的元数据
+        get_blob: 按编号读取文本块的函数
+        lazy: 是否延迟读取搜索内容，为True时搜索内容在访问时才通过get_blob读取
+    
+    Returns:
+        状态对象
+    """
+    paragraphs = []
+    for data in meta.get("paragraphs", []):
+        research_data = data.get("research", {})
+        columns = dict(research_data.get("searches", {}))
+        blob_ids = columns.get("contents", [])
+        if lazy:
+            columns["contents"] = LazyTextList(get_blob, blob_ids)
+        else:
+            columns["contents"] = [get_blob(blob_id) for blob_id in blob_ids]
+        paragraphs.append(Paragraph(
+            title=data.get("title", ""),
+            content=data.get("content", ""),
+            order=data.get("order", 0),
+            research=Research(
+                search_history=SearchTable.from_columns(columns),
+                latest_summary=research_data.get("latest_summary", ""),
+                reflection_iteration=research_data.get("reflection_iteration", 0),
+                is_completed=research_data.get("is_completed", False)
+            )
+        ))
+    
+    return State(
+        query=meta.get("query", ""),
+        report_title=meta.get("report_title", ""),
+        paragraphs=paragraphs,
+        final_report=get_blob(meta["final_report"]) if meta.get("final_report") is not None else "",
+        is_completed=meta.get("is_completed", False),
+        created_at=meta.get("created_at", ""),
+        updated_at=meta.get("updated_at", "")
+    )
+
+
+def write_state(state: State, f: BinaryIO, compression: Optional[str] = None):
+    """
+    以二进制格式写入状态，文本块逐块编码写入，不在内存中拼出整个文件
+    
+    Args:
+        state: 状态对象
+        f: 以二进制模式打开的文件
+        compression: 文本块压缩方式，None、zlib或lzma
+    """
+    codec = _get_codec(compression)
+    meta, blobs = state_to_meta(state)
+    
+    f.write(_HEADER.pack(MAGIC, FORMAT_VERSION, codec))
+    position = _HEADER.size
+    index = {"offsets": [], "lengths": [], "codecs": []}
+    for text in blobs:
+        blob_codec, data = encode_blob(text, codec)
+        index["offsets"].append(position)
+        index["lengths"].append(len(data))
+        index["codecs"].append(blob_codec)
+        f.write(data)
+        position += len(data)
+    
+    meta["blobs"] = index
+    meta_bytes = json.dumps(meta, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    f.write(meta_bytes)
+    f.write(_FOOTER.pack(position, len(meta_bytes), MAGIC))
+
+
+def _read_exact(f: BinaryIO, size: int) -> bytes:
+    data = f.read(size)
+    if len(data) != size:
+        raise ValueError("状态文件已损坏：数据不完整")
+    return data
+
+
+def _read_header(f: BinaryIO) -> int:
+    """读取文件头，返回格式版本"""
+    magic, version, _ = _HEADER.unpack(_read_exact(f, _HEADER.size))
+    if magic != MAGIC:
+        raise ValueError("不是二进制状态文件")
+    if version not in (1, FORMAT_VERSION):
+        raise ValueError(f"不支持的状态文件版本: {version}")
+    return version
+
+
+def _read_v1(f: BinaryIO) -> State:
+    """读取版本1的状态文件（文件头之后的部分）"""
+    (meta_length,) = _U32.unpack(_read_exact(f, _U32.size))
+    meta = json.loads(_read_exact(f, meta_length).decode("utf-8"))
+    
+    (count,) = _U32.unpack(_read_exact(f, _U32.size))
+    blobs = []
+    for _ in range(count):
+        codec, length = _BLOB_HEADER.unpack(_read_exact(f, _BLOB_HEADER.size))
+        blobs.append(decode_blob(codec, _read_exact(f, length)))
+    
+    return state_from_meta(meta, blobs.__getitem__)
+
+
+def read_meta(f: BinaryIO) -> Dict[str, Any]:
+    """
+    只读取元数据（含文本块索引），不读取任何文本块
+    
+    Args:
+        f: 以二进制模式打开、可随机访问的版本2状态文件
+    
+    Returns:
+        元数据字典
+    """
+    f.seek(-_FOOTER.size, 2)
+    meta_offset, meta_length, magic = _FOOTER.unpack(_read_exact(f, _FOOTER.size))
+    if magic != MAGIC:
+        raise ValueError("状态文件已损坏：缺少文件尾")
+    f.seek(meta_offset)
+    return json.loads(_read_exact(f, meta_length).decode("utf-8"))
+
+
+def read_state(f: BinaryIO) -> State:
+    """
+    读取二进制格式的状态，所有内容一次读入内存
+    
+    Args:
+        f: 以二进制模式打开的文件
+    
+    Returns:
+        状态对象
+    """
+    if _read_header(f) == 1:
+        return _read_v1(f)
+    
+    meta = read_meta(f)
+    index = meta.get("blobs", {})
+    offsets, lengths, codecs = index.get("offsets", []), index.get("lengths", []), index.get("codecs", [])
+    
+    def get_blob(blob_id: int) -> str:
+        f.seek(offsets[blob_id])
+        return decode_blob(codecs[blob_id], _read_exact(f, lengths[blob_id]))
+    
+    return state_from_meta(meta, get_blob)
+
+
+def open_state(filepath: str) -> State:
+    """
+    延迟加载二进制状态文件
+    
+    只读取元数据，搜索内容在访问时才从内存映射中读取。返回的状态与文件绑定，
+    文件在状态使用期间不能被原地改写（save_to_file通过替换文件写入，不受影响）。
+    版本1的文件没有索引，退回一次性读取。
+    
+    Args:
+        filepath: 状态文件路径
+    
+    Returns:
+        状态对象
+    """
+    with open(filepath, 'rb') as f:
+        if _read_header(f) == 1:
+            return _read_v1(f)
+        meta = read_meta(f)
+        # 映射在文件关闭后依然有效
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    
+    blobs = MappedBlobs(mapped, meta.get("blobs", {}))
+    return state_from_meta(meta, blobs.get, lazy=True)
+
+
+def is_binary_state_file(filepath: str) -> bool:
+    """判断文件是否为二进制状态文件"""
+    with open(filepath, 'rb') as f:
+        return f.read(len(MAGIC)) == MAGIC
@@ -3,21 +3,95 @@ Deep Search Agent状态管理
 定义所有状态数据结构和操作方法
 """
 
-from dataclasses import dataclass, field
-from typing import List, Dict, Any, Optional
 import json
+import math
+import os
+import sys
+import threading
+import time
+from array import array
+from collections.abc import Sequence
+from dataclasses import dataclass, field
 from datetime import datetime
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Union
+
+# 二进制状态文件的扩展名
+BINARY_STATE_EXTENSION = ".dsa"
+
+# Python 3.10起dataclass支持slots，旧版本退回普通dataclass
+_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+
+def _to_epoch(timestamp: Union[str, float, None]) -> float:
+    """把ISO时间字符串或数值时间戳统一转换为Unix时间戳，None或无法解析时使用当前时间"""
+    if timestamp is None:
+        return time.time()
+    if isinstance(timestamp, (int, float)):
+        return float(timestamp)
+    try:
+        return datetime.fromisoformat(timestamp).timestamp()
+    except (TypeError, ValueError):
+        return time.time()
 
 
-@dataclass
 class Search:
-    """单个搜索结果的状态"""
-    query: str = ""                    # 搜索查询
-    url: str = ""                      # 搜索结果的链接
-    title: str = ""                    # 搜索结果标题
-    content: str = ""                  # 搜索返回的内容
-    score: Optional[float] = None      # 相关度评分
-    timestamp: str = field(default_factory=lambda: datetime.now().isoformat())
+    """
+    单个搜索结果的状态（不可变）
+    
+    查询字符串会被驻留（sys.intern），同一查询的多条结果共享一个字符串；
+    时间以Unix时间戳保存，timestamp属性仍返回ISO格式字符串。
+    """
+    
+    __slots__ = ("query", "url", "title", "content", "score", "created_at")
+    
+    def __init__(self, query: str = "", url: str = "", title: str = "", content: str = "",
+                 score: Optional[float] = None, timestamp: Union[str, float, None] = None):
+        """
+        创建搜索结果
+        
+        Args:
+            query: 搜索查询
+            url: 搜索结果的链接
+            title: 搜索结果标题
+            content: 搜索返回的内容
+            score: 相关度评分
+            timestamp: ISO时间字符串或Unix时间戳，不提供则使用当前时间
+        """
+        set_attr = object.__setattr__
+        set_attr(self, "query", sys.intern(str(query)))
+        set_attr(self, "url", url)
+        set_attr(self, "title", title)
+        set_attr(self, "content", content)
+        set_attr(self, "score", score)
+        set_attr(self, "created_at", _to_epoch(timestamp))
+    
+    def __setattr__(self, name: str, value: Any):
+        raise AttributeError(f"Search是不可变对象，不能修改属性 {name}")
+    
+    def __delattr__(self, name: str):
+        raise AttributeError(f"Search是不可变对象，不能删除属性 {name}")
+    
+    def __reduce__(self):
+        return (Search, (self.query, self.url, self.title, self.content, self.score, self.created_at))
+    
+    def _fields(self) -> tuple:
+        return (self.query, self.url, self.title, self.content, self.score, self.created_at)
+    
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, Search):
+            return NotImplemented
+        return self._fields() == other._fields()
+    
+    def __hash__(self) -> int:
+        return hash(self._fields())
+    
+    def __repr__(self) -> str:
+        return f"Search(query={self.query!r}, url={self.url!r}, title={self.title!r}, score={self.score!r})"
+    
+    @property
+    def timestamp(self) -> str:
+        """ISO格式的时间字符串"""
+        return datetime.fromtimestamp(self.created_at).isoformat()
     
     def to_dict(self) -> Dict[str, Any]:
         """转换为字典格式"""
@@ -39,33 +113,201 @@ class Search:
             title=data.get("title", ""),
             content=data.get("content", ""),
             score=data.get("score"),
-            timestamp=data.get("timestamp", datetime.now().isoformat())
+            timestamp=data.get("timestamp")
         )
 
 
-@dataclass
+class SearchTable(Sequence):
+    """
+    段落搜索记录的列式存储
+    
+    每列一个列表或数组：不同的查询只保存一次，各条记录只保存查询编号；评分和时间戳保存在
+    array('d')中（评分缺失记为NaN）。按下标或迭代访问时生成Search对象，行为与List[Search]一致。
+    """
+    
+    __slots__ = ("_queries", "_query_index", "_query_ids", "_urls", "_titles", "_contents",
+                 "_scores", "_timestamps")
+    
+    def __init__(self, searches: Iterable[Search] = ()):
+        """
+        创建搜索记录表
+        
+        Args:
+            searches: 初始搜索记录
+        """
+        self._queries: List[str] = []
+        self._query_index: Dict[str, int] = {}
+        self._query_ids = array('I')
+        self._urls: List[str] = []
+        self._titles: List[str] = []
+        self._contents: List[str] = []
+        self._scores = array('d')
+        self._timestamps = array('d')
+        self.extend(searches)
+    
+    def add(self, query: str, url: str = "", title: str = "", content: str = "",
+            score: Optional[float] = None, timestamp: Union[str, float, None] = None):
+        """
+        添加一条搜索记录，无需先创建Search对象
+        
+        Args:
+            query: 搜索查询
+            url: 搜索结果的链接
+            title: 搜索结果标题
+            content: 搜索返回的内容
+            score: 相关度评分
+            timestamp: ISO时间字符串或Unix时间戳，不提供则使用当前时间
+        """
+        query_id = self._query_index.get(query)
+        if query_id is None:
+            query_id = len(self._queries)
+            self._queries.append(sys.intern(str(query)))
+            self._query_index[self._queries[-1]] = query_id
+        
+        self._query_ids.append(query_id)
+        self._urls.append(url)
+        self._titles.append(title)
+        self._contents.append(content)
+        self._scores.append(math.nan if score is None else float(score))
+        self._timestamps.append(_to_epoch(timestamp))
+    
+    def append(self, search: Search):
+        """添加搜索记录"""
+        self.add(search.query, search.url, search.title, search.content, search.score, search.created_at)
+    
+    def extend(self, searches: Iterable[Search]):
+        """批量添加搜索记录"""
+        for search in searches:
+            self.append(search)
+    
+    def queries(self) -> List[str]:
+        """获取去重后的查询列表（按首次出现顺序）"""
+        return list(self._queries)
+    
+    def _row(self, index: int) -> Search:
+        score = self._scores[index]
+        return Search(
+            query=self._queries[self._query_ids[index]],
+            url=self._urls[index],
+            title=self._titles[index],
+            content=self._contents[index],
+            score=None if math.isnan(score) else score,
+            timestamp=self._timestamps[index]
+        )
+    
+    def __len__(self) -> int:
+        return len(self._urls)
+    
+    def __getitem__(self, index: Union[int, slice]) -> Union[Search, List[Search]]:
+        if isinstance(index, slice):
+            return [self._row(i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("搜索记录下标越界")
+        return self._row(index)
+    
+    def __iter__(self) -> Iterator[Search]:
+        for index in range(len(self)):
+            yield self._row(index)
+    
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, (SearchTable, list)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+    
+    def __repr__(self) -> str:
+        return f"SearchTable({len(self)} 条记录, {len(self._queries)} 个查询)"
+    
+    def to_list(self) -> List[Dict[str, Any]]:
+        """转换为字典列表"""
+        return [search.to_dict() for search in self]
+    
+    def to_columns(self) -> Dict[str, List[Any]]:
+        """
+        导出各列数据，用于紧凑序列化
+        
+        Returns:
+            列名到列数据的字典，缺失的评分为None
+        """
+        return {
+            "queries": list(self._queries),
+            "query_ids": self._query_ids.tolist(),
+            "urls": list(self._urls),
+            "titles": list(self._titles),
+            "contents": list(self._contents),
+            "scores": [None if math.isnan(score) else score for score in self._scores],
+            "timestamps": self._timestamps.tolist()
+        }
+    
+    @classmethod
+    def from_columns(cls, columns: Dict[str, List[Any]]) -> "SearchTable":
+        """
+        从to_columns导出的列数据创建
+        
+        Args:
+            columns: 列数据，contents列可以是按需读取文本的序列（需支持append），此时直接使用而不复制
+        
+        Returns:
+            搜索记录表
+        """
+        table = cls()
+        table._queries = [sys.intern(query) for query in columns.get("queries", [])]
+        table._query_index = {query: i for i, query in enumerate(table._queries)}
+        table._query_ids = array('I', columns.get("query_ids", []))
+        table._urls = list(columns.get("urls", []))
+        table._titles = list(columns.get("titles", []))
+        contents = columns.get("contents", [])
+        table._contents = list(contents) if isinstance(contents, (list, tuple)) else contents
+        table._scores = array('d', (math.nan if score is None else score for score in columns.get("scores", [])))
+        table._timestamps = array('d', columns.get("timestamps", []))
+        return table
+    
+    @classmethod
+    def from_list(cls, data: Iterable[Dict[str, Any]]) -> "SearchTable":
+        """从字典列表创建"""
+        table = cls()
+        for item in data:
+            table.add(
+                query=item.get("query", ""),
+                url=item.get("url", ""),
+                title=item.get("title", ""),
+                content=item.get("content", ""),
+                score=item.get("score"),
+                timestamp=item.get("timestamp")
+            )
+        return table
+
+
+@dataclass(**_SLOTS)
 class Research:
     """段落研究过程的状态"""
-    search_history: List[Search] = field(default_factory=list)     # 搜索记录列表
+    search_history: SearchTable = field(default_factory=SearchTable)  # 搜索记录（列式存储）
     latest_summary: str = ""                                       # 当前段落的最新总结
     reflection_iteration: int = 0                                  # 反思迭代次数
     is_completed: bool = False                                     # 是否完成研究
     
+    def __post_init__(self):
+        # 兼容传入List[Search]的旧用法
+        if not isinstance(self.search_history, SearchTable):
+            self.search_history = SearchTable(self.search_history)
+    
     def add_search(self, search: Search):
         """添加搜索记录"""
         self.search_history.append(search)
     
     def add_search_results(self, query: str, results: List[Dict[str, Any]]):
         """批量添加搜索结果"""
+        timestamp = time.time()
         for result in results:
-            search = Search(
+            self.search_history.add(
                 query=query,
                 url=result.get("url", ""),
                 title=result.get("title", ""),
                 content=result.get("content", ""),
-                score=result.get("score")
+                score=result.get("score"),
+                timestamp=timestamp
             )
-            self.add_search(search)
     
     def get_search_count(self) -> int:
         """获取搜索次数"""
@@ -82,7 +324,7 @@ class Research:
     def to_dict(self) -> Dict[str, Any]:
         """转换为字典格式"""
         return {
-            "search_history": [search.to_dict() for search in self.search_history],
+            "search_history": self.search_history.to_list(),
             "latest_summary": self.latest_summary,
             "reflection_iteration": self.reflection_iteration,
             "is_completed": self.is_completed
@@ -91,21 +333,20 @@ class Research:
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> "Research":
         """从字典创建Research对象"""
-        search_history = [Search.from_dict(search_data) for search_data in data.get("search_history", [])]
         return cls(
-            search_history=search_history,
+            search_history=SearchTable.from_list(data.get("search_history", [])),
             latest_summary=data.get("latest_summary", ""),
             reflection_iteration=data.get("reflection_iteration", 0),
             is_completed=data.get("is_completed", False)
         )
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class Paragraph:
     """报告中单个段落的状态"""
     title: str = ""                                                # 段落标题
     content: str = ""                                              # 段落的预期内容（初始规划）
-    research: Research = field(default_factory=Research)          # 研究进度
+    research: Research = field(default_factory=Research)           # 研究进度
     order: int = 0                                                 # 段落顺序
     
     def is_completed(self) -> bool:
@@ -139,9 +380,41 @@ class Paragraph:
         )
 
 
+@dataclass(frozen=True, **_SLOTS)
+class ProgressSnapshot:
+    """某一时刻的研究进度，不可变，可在任意线程中读取"""
+    total_paragraphs: int = 0                                      # 总段落数
+    completed_paragraphs: int = 0                                  # 已完成段落数
+    is_completed: bool = False                                     # 整个报告是否完成
+    created_at: str = ""                                           # 状态创建时间
+    updated_at: str = ""                                           # 最近一次更新时间
+    
+    @property
+    def progress_percentage(self) -> float:
+        """完成百分比"""
+        return (self.completed_paragraphs / self.total_paragraphs * 100) if self.total_paragraphs > 0 else 0
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为字典格式（与State.get_progress_summary()的格式相同）"""
+        return {
+            "total_paragraphs": self.total_paragraphs,
+            "completed_paragraphs": self.completed_paragraphs,
+            "progress_percentage": self.progress_percentage,
+            "is_completed": self.is_completed,
+            "created_at": self.created_at,
+            "updated_at": self.updated_at
+        }
+
+
 @dataclass
 class State:
-    """整个报告的状态"""
+    """
+    整个报告的状态
+    
+    每次修改后（add_paragraph、update_timestamp、mark_completed）由写入方发布一个新的不可变进度快照，
+    替换快照只是一次引用赋值，其他线程通过progress或get_progress_summary()读取时无需加锁，
+    也不会遍历正在被修改的段落。直接修改段落后需调用update_timestamp()发布新的快照。
+    """
     query: str = ""                                                # 原始查询
     report_title: str = ""                                         # 报告标题
     paragraphs: List[Paragraph] = field(default_factory=list)     # 段落列表
@@ -149,6 +422,14 @@ class State:
     is_completed: bool = False                                     # 是否完成
     created_at: str = field(default_factory=lambda: datetime.now().isoformat())
     updated_at: str = field(default_factory=lambda: datetime.now().isoformat())
+    _progress: Optional[ProgressSnapshot] = field(default=None, init=False, repr=False, compare=False)
+    # 并发修改同一状态时，保证快照的计算与发布不会交错（避免较旧的快照覆盖较新的快照）；
+    # 每个状态各有一把锁，不同研究之间互不影响，不参与序列化
+    _publish_lock: Optional[threading.Lock] = field(default=None, init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        self._publish_lock = threading.Lock()
+        self.publish_progress()
     
     def add_paragraph(self, title: str, content: str) -> int:
         """
@@ -191,22 +472,29 @@ class State:
         self.update_timestamp()
     
     def update_timestamp(self):
-        """更新时间戳"""
+        """更新时间戳并发布新的进度快照"""
         self.updated_at = datetime.now().isoformat()
+        self.publish_progress()
+    
+    def publish_progress(self):
+        """根据当前段落重新计算进度，发布新的快照（由修改状态的线程调用）"""
+        with self._publish_lock:
+            self._progress = ProgressSnapshot(
+                total_paragraphs=self.get_total_paragraphs_count(),
+                completed_paragraphs=self.get_completed_paragraphs_count(),
+                is_completed=self.is_completed,
+                created_at=self.created_at,
+                updated_at=self.updated_at
+            )
+    
+    @property
+    def progress(self) -> ProgressSnapshot:
+        """最近一次发布的进度快照，O(1)且无需加锁"""
+        return self._progress
     
     def get_progress_summary(self) -> Dict[str, Any]:
-        """获取进度摘要"""
-        completed = self.get_completed_paragraphs_count()
-        total = self.get_total_paragraphs_count()
-        
-        return {
-            "total_paragraphs": total,
-            "completed_paragraphs": completed,
-            "progress_percentage": (completed / total * 100) if total > 0 else 0,
-            "is_completed": self.is_completed,
-            "created_at": self.created_at,
-            "updated_at": self.updated_at
-        }
+        """获取进度摘要（来自最近一次发布的快照）"""
+        return self._progress.to_dict()
     
     def to_dict(self) -> Dict[str, Any]:
         """转换为字典格式"""
@@ -245,14 +533,58 @@ class State:
         data = json.loads(json_str)
         return cls.from_dict(data)
     
-    def save_to_file(self, filepath: str):
-        """保存状态到文件"""
-        with open(filepath, 'w', encoding='utf-8') as f:
-            f.write(self.to_json())
+    def save_to_file(self, filepath: str, format: Optional[str] = None, compression: Optional[str] = None):
+        """
+        保存状态到文件
+        
+        Args:
+            filepath: 文件路径
+            format: json或binary，None表示按扩展名判断（.dsa为binary，其余为json）
+            compression: binary格式下文本块的压缩方式，None、zlib或lzma
+        """
+        if format is None:
+            format = "binary" if filepath.endswith(BINARY_STATE_EXTENSION) else "json"
+        
+        if format not in ("binary", "json"):
+            raise ValueError(f"不支持的状态文件格式: {format}")
+        
+        # 先写同目录下的临时文件再替换：写入中途失败不会损坏原文件，
+        # 延迟加载的状态也可能正映射着原文件
+        temp_path = f"{filepath}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            if format == "binary":
+                from .binary import write_state
+                with open(temp_path, 'wb') as f:
+                    write_state(self, f, compression=compression)
+            else:
+                from .streaming import write_state_json
+                with open(temp_path, 'w', encoding='utf-8') as f:
+                    write_state_json(self, f)
+            os.replace(temp_path, filepath)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
     
     @classmethod
-    def load_from_file(cls, filepath: str) -> "State":
-        """从文件加载状态"""
+    def load_from_file(cls, filepath: str, lazy: bool = False) -> "State":
+        """
+        从文件加载状态，自动识别JSON和二进制格式
+        
+        Args:
+            filepath: 文件路径
+            lazy: 是否延迟加载搜索内容（仅二进制格式），为True时只读取元数据，
+                  搜索内容在访问时才从内存映射的文件中读取
+        
+        Returns:
+            状态对象
+        """
+        from .binary import is_binary_state_file, open_state, read_state
+        if is_binary_state_file(filepath):
+            if lazy:
+                return open_state(filepath)
+            with open(filepath, 'rb') as f:
+                return read_state(f)
+        
+        from .streaming import read_state_json
         with open(filepath, 'r', encoding='utf-8') as f:
-            json_str = f.read()
-        return cls.from_json(json_str)
+            return read_state_json(f)
@@ -0,0 +1,241 @@
+"""
+状态的流式JSON读写
+写入时逐个段落、逐条搜索记录写到文件，不生成完整的字典树和JSON字符串；
+读取时逐个值解析，搜索记录直接写入SearchTable，不生成完整的字典树。
+输出与State.to_json()完全一致，两种方式写出的文件可以互相读取。
+"""
+
+import json
+from typing import Any, Dict, Iterable, Iterator, List, TextIO
+
+from .state import Paragraph, Research, SearchTable, State
+
+_decoder = json.JSONDecoder()
+
+# 读取时每次从文件读取的字符数
+READ_CHUNK_SIZE = 64 * 1024
+
+
+def _paragraph_items(paragraph: Paragraph) -> Dict[str, Any]:
+    """段落的字典形式，搜索记录为逐条生成的迭代器"""
+    research = paragraph.research
+    return {
+        "title": paragraph.title,
+        "content": paragraph.content,
+        "research": {
+            "search_history": (search.to_dict() for search in research.search_history),
+            "latest_summary": research.latest_summary,
+            "reflection_iteration": research.reflection_iteration,
+            "is_completed": research.is_completed
+        },
+        "order": paragraph.order
+    }
+
+
+def _state_items(state: State) -> Dict[str, Any]:
+    """状态的字典形式，段落为逐个生成的迭代器，键的顺序与State.to_dict()一致"""
+    return {
+        "query": state.query,
+        "report_title": state.report_title,
+        "paragraphs": (_paragraph_items(paragraph) for paragraph in state.paragraphs),
+        "final_report": state.final_report,
+        "is_completed": state.is_completed,
+        "created_at": state.created_at,
+        "updated_at": state.updated_at
+    }
+
+
+def _write_value(f: TextIO, value: Any, indent: int, level: int):
+    """按json.dumps(indent=indent)的格式写入一个值，字典和可迭代对象逐项写入"""
+    if isinstance(value, dict):
+        entries: Iterable = value.items()
+        open_char, close_char = "{", "}"
+    elif isinstance(value, (list, tuple, Iterator)):
+        entries = value
+        open_char, close_char = "[", "]"
+    else:
+        f.write(json.dumps(value, ensure_ascii=False))
+        return
+
+    inner = "\n" + " " * (indent * (level + 1))
+    empty = True
+    for entry in entries:
+        f.write((open_char if empty else ",") + inner)
+        empty = False
+        if open_char == "{":
+            key, entry = entry
+            f.write(json.dumps(key, ensure_ascii=False) + ": ")
+        _write_value(f, entry, indent, level + 1)
+
+    if empty:
+        f.write(open_char + close_char)
+    else:
+        f.write("\n" + " " * (indent * level) + close_char)
+
+
+def write_state_json(state: State, f: TextIO, indent: int = 2):
+    """
+    以JSON格式流式写入状态
+
+    Args:
+        state: 状态对象
+        f: 以文本模式打开的文件
+        indent: 缩进空格数
+    """
+    _write_value(f, _state_items(state), indent, 0)
+
+
+class _JsonReader:
+    """
+    按需从文件读取并解析JSON
+
+    iter_object和iter_array逐个进入对象的键和数组的元素，调用方在每次迭代中必须用
+    read_value或嵌套的iter_*消费掉当前的值。缓冲区只保留尚未解析的部分。
+    """
+
+    def __init__(self, f: TextIO, chunk_size: int = READ_CHUNK_SIZE):
+        self._f = f
+        self._chunk_size = chunk_size
+        self._buffer = ""
+        self._pos = 0
+        self._eof = False
+
+    def _fill(self, size: int) -> bool:
+        """读取更多数据，丢弃已解析的部分，返回是否读到了数据"""
+        chunk = self._f.read(size)
+        if not chunk:
+            self._eof = True
+            return False
+        self._buffer = self._buffer[self._pos:] + chunk
+        self._pos = 0
+        return True
+
+    def peek(self) -> str:
+        """跳过空白并返回下一个字符，文件结束时返回空字符串"""
+        while True:
+            while self._pos < len(self._buffer) and self._buffer[self._pos].isspace():
+                self._pos += 1
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if not self._fill(self._chunk_size):
+                return ""
+
+    def _expect(self, char: str):
+        if self.peek() != char:
+            raise ValueError(f"JSON格式错误：位置 {self._pos} 处应为 {char!r}")
+        self._pos += 1
+
+    def read_value(self) -> Any:
+        """解析下一个完整的值"""
+        self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError as e:
+                # 值可能被缓冲区截断，读取更多数据后重试；每次至少加倍，避免大字符串反复解析
+                if self._eof or not self._fill(max(self._chunk_size, len(self._buffer) - self._pos)):
+                    raise ValueError(f"JSON格式错误: {e}") from e
+                continue
+            # 数字可能恰好在缓冲区末尾被截断
+            if end == len(self._buffer) and not self._eof and \
+                    self._fill(max(self._chunk_size, len(self._buffer) - self._pos)):
+                continue
+            self._pos = end
+            return value
+
+    def _iter_container(self, open_char: str, close_char: str, is_object: bool) -> Iterator[Any]:
+        self._expect(open_char)
+        if self.peek() == close_char:
+            self._pos += 1
+            return
+        while True:
+            if is_object:
+                key = self.read_value()
+                if not isinstance(key, str):
+                    raise ValueError("JSON格式错误：对象的键必须是字符串")
+                self._expect(":")
+                yield key
+            else:
+                yield None
+
+            char = self.peek()
+            self._pos += 1
+            if char == close_char:
+                return
+            if char != ",":
+                raise ValueError(f"JSON格式错误：位置 {self._pos - 1} 处应为 ',' 或 {close_char!r}")
+
+    def iter_object(self) -> Iterator[str]:
+        """逐个返回对象的键，读取位置停在对应的值之前"""
+        return self._iter_container("{", "}", True)
+
+    def iter_array(self) -> Iterator[None]:
+        """逐个进入数组元素，读取位置停在元素之前"""
+        return self._iter_container("[", "]", False)
+
+
+def _read_research(reader: _JsonReader) -> Research:
+    fields: Dict[str, Any] = {}
+    table = SearchTable()
+    for key in reader.iter_object():
+        if key == "search_history" and reader.peek() == "[":
+            for _ in reader.iter_array():
+                item = reader.read_value()
+                table.add(
+                    query=item.get("query", ""),
+                    url=item.get("url", ""),
+                    title=item.get("title", ""),
+                    content=item.get("content", ""),
+                    score=item.get("score"),
+                    timestamp=item.get("timestamp")
+                )
+        else:
+            fields[key] = reader.read_value()
+
+    research = Research.from_dict(fields)
+    research.search_history = table
+    return research
+
+
+def _read_paragraph(reader: _JsonReader) -> Paragraph:
+    fields: Dict[str, Any] = {}
+    research = None
+    for key in reader.iter_object():
+        if key == "research" and reader.peek() == "{":
+            research = _read_research(reader)
+        else:
+            fields[key] = reader.read_value()
+
+    paragraph = Paragraph.from_dict(fields)
+    if research is not None:
+        paragraph.research = research
+    return paragraph
+
+
+def read_state_json(f: TextIO) -> State:
+    """
+    流式读取JSON格式的状态
+
+    Args:
+        f: 以文本模式打开的文件
+
+    Returns:
+        状态对象
+    """
+    reader = _JsonReader(f)
+    fields: Dict[str, Any] = {}
+    paragraphs: List[Paragraph] = []
+    for key in reader.iter_object():
+        if key == "paragraphs" and reader.peek() == "[":
+            for _ in reader.iter_array():
+                paragraphs.append(_read_paragraph(reader))
+        else:
+            fields[key] = reader.read_value()
+
+    if reader.peek():
+        raise ValueError("JSON格式错误：状态对象之后还有多余的内容")
+
+    state = State.from_dict(fields)
+    state.paragraphs = paragraphs
+    state.publish_progress()
+    return state
@@ -3,6 +3,21 @@
 提供外部工具接口，如网络搜索等
 """
 
-from .search import tavily_search, SearchResult
+from .base import BaseSearch, SearchResult, SearchRegistry, search_registry
+from .search import TavilySearch, tavily_search
+from .local_search import LocalSearch
+from .meta_search import MetaSearch
+from .semantic_cache import SemanticSearchCache, HashingEmbedder
 
-__all__ = ["tavily_search", "SearchResult"]
+__all__ = [
+    "BaseSearch",
+    "SearchResult",
+    "SearchRegistry",
+    "search_registry",
+    "TavilySearch",
+    "tavily_search",
+    "LocalSearch",
+    "MetaSearch",
+    "SemanticSearchCache",
+    "HashingEmbedder"
+]
@@ -0,0 +1,103 @@
+"""
+搜索后端基础接口
+定义所有搜索后端需要遵循的接口，以及按名称创建后端的注册表
+"""
+
+import logging
+import threading
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class SearchResult:
+    """搜索结果数据类"""
+    title: str
+    url: str
+    content: str
+    score: Optional[float] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为字典格式"""
+        return {
+            "title": self.title,
+            "url": self.url,
+            "content": self.content,
+            "score": self.score
+        }
+
+
+class BaseSearch(ABC):
+    """搜索后端基础抽象类"""
+
+    # 后端名称，用于日志和注册表
+    name: str = "base"
+
+    @abstractmethod
+    def search(self, query: str, max_results: int = 5, include_raw_content: bool = True,
+               timeout: int = 240) -> List[SearchResult]:
+        """
+        执行搜索
+
+        Args:
+            query: 搜索查询
+            max_results: 最大结果数量
+            include_raw_content: 是否包含原始内容
+            timeout: 超时时间（秒）
+
+        Returns:
+            搜索结果列表，出错时返回空列表
+        """
+        pass
+
+
+# 搜索后端构造函数，接受关键字参数
+SearchFactory = Callable[..., BaseSearch]
+
+
+class SearchRegistry:
+    """按名称注册和创建搜索后端"""
+
+    def __init__(self):
+        self._factories: Dict[str, SearchFactory] = {}
+        self._lock = threading.Lock()
+
+    def register(self, name: str, factory: SearchFactory):
+        """
+        注册搜索后端
+
+        Args:
+            name: 后端名称，如tavily、local、meta
+            factory: 构造函数或后端类，接受关键字参数
+        """
+        with self._lock:
+            self._factories[name] = factory
+
+    def create(self, name: str, **kwargs: Any) -> BaseSearch:
+        """
+        创建搜索后端
+
+        Args:
+            name: 后端名称
+            **kwargs: 传给构造函数的参数
+
+        Returns:
+            搜索后端实例
+        """
+        with self._lock:
+            factory = self._factories.get(name)
+        if factory is None:
+            raise ValueError(f"未注册的搜索后端: {name}（可用: {', '.join(self.names())}）")
+        return factory(**kwargs)
+
+    def names(self) -> List[str]:
+        """获取已注册的后端名称"""
+        with self._lock:
+            return sorted(self._factories)
+
+
+# 全局搜索后端注册表
+search_registry = SearchRegistry()
@@ -0,0 +1,202 @@
+"""
+本地全文搜索
+基于SQLite FTS5索引本地文档（如历史报告、资料库），无需网络即可搜索
+"""
+
+import logging
+import re
+import sqlite3
+import threading
+import unicodedata
+from pathlib import Path
+from typing import Iterable, List, Optional
+
+from .base import BaseSearch, SearchResult, search_registry
+
+logger = logging.getLogger(__name__)
+
+# 默认索引的文件类型
+DEFAULT_EXTENSIONS = (".md", ".txt")
+
+# 中文字符
+_CJK_PATTERN = re.compile(r'[\u4e00-\u9fff]+')
+
+# 单次查询最多使用的匹配词数
+_MAX_MATCH_TERMS = 64
+
+
+class LocalSearch(BaseSearch):
+    """
+    SQLite FTS5本地全文搜索
+
+    优先使用trigram分词器，支持中文等不以空格分词的文本按子串匹配；
+    SQLite版本过低（<3.34）时退回unicode61分词器。
+    """
+
+    name = "local"
+
+    def __init__(self, db_path: str = ":memory:", paths: Optional[Iterable[str]] = None,
+                 extensions: Iterable[str] = DEFAULT_EXTENSIONS):
+        """
+        初始化本地搜索
+
+        Args:
+            db_path: 索引数据库路径，默认使用内存数据库
+            paths: 启动时索引的文件或目录
+            extensions: 索引目录时包含的文件扩展名
+        """
+        self.db_path = db_path
+        self.extensions = tuple(extension.lower() for extension in extensions)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.tokenizer = self._create_schema()
+
+        for path in paths or []:
+            self.index_path(path)
+
+    def _create_schema(self) -> str:
+        """创建全文索引表，返回使用的分词器"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'documents'"
+            ).fetchone()
+            if row:
+                return "trigram" if "trigram" in row[0] else "unicode61"
+
+            for tokenizer in ("trigram", "unicode61"):
+                try:
+                    self._conn.execute(
+                        "CREATE VIRTUAL TABLE documents USING fts5("
+                        f"url UNINDEXED, title, content, tokenize='{tokenizer}')"
+                    )
+                    self._conn.commit()
+                    return tokenizer
+                except sqlite3.OperationalError as e:
+                    logger.debug("FTS5分词器 %s 不可用: %s", tokenizer, e)
+
+        raise RuntimeError("当前SQLite不支持FTS5，无法使用本地搜索")
+
+    def add_document(self, url: str, title: str, content: str):
+        """
+        添加或更新文档
+
+        Args:
+            url: 文档地址，作为唯一标识
+            title: 标题
+            content: 正文
+        """
+        with self._lock:
+            self._conn.execute("DELETE FROM documents WHERE url = ?", (url,))
+            self._conn.execute("INSERT INTO documents (url, title, content) VALUES (?, ?, ?)",
+                               (url, title, content))
+            self._conn.commit()
+
+    def index_path(self, path: str) -> int:
+        """
+        索引文件或目录（递归）
+
+        Args:
+            path: 文件或目录路径
+
+        Returns:
+            索引的文件数
+        """
+        root = Path(path)
+        if root.is_file():
+            files = [root]
+        elif root.is_dir():
+            files = [file for file in sorted(root.rglob("*"))
+                     if file.is_file() and file.suffix.lower() in self.extensions]
+        else:
+            logger.warning("本地搜索路径不存在: %s", path)
+            return 0
+
+        count = 0
+        for file in files:
+            try:
+                content = file.read_text(encoding="utf-8", errors="ignore")
+            except OSError as e:
+                logger.warning("读取文件失败 (%s): %s", file, e)
+                continue
+            self.add_document(file.resolve().as_uri(), self._extract_title(content, file), content)
+            count += 1
+
+        logger.info("本地搜索已索引 %d 个文件: %s", count, path)
+        return count
+
+    @staticmethod
+    def _extract_title(content: str, file: Path) -> str:
+        """取第一个Markdown标题作为标题，没有时使用文件名"""
+        match = re.search(r'^#+\s+(.+)$', content, re.MULTILINE)
+        return match.group(1).strip() if match else file.stem
+
+    def _build_match(self, query: str) -> str:
+        """把查询转换为FTS5 MATCH表达式，各词之间为OR，由bm25排序"""
+        tokens = re.findall(r'\w+', unicodedata.normalize("NFKC", query).lower())
+
+        terms = []
+        for token in tokens:
+            if self.tokenizer != "trigram":
+                terms.append(token)
+            elif _CJK_PATTERN.search(token):
+                # 中文没有空格分词，拆成包含中文的重叠三字片段，其中的英文和数字（如年份）整体匹配
+                terms.extend(token[i:i + 3] for i in range(len(token) - 2)
+                             if _CJK_PATTERN.search(token[i:i + 3]))
+                terms.extend(part for part in _CJK_PATTERN.split(token) if len(part) >= 3)
+            elif len(token) >= 3:
+                terms.append(token)
+
+        terms = list(dict.fromkeys(terms))[:_MAX_MATCH_TERMS]
+        return " OR ".join('"{}"'.format(term.replace('"', '""')) for term in terms)
+
+    def search(self, query: str, max_results: int = 5, include_raw_content: bool = True,
+               timeout: int = 240) -> List[SearchResult]:
+        """
+        执行本地全文搜索
+
+        Args:
+            query: 搜索查询
+            max_results: 最大结果数量
+            include_raw_content: 是否返回全文，否则返回匹配片段
+            timeout: 超时时间（秒），本地搜索不使用
+
+        Returns:
+            搜索结果列表，按相关度排序
+        """
+        match = self._build_match(query)
+        if not match:
+            return []
+
+        content_column = "content" if include_raw_content else "snippet(documents, 2, '', '', '...', 64)"
+        sql = (
+            f"SELECT url, title, {content_column}, bm25(documents) AS rank FROM documents "
+            "WHERE documents MATCH ? ORDER BY rank LIMIT ?"
+        )
+
+        try:
+            with self._lock:
+                rows = self._conn.execute(sql, (match, max_results)).fetchall()
+        except sqlite3.Error as e:
+            logger.warning("本地搜索错误 (%s): %s", query, e)
+            return []
+
+        # bm25越小越相关，按最相关结果换算到0~1之间
+        best_rank = rows[0][3] if rows else 0.0
+        return [
+            SearchResult(title=title, url=url, content=content,
+                         score=rank / best_rank if best_rank else 1.0)
+            for url, title, content, rank in rows
+        ]
+
+    def count(self) -> int:
+        """获取已索引的文档数"""
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+
+    def close(self):
+        """关闭索引数据库"""
+        with self._lock:
+            self._conn.close()
+
+
+search_registry.register("local", LocalSearch)
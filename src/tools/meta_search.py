@@ -0,0 +1,120 @@
+"""
+多引擎元搜索
+并发查询多个搜索后端，按URL合并结果，在截止时间内返回已到达的结果
+"""
+
+import logging
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit, urlunsplit
+
+from .base import BaseSearch, SearchResult, search_registry
+
+logger = logging.getLogger(__name__)
+
+
+def _normalize_url(url: str) -> str:
+    """规范化URL用于去重：忽略协议、大小写主机名、片段和末尾斜杠"""
+    parts = urlsplit(url.strip())
+    if not parts.netloc:
+        return url.strip()
+    path = parts.path.rstrip("/")
+    return urlunsplit(("", parts.netloc.lower(), path, parts.query, ""))
+
+
+class MetaSearch(BaseSearch):
+    """
+    元搜索后端
+
+    每次搜索把查询同时发给所有后端，截止时间到达后不再等待未返回的后端，
+    直接合并已到达的结果。相同URL只保留一条（取评分最高的那条），
+    排序时被越多后端命中、评分越高的结果越靠前。
+    """
+
+    name = "meta"
+
+    def __init__(self, backends: List[BaseSearch], deadline: float = 15.0, max_workers: Optional[int] = None):
+        """
+        初始化元搜索
+
+        Args:
+            backends: 参与搜索的后端列表
+            deadline: 每次搜索的最长等待时间（秒）
+            max_workers: 执行搜索的线程数，默认每个后端可同时执行两次搜索
+        """
+        if not backends:
+            raise ValueError("元搜索至少需要一个搜索后端")
+
+        self.backends = backends
+        self.deadline = deadline
+        # 超过截止时间的搜索仍在后台线程中执行，不能用with关闭线程池，否则会等待它们完成
+        self._executor = ThreadPoolExecutor(max_workers=max_workers or 2 * len(backends),
+                                            thread_name_prefix="meta-search")
+
+    def search(self, query: str, max_results: int = 5, include_raw_content: bool = True,
+               timeout: int = 240) -> List[SearchResult]:
+        """
+        并发搜索并合并结果
+
+        Args:
+            query: 搜索查询
+            max_results: 最大结果数量
+            include_raw_content: 是否包含原始内容
+            timeout: 单个后端的超时时间（秒），实际等待时间不超过deadline
+
+        Returns:
+            合并后的搜索结果列表
+        """
+        start = time.monotonic()
+        futures = {
+            self._executor.submit(backend.search, query, max_results, include_raw_content,
+                                  min(timeout, self.deadline)): backend
+            for backend in self.backends
+        }
+
+        responses: List[Tuple[str, List[SearchResult]]] = []
+        pending = set(futures)
+        while pending:
+            remaining = self.deadline - (time.monotonic() - start)
+            if remaining <= 0:
+                break
+            done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+            for future in done:
+                backend = futures[future]
+                try:
+                    responses.append((backend.name, future.result()))
+                except Exception as e:
+                    logger.warning("搜索后端 %s 出错 (%s): %s", backend.name, query, e)
+
+        if pending:
+            logger.info("元搜索截止时间已到，%d 个后端未返回: %s", len(pending),
+                        ", ".join(futures[future].name for future in pending))
+
+        return self._merge(responses)[:max_results]
+
+    @staticmethod
+    def _merge(responses: List[Tuple[str, List[SearchResult]]]) -> List[SearchResult]:
+        """按URL合并各后端的结果"""
+        merged: Dict[str, SearchResult] = {}
+        hits: Dict[str, int] = {}
+        # 同一后端内部的排名，用于评分缺失时保持原有顺序
+        ranks: Dict[str, int] = {}
+
+        for _, results in responses:
+            for rank, result in enumerate(results):
+                key = _normalize_url(result.url) if result.url else f"{id(result)}"
+                hits[key] = hits.get(key, 0) + 1
+                ranks[key] = min(ranks.get(key, rank), rank)
+                current = merged.get(key)
+                if current is None or (result.score or 0.0) > (current.score or 0.0):
+                    merged[key] = result
+
+        return [
+            merged[key] for key in sorted(
+                merged, key=lambda key: (-hits[key], -(merged[key].score or 0.0), ranks[key])
+            )
+        ]
+
+
+search_registry.register("meta", MetaSearch)
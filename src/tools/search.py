@@ -4,32 +4,19 @@
 """
 
 import os
+import logging
 from typing import List, Dict, Any, Optional
-from dataclasses import dataclass
-from tavily import TavilyClient
 
+from .base import BaseSearch, SearchResult, search_registry
 
-@dataclass
-class SearchResult:
-    """搜索结果数据类"""
-    title: str
-    url: str
-    content: str
-    score: Optional[float] = None
-    
-    def to_dict(self) -> Dict[str, Any]:
-        """转换为字典格式"""
-        return {
-            "title": self.title,
-            "url": self.url,
-            "content": self.content,
-            "score": self.score
-        }
+logger = logging.getLogger(__name__)
 
 
-class TavilySearch:
+class TavilySearch(BaseSearch):
     """Tavily搜索客户端封装"""
     
+    name = "tavily"
+    
     def __init__(self, api_key: Optional[str] = None):
         """
         初始化Tavily搜索客户端
@@ -42,7 +29,17 @@ class TavilySearch:
             if not api_key:
                 raise ValueError("Tavily API Key未找到！请设置TAVILY_API_KEY环境变量或在初始化时提供")
         
-        self.client = TavilyClient(api_key=api_key)
+        self.api_key = api_key
+        # Tavily客户端在首次搜索时创建
+        self._client = None
+    
+    @property
+    def client(self):
+        """Tavily客户端，首次访问时才导入tavily并创建"""
+        if self._client is None:
+            from tavily import TavilyClient
+            self._client = TavilyClient(api_key=self.api_key)
+        return self._client
     
     def search(self, query: str, max_results: int = 5, include_raw_content: bool = True, 
                timeout: int = 240) -> List[SearchResult]:
@@ -82,10 +79,13 @@ class TavilySearch:
             return results
             
         except Exception as e:
-            print(f"搜索错误: {str(e)}")
+            logger.warning("搜索错误 (%s): %s", query, e)
             return []
 
 
+search_registry.register("tavily", TavilySearch)
+
+
 # 全局搜索客户端实例
 _tavily_client = None
 
@@ -127,7 +127,7 @@ def tavily_search(query: str, max_results: int = 5, include_raw_content: bool =
         return [result.to_dict() for result in results]
         
     except Exception as e:
-        print(f"搜索功能调用错误: {str(e)}")
+        logger.error("搜索功能调用错误: %s", e)
         return []
 
 
@@ -0,0 +1,373 @@
+"""
+搜索语义缓存
+用本地字符n-gram哈希向量计算查询相似度，措辞不同但含义相近的查询直接返回缓存的搜索结果
+"""
+
+import atexit
+import json
+import logging
+import math
+import os
+import re
+import tempfile
+import threading
+import time
+import unicodedata
+import weakref
+import zlib
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..utils.text_processing import normalize_search_query
+
+logger = logging.getLogger(__name__)
+
+# numpy模块，首次查找近邻时才导入；False表示尚未尝试导入
+_np: Any = False
+
+
+def _numpy():
+    """按需导入numpy，未安装时返回None（numpy为可选依赖，缺少时使用纯Python实现）"""
+    global _np
+    if _np is False:
+        try:
+            import numpy
+            _np = numpy
+        except ImportError:
+            _np = None
+    return _np
+
+# 稀疏向量：维度下标 -> 权重
+SparseVector = Dict[int, float]
+
+# 按非文字字符切分查询
+_SEGMENT_PATTERN = re.compile(r"[^\w]+", re.UNICODE)
+
+# 内容词：单个中日韩字符、数字串、其他文字的连续字母
+_CJK = "\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff\uac00-\ud7af"
+_TOKEN_PATTERN = re.compile(rf"[{_CJK}]|\d+|[^{_CJK}\d\W_]+")
+
+# 不影响查询含义的虚词，比较内容词时忽略
+_STOP_TOKENS = frozenset([
+    "的", "了", "和", "与", "及", "年", "在", "对",
+    "the", "a", "an", "of", "in", "on", "for", "and", "to", "vs", "about", "with"
+])
+
+
+def _content_tokens(query: str) -> frozenset:
+    """
+    提取查询的内容词集合
+
+    n-gram相似度对只差一两个字符的实体不敏感（如"UK"和"US"、"美国"和"中国"），
+    语义命中还要求两条查询的内容词完全相同，只允许词序、空格、标点、大小写和虚词不同。
+    """
+    text = unicodedata.normalize("NFKC", query).lower()
+    return frozenset(token for token in _TOKEN_PATTERN.findall(text) if token not in _STOP_TOKENS)
+
+
+class HashingEmbedder:
+    """
+    字符n-gram哈希向量
+
+    把查询切成片段后提取字符n-gram，哈希到固定维度并做L2归一化。不依赖模型，
+    对词序调整、空格和标点差异不敏感，适合判断搜索查询是否近似重复。
+    """
+
+    def __init__(self, dim: int = 1024, ngram_range: Tuple[int, int] = (1, 3)):
+        """
+        初始化哈希向量器
+
+        Args:
+            dim: 向量维度
+            ngram_range: 字符n-gram长度范围
+        """
+        self.dim = dim
+        self.ngram_range = ngram_range
+
+    def _features(self, text: str) -> List[str]:
+        """提取字符n-gram特征"""
+        features = []
+        min_n, max_n = self.ngram_range
+        for segment in _SEGMENT_PATTERN.split(text.lower()):
+            if not segment:
+                continue
+            for n in range(min_n, max_n + 1):
+                for i in range(len(segment) - n + 1):
+                    features.append(segment[i:i + n])
+        return features
+
+    def embed(self, text: str) -> SparseVector:
+        """
+        计算文本的归一化稀疏向量
+
+        Args:
+            text: 输入文本
+
+        Returns:
+            稀疏向量
+        """
+        vector: SparseVector = {}
+        for feature in self._features(text):
+            # crc32在不同进程间稳定，持久化的缓存重新加载后仍可比较
+            index = zlib.crc32(feature.encode("utf-8")) % self.dim
+            vector[index] = vector.get(index, 0.0) + 1.0
+
+        norm = math.sqrt(sum(weight * weight for weight in vector.values()))
+        if norm:
+            vector = {index: weight / norm for index, weight in vector.items()}
+        return vector
+
+
+@dataclass
+class _CacheEntry:
+    """单条缓存记录"""
+    query: str
+    max_results: int
+    results: List[Dict[str, Any]]
+    backend: str
+    created_at: float
+    vector: SparseVector
+    tokens: frozenset
+
+
+class SemanticSearchCache:
+    """
+    搜索结果的语义缓存
+
+    先按规范化后相同的查询查找，未命中时在所有缓存查询中找余弦相似度最高的一条，
+    超过阈值且内容词（实体、数字等）完全相同即视为命中。安装了numpy时使用矩阵运算，否则逐条计算稀疏向量点积。
+
+    内容词相同时阈值仍然起作用：中文的内容词是单个汉字，语序不同、含义不同的查询
+    （如"中国收购美国公司"和"美国收购中国公司"）内容词相同但相似度较低，由阈值拒绝；
+    英文查询的内容词是整词，内容词相同时相似度通常高于阈值。
+
+    每条记录带有搜索后端标识，只有同一组后端的查询才能命中，共享的持久化文件中
+    不同后端（如tavily和local）的结果不会混用。
+    """
+
+    def __init__(self, threshold: float = 0.88, max_entries: int = 1024, ttl: Optional[float] = None,
+                 persist_path: Optional[str] = None, embedder: Optional[HashingEmbedder] = None,
+                 flush_every: int = 32):
+        """
+        初始化语义缓存
+
+        Args:
+            threshold: 余弦相似度阈值，越高越严格
+            max_entries: 最多缓存的查询数，超过时淘汰最早的记录
+            ttl: 缓存有效期（秒），None表示不过期
+            persist_path: 持久化文件路径，提供时启动加载，可在多次运行之间共享
+            embedder: 向量器，默认使用HashingEmbedder
+            flush_every: 累计写入多少条后保存一次持久化文件；其余写入在flush()或进程退出时保存
+        """
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.persist_path = persist_path
+        self.embedder = embedder or HashingEmbedder()
+        self.flush_every = flush_every
+
+        self._entries: "OrderedDict[str, _CacheEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._matrix = None
+        self._matrix_keys: List[str] = []
+        self._stats = {"hits": 0, "semantic_hits": 0, "misses": 0}
+        self._unsaved = 0
+
+        if persist_path:
+            if os.path.exists(persist_path):
+                self._load()
+            # 只持有弱引用，缓存被回收后不再保存
+            atexit.register(_flush_on_exit, weakref.ref(self))
+
+    @staticmethod
+    def _key(query: str, max_results: int, backend: str) -> str:
+        return f"{backend}\x00{max_results}\x00{normalize_search_query(query)}"
+
+    def _is_expired(self, entry: _CacheEntry, now: float) -> bool:
+        return self.ttl is not None and now - entry.created_at > self.ttl
+
+    def get(self, query: str, max_results: int, backend: str = "") -> Optional[List[Dict[str, Any]]]:
+        """
+        查找缓存的搜索结果
+
+        Args:
+            query: 搜索查询
+            max_results: 需要的结果数量，只匹配结果数量不少于此值的缓存
+            backend: 搜索后端标识，只匹配同一后端写入的缓存
+
+        Returns:
+            搜索结果列表的副本，未命中时返回None
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(self._key(query, max_results, backend))
+            if entry is not None and not self._is_expired(entry, now):
+                self._stats["hits"] += 1
+                return [dict(result) for result in entry.results[:max_results]]
+
+            best, similarity = self._nearest(self.embedder.embed(query), _content_tokens(query), max_results,
+                                             backend, now)
+            if best is None or similarity < self.threshold:
+                self._stats["misses"] += 1
+                return None
+
+            self._stats["hits"] += 1
+            self._stats["semantic_hits"] += 1
+
+        logger.info("搜索语义缓存命中: '%s' ≈ '%s' (相似度 %.2f)", query, best.query, similarity)
+        return [dict(result) for result in best.results[:max_results]]
+
+    def _nearest(self, vector: SparseVector, tokens: frozenset, max_results: int, backend: str,
+                 now: float) -> Tuple[Optional[_CacheEntry], float]:
+        """找到相似度最高且可用的缓存记录（调用方持有锁）"""
+        if not vector or not self._entries:
+            return None, 0.0
+
+        np = _numpy()
+        if np is not None:
+            if self._matrix is None:
+                self._rebuild_matrix()
+            query_vector = np.zeros(self.embedder.dim, dtype=np.float32)
+            for index, weight in vector.items():
+                query_vector[index] = weight
+            scores = self._matrix @ query_vector
+            candidates = ((self._entries[key], float(score))
+                          for key, score in zip(self._matrix_keys, scores))
+        else:
+            candidates = (
+                (entry, sum(weight * entry.vector.get(index, 0.0) for index, weight in vector.items()))
+                for entry in self._entries.values()
+            )
+
+        best, best_score = None, 0.0
+        for entry, score in candidates:
+            if (score > best_score and entry.tokens == tokens and entry.backend == backend
+                    and entry.max_results >= max_results and not self._is_expired(entry, now)):
+                best, best_score = entry, score
+        return best, best_score
+
+    def _rebuild_matrix(self):
+        """把所有缓存向量排成稠密矩阵（调用方持有锁）"""
+        np = _numpy()
+        self._matrix_keys = list(self._entries)
+        self._matrix = np.zeros((len(self._matrix_keys), self.embedder.dim), dtype=np.float32)
+        for row, key in enumerate(self._matrix_keys):
+            for index, weight in self._entries[key].vector.items():
+                self._matrix[row, index] = weight
+
+    def put(self, query: str, max_results: int, results: List[Dict[str, Any]], backend: str = ""):
+        """
+        写入搜索结果，空结果不缓存
+
+        Args:
+            query: 搜索查询
+            max_results: 搜索时请求的结果数量
+            results: 搜索结果列表
+            backend: 搜索后端标识
+        """
+        if not results:
+            return
+
+        entry = _CacheEntry(
+            query=query.strip(),
+            max_results=max_results,
+            results=[dict(result) for result in results],
+            backend=backend,
+            created_at=time.time(),
+            vector=self.embedder.embed(query),
+            tokens=_content_tokens(query)
+        )
+
+        with self._lock:
+            key = self._key(query, max_results, backend)
+            self._entries.pop(key, None)
+            self._entries[key] = entry
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self._matrix = None
+
+            # 每次写入都重写整个文件代价很高，累计到flush_every条后才保存
+            self._unsaved += 1
+            if self.persist_path and self._unsaved >= self.flush_every:
+                self._save()
+
+    def flush(self):
+        """把尚未保存的写入保存到持久化文件"""
+        with self._lock:
+            if self.persist_path and self._unsaved:
+                self._save()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        获取缓存统计
+
+        Returns:
+            包含条目数、命中数（其中语义命中数）、未命中数和命中率的字典
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats["entries"] = len(self._entries)
+        total = stats["hits"] + stats["misses"]
+        stats["hit_ratio"] = stats["hits"] / total if total else 0.0
+        return stats
+
+    def clear(self):
+        """清空缓存"""
+        with self._lock:
+            self._entries.clear()
+            self._matrix = None
+            if self.persist_path:
+                self._save()
+
+    def _save(self):
+        """原子写入持久化文件（调用方持有锁）"""
+        data = [
+            {"query": entry.query, "max_results": entry.max_results, "backend": entry.backend,
+             "results": entry.results, "created_at": entry.created_at}
+            for entry in self._entries.values()
+        ]
+        directory = os.path.dirname(os.path.abspath(self.persist_path))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(tmp_path, self.persist_path)
+            self._unsaved = 0
+        except Exception as e:
+            logger.warning("保存搜索缓存失败: %s", e)
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def _load(self):
+        """加载持久化文件，重新计算向量并跳过已过期的记录"""
+        try:
+            with open(self.persist_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except Exception as e:
+            logger.warning("加载搜索缓存失败: %s", e)
+            return
+
+        now = time.time()
+        for item in data[-self.max_entries:]:
+            entry = _CacheEntry(
+                query=item["query"],
+                max_results=item["max_results"],
+                results=item["results"],
+                backend=item.get("backend", ""),
+                created_at=item.get("created_at", now),
+                vector=self.embedder.embed(item["query"]),
+                tokens=_content_tokens(item["query"])
+            )
+            if not self._is_expired(entry, now):
+                self._entries[self._key(entry.query, entry.max_results, entry.backend)] = entry
+
+        logger.info("已加载 %d 条搜索缓存", len(self._entries))
+
+
+def _flush_on_exit(cache_ref: "weakref.ref[SemanticSearchCache]"):
+    """进程退出时保存仍存活的缓存中尚未保存的写入"""
+    cache = cache_ref()
+    if cache is not None:
+        cache.flush()
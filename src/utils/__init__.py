@@ -9,10 +9,15 @@ from .text_processing import (
     remove_reasoning_from_output,
     extract_clean_response,
     update_state_with_search_results,
-    format_search_results_for_prompt
+    format_search_results_for_prompt,
+    normalize_search_query,
+    dump_prompt_input
 )
 
 from .config import Config, load_config
+from .logger import setup_logging, setup_logging_from_config
+from .single_flight import SingleFlight
+from .memo import MemoStore
 
 __all__ = [
     "clean_json_tags",
@@ -21,6 +26,12 @@ __all__ = [
     "extract_clean_response",
     "update_state_with_search_results",
     "format_search_results_for_prompt",
+    "normalize_search_query",
+    "dump_prompt_input",
     "Config",
-    "load_config"
+    "load_config",
+    "setup_logging",
+    "setup_logging_from_config",
+    "SingleFlight",
+    "MemoStore"
 ]
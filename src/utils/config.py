@@ -4,8 +4,11 @@
 """
 
 import os
+import logging
 from dataclasses import dataclass
-from typing import Optional, List
+from typing import Optional, List, Dict
+
+logger = logging.getLogger(__name__)
 
 
 @dataclass
@@ -17,40 +20,122 @@ class Config:
     tavily_api_key: Optional[str] = None
     
     # 模型配置
-    default_llm_provider: str = "deepseek"  # deepseek 或 openai
+    default_llm_provider: str = "deepseek"  # deepseek、openai 或 local
     deepseek_model: str = "deepseek-chat"
     openai_model: str = "gpt-4o-mini"
     
+    # 本地模型配置（OpenAI兼容接口，如vLLM、llama.cpp server、Ollama）
+    local_base_url: str = "http://localhost:8000/v1"
+    local_model: Optional[str] = None  # None表示使用服务端加载的第一个模型
+    local_fallback_model: str = "default"  # 未设置local_model且无法获取服务端模型列表时使用的模型名称
+    local_api_key: Optional[str] = None  # 大多数本地服务不需要
+    local_max_concurrency: int = 4  # 同时发往本地服务的最大请求数
+    local_timeout: float = 300.0  # 单次请求超时时间（秒）
+    local_batching: bool = False  # 是否在进程内把并发请求攒批后提交
+    local_batch_mode: str = "concurrent"  # concurrent 或 completions（一次请求提交多个提示词，需服务端支持）
+    local_batch_size: int = 16  # 每批最多包含的请求数
+    local_batch_wait_ms: float = 5.0  # 攒批等待时间（毫秒）
+    
+    # 多提供商路由配置
+    fallback_llm_providers: Optional[List[str]] = None  # 故障转移/对冲使用的备用提供商，如：["openai"]
+    hedge_after_seconds: Optional[float] = None  # 主请求超过该时间未返回时发出对冲请求，None表示不对冲
+    node_llm_routes: Optional[Dict[str, List[str]]] = None  # 按节点指定提供商顺序，如：{"FirstSearchNode": ["openai", "deepseek"]}
+    
+    # 请求合并：进程内并发的完全相同的LLM请求只调用一次提供商
+    llm_coalescing: bool = False  # 开启后配置相同的Agent共用后端，用量统计为这些Agent的合计
+    llm_coalescing_timeout: Optional[float] = None  # 等待其他调用方发起的相同请求的最长时间（秒），None表示一直等待
+    
+    # 分层模型配置：搜索查询生成节点使用小而快的模型
+    query_llm_provider: Optional[str] = None  # 查询生成节点的提供商，None表示与默认提供商相同
+    query_model: Optional[str] = None  # 查询生成节点的模型，None表示使用该提供商的默认模型
+    query_max_tokens: Optional[int] = None  # 查询生成节点的最大输出长度，None表示使用节点默认值
+    summary_max_tokens: Optional[int] = None  # 总结和报告格式化节点的最大输出长度，None表示使用节点默认值
+    
+    # 节点输出预算
+    node_max_tokens: Optional[Dict[str, int]] = None  # 按节点覆盖最大输出长度，如：{"ReportFormattingNode": 8000}
+    use_stop_sequences: bool = True  # 输出JSON的节点是否在闭合括号处停止生成
+    
     # 搜索配置
+    search_backend: str = "tavily"  # tavily、local 或 meta（并发查询多个后端并按URL合并）
+    meta_search_backends: Optional[List[str]] = None  # meta使用的后端，None表示["tavily", "local"]
+    search_deadline: float = 15.0  # meta搜索的最长等待时间（秒），到时返回已到达的结果
+    local_search_db: Optional[str] = None  # 本地全文索引数据库路径，None表示内存数据库
+    local_search_paths: Optional[List[str]] = None  # 本地搜索启动时索引的文件或目录
     max_search_results: int = 3
     search_timeout: int = 240
     max_content_length: int = 20000
     
+    # 搜索语义缓存：措辞不同但含义相近的查询复用已有的搜索结果
+    search_cache_enabled: bool = False  # 默认关闭，命中精度经过评估后再按需开启
+    search_cache_threshold: float = 0.88  # 余弦相似度阈值，越高越严格
+    search_cache_max_entries: int = 1024
+    search_cache_ttl: Optional[float] = 86400.0  # 缓存有效期（秒），None表示不过期
+    search_cache_file: Optional[str] = None  # 持久化文件路径，设置后可在多次运行之间共享缓存
+    
     # Agent配置
     max_reflections: int = 2
     max_paragraphs: int = 5
     
+    # 工作流并发：各段落的查询生成、搜索和总结按依赖关系并发执行
+    workflow_llm_concurrency: int = 4  # 同时进行的LLM调用数
+    workflow_search_concurrency: int = 4  # 同时进行的搜索数
+    
     # 未来简事配置
     time_horizon: Optional[str] = None  # 时间范围：1个月、3个月、6个月、1年、3年、5年
     analysis_angles: Optional[List[str]] = None  # 分析角度列表，如：["技术", "经济", "社会", "环境", "政治"]
     
+    # 批处理模式配置
+    batch_poll_interval: float = 60.0  # 查询批处理任务状态的间隔（秒）
+    
     # 输出配置
     output_dir: str = "reports"
     save_intermediate_states: bool = True
+    state_format: str = "json"  # 状态文件格式：json 或 binary（.dsa，紧凑的二进制格式）
+    state_compression: Optional[str] = None  # binary格式下文本块的压缩方式：None、zlib 或 lzma
+    node_memo_enabled: bool = False  # 记录节点输出，参数变化后重新研究时复用输入未变化的节点结果
+    node_memo_file: Optional[str] = None  # 节点输出记忆文件，None表示输出目录下的node_memo.json
+    node_memo_search_ttl: Optional[float] = 86400.0  # 记录的搜索结果的有效期（秒），过期后重新搜索，None表示不过期
+    node_memo_max_entries: Optional[int] = 10000  # 最多保留的记录数，超出时淘汰最久未使用的记录，None表示不限制
+    
+    # 日志配置
+    log_level: str = "INFO"
+    log_format: str = "text"  # text 或 json
+    log_file: Optional[str] = None  # 日志文件路径，None表示输出到stderr
+    log_levels: Optional[Dict[str, str]] = None  # 子系统日志级别，如：{"src.llms": "DEBUG"}
+    
+    def get_llm_providers(self) -> List[str]:
+        """获取默认提供商、备用提供商和节点路由中用到的所有LLM提供商（去重并保持顺序）"""
+        providers = [self.default_llm_provider] + list(self.fallback_llm_providers or [])
+        if self.query_llm_provider:
+            providers.append(self.query_llm_provider)
+        for route in (self.node_llm_routes or {}).values():
+            providers.extend(route)
+        return list(dict.fromkeys(providers))
+    
+    def get_node_memo_file(self) -> str:
+        """获取节点输出记忆文件路径，未设置时保存在输出目录中，与状态文件放在一起"""
+        return self.node_memo_file or os.path.join(self.output_dir, "node_memo.json")
+    
+    def get_search_backends(self) -> List[str]:
+        """获取实际使用的搜索后端（meta展开为其包含的后端）"""
+        if self.search_backend == "meta":
+            return list(self.meta_search_backends or ["tavily", "local"])
+        return [self.search_backend]
     
     def validate(self) -> bool:
         """验证配置"""
         # 检查必需的API密钥
-        if self.default_llm_provider == "deepseek" and not self.deepseek_api_key:
-            print("错误: DeepSeek API Key未设置")
-            return False
-        
-        if self.default_llm_provider == "openai" and not self.openai_api_key:
-            print("错误: OpenAI API Key未设置")
-            return False
+        for provider in self.get_llm_providers():
+            if provider == "deepseek" and not self.deepseek_api_key:
+                logger.error("DeepSeek API Key未设置")
+                return False
+            
+            if provider == "openai" and not self.openai_api_key:
+                logger.error("OpenAI API Key未设置")
+                return False
         
-        if not self.tavily_api_key:
-            print("错误: Tavily API Key未设置")
+        if "tavily" in self.get_search_backends() and not self.tavily_api_key:
+            logger.error("Tavily API Key未设置")
             return False
         
         return True
@@ -79,13 +164,57 @@ class Config:
                 default_llm_provider=getattr(config_module, "DEFAULT_LLM_PROVIDER", "deepseek"),
                 deepseek_model=getattr(config_module, "DEEPSEEK_MODEL", "deepseek-chat"),
                 openai_model=getattr(config_module, "OPENAI_MODEL", "gpt-4o-mini"),
+                local_base_url=getattr(config_module, "LOCAL_BASE_URL", "http://localhost:8000/v1"),
+                local_model=getattr(config_module, "LOCAL_MODEL", None),
+                local_fallback_model=getattr(config_module, "LOCAL_FALLBACK_MODEL", "default"),
+                local_api_key=os.getenv("LOCAL_API_KEY") or getattr(config_module, "LOCAL_API_KEY", None),
+                local_max_concurrency=getattr(config_module, "LOCAL_MAX_CONCURRENCY", 4),
+                local_timeout=getattr(config_module, "LOCAL_TIMEOUT", 300.0),
+                local_batching=getattr(config_module, "LOCAL_BATCHING", False),
+                local_batch_mode=getattr(config_module, "LOCAL_BATCH_MODE", "concurrent"),
+                local_batch_size=getattr(config_module, "LOCAL_BATCH_SIZE", 16),
+                local_batch_wait_ms=getattr(config_module, "LOCAL_BATCH_WAIT_MS", 5.0),
+                fallback_llm_providers=getattr(config_module, "FALLBACK_LLM_PROVIDERS", None),
+                hedge_after_seconds=getattr(config_module, "HEDGE_AFTER_SECONDS", None),
+                node_llm_routes=getattr(config_module, "NODE_LLM_ROUTES", None),
+                llm_coalescing=getattr(config_module, "LLM_COALESCING", False),
+                llm_coalescing_timeout=getattr(config_module, "LLM_COALESCING_TIMEOUT", None),
+                query_llm_provider=getattr(config_module, "QUERY_LLM_PROVIDER", None),
+                query_model=getattr(config_module, "QUERY_MODEL", None),
+                query_max_tokens=getattr(config_module, "QUERY_MAX_TOKENS", None),
+                summary_max_tokens=getattr(config_module, "SUMMARY_MAX_TOKENS", None),
+                node_max_tokens=getattr(config_module, "NODE_MAX_TOKENS", None),
+                use_stop_sequences=getattr(config_module, "USE_STOP_SEQUENCES", True),
+                search_backend=getattr(config_module, "SEARCH_BACKEND", "tavily"),
+                meta_search_backends=getattr(config_module, "META_SEARCH_BACKENDS", None),
+                search_deadline=getattr(config_module, "SEARCH_DEADLINE", 15.0),
+                local_search_db=getattr(config_module, "LOCAL_SEARCH_DB", None),
+                local_search_paths=getattr(config_module, "LOCAL_SEARCH_PATHS", None),
                 max_search_results=getattr(config_module, "SEARCH_RESULTS_PER_QUERY", 3),
                 search_timeout=getattr(config_module, "SEARCH_TIMEOUT", 240),
                 max_content_length=getattr(config_module, "SEARCH_CONTENT_MAX_LENGTH", 20000),
+                search_cache_enabled=getattr(config_module, "SEARCH_CACHE_ENABLED", False),
+                search_cache_threshold=getattr(config_module, "SEARCH_CACHE_THRESHOLD", 0.88),
+                search_cache_max_entries=getattr(config_module, "SEARCH_CACHE_MAX_ENTRIES", 1024),
+                search_cache_ttl=getattr(config_module, "SEARCH_CACHE_TTL", 86400.0),
+                search_cache_file=getattr(config_module, "SEARCH_CACHE_FILE", None),
                 max_reflections=getattr(config_module, "MAX_REFLECTIONS", 2),
                 max_paragraphs=getattr(config_module, "MAX_PARAGRAPHS", 5),
+                workflow_llm_concurrency=getattr(config_module, "WORKFLOW_LLM_CONCURRENCY", 4),
+                workflow_search_concurrency=getattr(config_module, "WORKFLOW_SEARCH_CONCURRENCY", 4),
+                batch_poll_interval=getattr(config_module, "BATCH_POLL_INTERVAL", 60.0),
                 output_dir=getattr(config_module, "OUTPUT_DIR", "reports"),
-                save_intermediate_states=getattr(config_module, "SAVE_INTERMEDIATE_STATES", True)
+                save_intermediate_states=getattr(config_module, "SAVE_INTERMEDIATE_STATES", True),
+                state_format=getattr(config_module, "STATE_FORMAT", "json"),
+                state_compression=getattr(config_module, "STATE_COMPRESSION", None),
+                node_memo_enabled=getattr(config_module, "NODE_MEMO_ENABLED", False),
+                node_memo_file=getattr(config_module, "NODE_MEMO_FILE", None),
+                node_memo_search_ttl=getattr(config_module, "NODE_MEMO_SEARCH_TTL", 86400.0),
+                node_memo_max_entries=getattr(config_module, "NODE_MEMO_MAX_ENTRIES", 10000),
+                log_level=getattr(config_module, "LOG_LEVEL", "INFO"),
+                log_format=getattr(config_module, "LOG_FORMAT", "text"),
+                log_file=getattr(config_module, "LOG_FILE", None),
+                log_levels=getattr(config_module, "LOG_LEVELS", None)
             )
         else:
             # .env格式配置文件
@@ -111,16 +240,99 @@ class Config:
                 default_llm_provider=config_dict.get("DEFAULT_LLM_PROVIDER", "deepseek"),
                 deepseek_model=config_dict.get("DEEPSEEK_MODEL", "deepseek-chat"),
                 openai_model=config_dict.get("OPENAI_MODEL", "gpt-4o-mini"),
+                local_base_url=config_dict.get("LOCAL_BASE_URL", "http://localhost:8000/v1"),
+                local_model=config_dict.get("LOCAL_MODEL") or None,
+                local_fallback_model=config_dict.get("LOCAL_FALLBACK_MODEL", "default"),
+                local_api_key=os.getenv("LOCAL_API_KEY") or config_dict.get("LOCAL_API_KEY"),
+                local_max_concurrency=int(config_dict.get("LOCAL_MAX_CONCURRENCY", "4")),
+                local_timeout=float(config_dict.get("LOCAL_TIMEOUT", "300")),
+                local_batching=config_dict.get("LOCAL_BATCHING", "false").lower() == "true",
+                local_batch_mode=config_dict.get("LOCAL_BATCH_MODE", "concurrent"),
+                local_batch_size=int(config_dict.get("LOCAL_BATCH_SIZE", "16")),
+                local_batch_wait_ms=float(config_dict.get("LOCAL_BATCH_WAIT_MS", "5")),
+                fallback_llm_providers=_parse_list(config_dict.get("FALLBACK_LLM_PROVIDERS", "")),
+                hedge_after_seconds=float(config_dict["HEDGE_AFTER_SECONDS"]) if config_dict.get("HEDGE_AFTER_SECONDS") else None,
+                node_llm_routes={
+                    node: _parse_list(route, "|")
+                    for node, route in (_parse_mapping(config_dict.get("NODE_LLM_ROUTES", "")) or {}).items()
+                } or None,
+                llm_coalescing=config_dict.get("LLM_COALESCING", "false").lower() == "true",
+                llm_coalescing_timeout=float(config_dict["LLM_COALESCING_TIMEOUT"]) if config_dict.get("LLM_COALESCING_TIMEOUT") else None,
+                query_llm_provider=config_dict.get("QUERY_LLM_PROVIDER") or None,
+                query_model=config_dict.get("QUERY_MODEL") or None,
+                query_max_tokens=int(config_dict["QUERY_MAX_TOKENS"]) if config_dict.get("QUERY_MAX_TOKENS") else None,
+                summary_max_tokens=int(config_dict["SUMMARY_MAX_TOKENS"]) if config_dict.get("SUMMARY_MAX_TOKENS") else None,
+                node_max_tokens={
+                    node: int(value)
+                    for node, value in (_parse_mapping(config_dict.get("NODE_MAX_TOKENS", "")) or {}).items()
+                } or None,
+                use_stop_sequences=config_dict.get("USE_STOP_SEQUENCES", "true").lower() == "true",
+                search_backend=config_dict.get("SEARCH_BACKEND", "tavily"),
+                meta_search_backends=_parse_list(config_dict.get("META_SEARCH_BACKENDS", "")),
+                search_deadline=float(config_dict.get("SEARCH_DEADLINE", "15")),
+                local_search_db=config_dict.get("LOCAL_SEARCH_DB") or None,
+                local_search_paths=_parse_list(config_dict.get("LOCAL_SEARCH_PATHS", "")),
                 max_search_results=int(config_dict.get("SEARCH_RESULTS_PER_QUERY", "3")),
                 search_timeout=int(config_dict.get("SEARCH_TIMEOUT", "240")),
                 max_content_length=int(config_dict.get("SEARCH_CONTENT_MAX_LENGTH", "20000")),
+                search_cache_enabled=config_dict.get("SEARCH_CACHE_ENABLED", "false").lower() == "true",
+                search_cache_threshold=float(config_dict.get("SEARCH_CACHE_THRESHOLD", "0.88")),
+                search_cache_max_entries=int(config_dict.get("SEARCH_CACHE_MAX_ENTRIES", "1024")),
+                search_cache_ttl=float(config_dict.get("SEARCH_CACHE_TTL", "86400")) if config_dict.get("SEARCH_CACHE_TTL", "86400") else None,
+                search_cache_file=config_dict.get("SEARCH_CACHE_FILE") or None,
                 max_reflections=int(config_dict.get("MAX_REFLECTIONS", "2")),
                 max_paragraphs=int(config_dict.get("MAX_PARAGRAPHS", "5")),
+                workflow_llm_concurrency=int(config_dict.get("WORKFLOW_LLM_CONCURRENCY", "4")),
+                workflow_search_concurrency=int(config_dict.get("WORKFLOW_SEARCH_CONCURRENCY", "4")),
+                batch_poll_interval=float(config_dict.get("BATCH_POLL_INTERVAL", "60")),
                 output_dir=config_dict.get("OUTPUT_DIR", "reports"),
-                save_intermediate_states=config_dict.get("SAVE_INTERMEDIATE_STATES", "true").lower() == "true"
+                save_intermediate_states=config_dict.get("SAVE_INTERMEDIATE_STATES", "true").lower() == "true",
+                state_format=config_dict.get("STATE_FORMAT", "json"),
+                state_compression=config_dict.get("STATE_COMPRESSION") or None,
+                node_memo_enabled=config_dict.get("NODE_MEMO_ENABLED", "false").lower() == "true",
+                node_memo_file=config_dict.get("NODE_MEMO_FILE") or None,
+                node_memo_search_ttl=float(config_dict.get("NODE_MEMO_SEARCH_TTL", "86400")) if config_dict.get("NODE_MEMO_SEARCH_TTL", "86400") else None,
+                node_memo_max_entries=int(config_dict.get("NODE_MEMO_MAX_ENTRIES", "10000")) if config_dict.get("NODE_MEMO_MAX_ENTRIES", "10000") else None,
+                log_level=config_dict.get("LOG_LEVEL", "INFO"),
+                log_format=config_dict.get("LOG_FORMAT", "text"),
+                log_file=config_dict.get("LOG_FILE") or None,
+                log_levels=_parse_mapping(config_dict.get("LOG_LEVELS", ""))
             )
 
 
+def _parse_list(value: str, separator: str = ",") -> Optional[List[str]]:
+    """
+    解析.env中的列表配置，格式为 item1,item2
+    
+    Args:
+        value: 原始字符串
+        separator: 分隔符
+        
+    Returns:
+        列表，为空时返回None
+    """
+    items = [item.strip() for item in value.split(separator) if item.strip()]
+    return items or None
+
+
+def _parse_mapping(value: str) -> Optional[Dict[str, str]]:
+    """
+    解析.env中的映射配置，格式为 key1=value1,key2=value2
+    
+    Args:
+        value: 原始字符串
+        
+    Returns:
+        映射字典，为空时返回None
+    """
+    mapping = {}
+    for item in value.split(","):
+        if "=" in item:
+            key, item_value = item.split("=", 1)
+            mapping[key.strip()] = item_value.strip()
+    return mapping or None
+
+
 def load_config(config_file: Optional[str] = None) -> Config:
     """
     加载配置
@@ -141,7 +353,7 @@ def load_config(config_file: Optional[str] = None) -> Config:
         for config_path in ["config.py", "config.env", ".env"]:
             if os.path.exists(config_path):
                 file_to_load = config_path
-                print(f"已找到配置文件: {config_path}")
+                logger.info("已找到配置文件: %s", config_path)
                 break
         else:
             raise FileNotFoundError("未找到配置文件，请创建 config.py 文件")
@@ -162,13 +374,40 @@ def print_config(config: Config):
     print(f"LLM提供商: {config.default_llm_provider}")
     print(f"DeepSeek模型: {config.deepseek_model}")
     print(f"OpenAI模型: {config.openai_model}")
+    if "local" in config.get_llm_providers():
+        print(f"本地模型服务: {config.local_base_url} ({config.local_model or '服务端默认模型'})")
+        if config.local_batching:
+            print(f"本地请求攒批: {config.local_batch_mode}，每批最多 {config.local_batch_size} 个，等待 {config.local_batch_wait_ms}ms")
+    if config.fallback_llm_providers:
+        print(f"备用LLM提供商: {', '.join(config.fallback_llm_providers)}")
+    if config.hedge_after_seconds is not None:
+        print(f"对冲请求阈值: {config.hedge_after_seconds}秒")
+    if config.node_llm_routes:
+        print(f"节点LLM路由: {config.node_llm_routes}")
+    if config.query_llm_provider or config.query_model:
+        print(f"查询生成模型: {config.query_llm_provider or config.default_llm_provider}/{config.query_model or '默认'}")
+    if config.query_max_tokens is not None:
+        print(f"查询生成最大输出长度: {config.query_max_tokens}")
+    if config.node_max_tokens:
+        print(f"节点最大输出长度: {config.node_max_tokens}")
+    print(f"停止序列: {'启用' if config.use_stop_sequences else '禁用'}")
+    print(f"搜索后端: {config.search_backend}" + (
+        f" ({', '.join(config.get_search_backends())}，截止 {config.search_deadline}秒)"
+        if config.search_backend == "meta" else ""))
     print(f"最大搜索结果数: {config.max_search_results}")
     print(f"搜索超时: {config.search_timeout}秒")
     print(f"最大内容长度: {config.max_content_length}")
+    if config.search_cache_enabled:
+        print(f"搜索语义缓存: 阈值 {config.search_cache_threshold}，{config.search_cache_file or '仅内存'}")
     print(f"最大反思次数: {config.max_reflections}")
     print(f"最大段落数: {config.max_paragraphs}")
+    print(f"工作流并发: LLM {config.workflow_llm_concurrency}，搜索 {config.workflow_search_concurrency}")
     print(f"输出目录: {config.output_dir}")
-    print(f"保存中间状态: {config.save_intermediate_states}")
+    print(f"保存中间状态: {config.save_intermediate_states}（{config.state_format}"
+          + (f"，{config.state_compression}压缩" if config.state_compression else "") + "）")
+    if config.node_memo_enabled:
+        print(f"节点输出记忆: {config.get_node_memo_file()}")
+    print(f"日志级别: {config.log_level} ({config.log_format})")
     
     # 显示API密钥状态（不显示实际密钥）
     print(f"DeepSeek API Key: {'已设置' if config.deepseek_api_key else '未设置'}")
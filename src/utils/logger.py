@@ -0,0 +1,142 @@
+"""
+日志配置模块
+基于logging模块，通过队列异步输出日志，支持按子系统设置级别和JSON格式输出
+"""
+
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+from typing import Any, Dict, IO, Optional, Union
+
+
+# 包内所有日志记录器的根名称
+ROOT_LOGGER_NAME = "src"
+
+# 可单独设置级别的子系统
+SUBSYSTEMS = ("src.agent", "src.nodes", "src.llms", "src.tools", "src.state", "src.events", "src.utils")
+
+# LogRecord的标准属性，其余属性视为通过extra传入的结构化字段
+_RESERVED_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+# 当前运行的队列监听器
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+class JsonFormatter(logging.Formatter):
+    """将日志记录格式化为单行JSON，便于日志系统采集"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        """格式化日志记录"""
+        payload: Dict[str, Any] = {
+            "time": self.formatTime(record, "%Y-%m-%dT%H:%M:%S"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage()
+        }
+
+        # 附加通过extra传入的结构化字段
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED_ATTRS and not key.startswith("_"):
+                payload[key] = value
+
+        if record.exc_info:
+            payload["exception"] = self.formatException(record.exc_info)
+
+        return json.dumps(payload, ensure_ascii=False, default=str)
+
+
+def _create_sink_handler(sink: Union[None, str, IO, logging.Handler]) -> logging.Handler:
+    """根据sink参数创建实际输出日志的处理器"""
+    if sink is None:
+        return logging.StreamHandler(sys.stderr)
+    if isinstance(sink, logging.Handler):
+        return sink
+    if isinstance(sink, str):
+        return logging.FileHandler(sink, encoding="utf-8")
+    return logging.StreamHandler(sink)
+
+
+def setup_logging(level: Union[int, str] = "INFO", json_format: bool = False,
+                  sink: Union[None, str, IO, logging.Handler] = None,
+                  subsystem_levels: Optional[Dict[str, Union[int, str]]] = None) -> logging.Logger:
+    """
+    配置包内日志输出
+
+    日志记录先写入内存队列，由后台线程写到sink，调用方不会因终端或文件IO阻塞。
+    重复调用会替换之前的配置。
+
+    Args:
+        level: 默认日志级别
+        json_format: 是否输出JSON格式
+        sink: 日志输出目标，可以是文件路径、流对象或logging.Handler，默认输出到stderr
+        subsystem_levels: 子系统日志级别，如{"src.llms": "DEBUG", "src.tools": "WARNING"}
+
+    Returns:
+        包的根日志记录器
+    """
+    global _listener
+
+    root_logger = logging.getLogger(ROOT_LOGGER_NAME)
+
+    # 停止之前的监听器并移除之前的队列处理器
+    shutdown_logging()
+    for handler in list(root_logger.handlers):
+        if isinstance(handler, logging.handlers.QueueHandler):
+            root_logger.removeHandler(handler)
+
+    # 实际输出处理器
+    sink_handler = _create_sink_handler(sink)
+    if json_format:
+        sink_handler.setFormatter(JsonFormatter())
+    else:
+        sink_handler.setFormatter(logging.Formatter(
+            "%(asctime)s %(levelname)s [%(name)s] %(message)s", "%H:%M:%S"
+        ))
+
+    # 非阻塞队列处理器
+    log_queue: "queue.SimpleQueue" = queue.SimpleQueue()
+    root_logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    root_logger.setLevel(level.upper() if isinstance(level, str) else level)
+    root_logger.propagate = False
+
+    for name in SUBSYSTEMS:
+        logging.getLogger(name).setLevel(logging.NOTSET)
+    for name, subsystem_level in (subsystem_levels or {}).items():
+        logger_name = name if name.startswith(ROOT_LOGGER_NAME) else f"{ROOT_LOGGER_NAME}.{name}"
+        logging.getLogger(logger_name).setLevel(
+            subsystem_level.upper() if isinstance(subsystem_level, str) else subsystem_level
+        )
+
+    _listener = logging.handlers.QueueListener(log_queue, sink_handler, respect_handler_level=True)
+    _listener.start()
+
+    return root_logger
+
+
+def setup_logging_from_config(config: Any) -> logging.Logger:
+    """
+    根据Config对象配置日志
+
+    Args:
+        config: 配置对象，使用其中的log_level、log_format、log_file和log_levels字段
+    """
+    return setup_logging(
+        level=getattr(config, "log_level", "INFO"),
+        json_format=getattr(config, "log_format", "text") == "json",
+        sink=getattr(config, "log_file", None),
+        subsystem_levels=getattr(config, "log_levels", None)
+    )
+
+
+def shutdown_logging():
+    """停止后台日志线程并输出队列中剩余的日志"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+atexit.register(shutdown_logging)
@@ -0,0 +1,208 @@
+"""
+节点输出记忆
+按输入的哈希记录节点输出（类似构建系统的缓存），参数变化后重新研究时，
+输入没有变化的节点直接复用上次的输出，只执行受影响的部分
+"""
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# 持久化文件格式版本（2：增加记录的过期时间）
+MEMO_VERSION = 2
+
+
+class MemoStore:
+    """
+    线程安全的键值记忆表，可持久化为JSON文件
+
+    键由make_key对输入计算哈希得到，值必须可以序列化为JSON。同一键并发计算时不做合并
+    （LLM请求合并由CoalescingLLM负责，搜索合并由SingleFlight负责）。
+
+    记录可以设置有效期：输入相同但结果会随时间变化的记录（如搜索结果）过期后不再命中，
+    否则会一直复用第一次的结果。记录数超过max_entries时淘汰最久未使用的记录，
+    持久化文件的大小因此有上限；没有新增或删除记录时save不重写文件。
+    """
+
+    def __init__(self, persist_path: Optional[str] = None, max_entries: Optional[int] = None):
+        """
+        初始化记忆表
+
+        Args:
+            persist_path: 持久化文件路径，None表示仅在内存中记录
+            max_entries: 最多保留的记录数，None表示不限制
+        """
+        self.persist_path = persist_path
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Any]" = OrderedDict()
+        self._expires: Dict[str, float] = {}                # 键 -> 过期时间戳，不在其中的记录不过期
+        self._dirty = False
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "expired": 0, "evictions": 0}
+        if persist_path and os.path.exists(persist_path):
+            self._load()
+
+    @staticmethod
+    def make_key(*parts: Any) -> str:
+        """
+        计算输入的哈希键
+
+        Args:
+            *parts: 决定输出的全部输入，如节点名、模型、提示词和调用参数
+
+        Returns:
+            十六进制哈希字符串
+        """
+        payload = json.dumps(parts, ensure_ascii=False, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Any]:
+        """获取记录的值，不存在或已过期时返回None"""
+        with self._lock:
+            expires_at = self._expires.get(key)
+            if expires_at is not None and expires_at <= time.time():
+                self._remove(key)
+                self._stats["expired"] += 1
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            self._stats["hits" if value is not None else "misses"] += 1
+            return value
+
+    def put(self, key: str, value: Any, ttl: Optional[float] = None):
+        """
+        记录一个值
+
+        Args:
+            key: 哈希键
+            value: 可序列化为JSON的值
+            ttl: 有效期（秒），None表示不过期
+        """
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            if ttl is not None:
+                self._expires[key] = time.time() + ttl
+            else:
+                self._expires.pop(key, None)
+            self._dirty = True
+
+            if self.max_entries is not None:
+                while len(self._entries) > self.max_entries:
+                    self._remove(next(iter(self._entries)))
+                    self._stats["evictions"] += 1
+
+    def get_or_compute(self, key: str, compute: Callable[[], Any], ttl: Optional[float] = None) -> Any:
+        """
+        获取记录的值，不存在或已过期时计算并记录
+
+        Args:
+            key: 哈希键
+            compute: 计算值的函数，抛出异常时不记录
+            ttl: 新记录的有效期（秒），None表示不过期
+
+        Returns:
+            记录的值或新计算的值
+        """
+        value = self.get(key)
+        if value is None:
+            value = compute()
+            self.put(key, value, ttl=ttl)
+        return value
+
+    def _remove(self, key: str):
+        """删除一条记录（调用方需持有锁）"""
+        self._entries.pop(key, None)
+        self._expires.pop(key, None)
+        self._dirty = True
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        获取命中统计
+
+        Returns:
+            包含记录数、命中数、未命中数、过期数、淘汰数和命中率的字典
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats["entries"] = len(self._entries)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_ratio"] = stats["hits"] / lookups if lookups else 0.0
+        return stats
+
+    def clear(self):
+        """清空记录"""
+        with self._lock:
+            self._entries.clear()
+            self._expires.clear()
+            self._dirty = True
+        if self.persist_path:
+            self.save()
+
+    def save(self):
+        """原子写入持久化文件，未设置持久化路径或记录没有变化时不做任何事；已过期的记录不写入"""
+        if not self.persist_path:
+            return
+        with self._lock:
+            if not self._dirty:
+                return
+            now = time.time()
+            for key in [key for key, expires_at in self._expires.items() if expires_at <= now]:
+                self._remove(key)
+            data = {"version": MEMO_VERSION, "entries": dict(self._entries), "expires": dict(self._expires)}
+            self._dirty = False
+
+        directory = os.path.dirname(os.path.abspath(self.persist_path))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(tmp_path, self.persist_path)
+        except Exception as e:
+            logger.warning("保存节点输出记忆失败: %s", e)
+            with self._lock:
+                self._dirty = True
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def _load(self):
+        """加载持久化文件，版本不匹配时忽略；已过期的记录不加载"""
+        try:
+            with open(self.persist_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except Exception as e:
+            logger.warning("加载节点输出记忆失败: %s", e)
+            return
+
+        if data.get("version") != MEMO_VERSION:
+            logger.warning("节点输出记忆版本不匹配，忽略: %s", self.persist_path)
+            return
+        now = time.time()
+        expires = data.get("expires", {})
+        for key, value in data.get("entries", {}).items():
+            expires_at = expires.get(key)
+            if expires_at is not None and expires_at <= now:
+                continue
+            self._entries[key] = value
+            if expires_at is not None:
+                self._expires[key] = expires_at
+
+        # 文件中的记录按最近使用排序，超出上限时保留最近使用的部分
+        while self.max_entries is not None and len(self._entries) > self.max_entries:
+            self._remove(next(iter(self._entries)))
+        self._dirty = len(self._entries) != len(data.get("entries", {}))
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries
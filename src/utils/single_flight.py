@@ -0,0 +1,90 @@
+"""
+单飞（single-flight）调用合并
+同一键同时只执行一次调用，并发到达的其他调用者等待并共享这次调用的结果
+"""
+
+import logging
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class _Call:
+    """正在执行的调用"""
+
+    __slots__ = ("done", "result", "error", "waiters")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    按键合并并发调用
+
+    第一个到达的调用者执行函数，执行期间到达的相同键的调用者阻塞等待，
+    函数返回后所有调用者得到同一结果；函数抛出异常时所有调用者收到同一异常。
+    调用结束后立即移除该键，之后的调用会重新执行，不做结果缓存。
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+        self._stats = {"calls": 0, "executions": 0, "coalesced": 0}
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        """
+        执行或等待键对应的调用
+
+        Args:
+            key: 调用键，键相同的并发调用只执行一次
+            fn: 实际执行的函数
+
+        Returns:
+            (结果, 结果是否由多个调用者共享)
+        """
+        with self._lock:
+            self._stats["calls"] += 1
+            call = self._calls.get(key)
+            if call is not None:
+                call.waiters += 1
+                self._stats["coalesced"] += 1
+                leader = False
+            else:
+                call = _Call()
+                self._calls[key] = call
+                self._stats["executions"] += 1
+                leader = True
+
+        if not leader:
+            logger.debug("合并并发调用: %s", key)
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+        return call.result, call.waiters > 0
+
+    def get_stats(self) -> Dict[str, int]:
+        """
+        获取调用统计
+
+        Returns:
+            包含调用数、实际执行数和合并数的字典
+        """
+        with self._lock:
+            return dict(self._stats)
@@ -5,9 +5,88 @@
 
 import re
 import json
+import logging
+import unicodedata
 from typing import Dict, Any, List
 from json.decoder import JSONDecodeError
 
+logger = logging.getLogger(__name__)
+
+
+# 提示词输入字段的排列顺序：同一段落各次调用都相同的字段在前，每轮变化的字段在后
+PROMPT_INPUT_KEY_ORDER = ["title", "content", "search_query", "search_results", "paragraph_latest_state"]
+
+
+def dump_prompt_input(input_data: Any) -> str:
+    """
+    将节点输入序列化为提示词中的JSON
+    
+    字段按PROMPT_INPUT_KEY_ORDER排序，使同一段落的多次调用共享尽可能长的前缀，
+    利于服务端前缀缓存；其他字段保持原有顺序排在最后。
+    
+    Args:
+        input_data: 输入数据（字典、列表或其他可序列化对象）
+        
+    Returns:
+        JSON字符串
+    """
+    if isinstance(input_data, dict):
+        ordered = {key: input_data[key] for key in PROMPT_INPUT_KEY_ORDER if key in input_data}
+        for key, value in input_data.items():
+            ordered.setdefault(key, value)
+        input_data = ordered
+    return json.dumps(input_data, ensure_ascii=False)
+
+
+def restore_stop_sequence(text: str, stop_sequences: List[str]) -> str:
+    """
+    补回被停止序列截掉的结尾
+    
+    LLM在命中停止序列时不会输出停止序列本身，例如以"\n}"作为停止序列时，
+    返回的JSON缺少最后的闭合括号。如果文本（去掉末尾的代码块标记后）
+    不是以停止序列的结尾字符结束，则补上第一个停止序列。
+    
+    Args:
+        text: LLM输出文本
+        stop_sequences: 调用时使用的停止序列
+        
+    Returns:
+        补全后的文本
+    """
+    if not text or not stop_sequences:
+        return text
+    
+    stripped = re.sub(r'```\s*$', '', text.rstrip()).rstrip()
+    if any(stripped.endswith(stop.strip()) for stop in stop_sequences if stop.strip()):
+        return text
+    
+    return stripped + stop_sequences[0]
+
+
+def normalize_search_query(query: str) -> str:
+    """
+    规范化搜索查询，用于判断两个查询是否等价
+    
+    统一全角/半角和大小写，去掉标点和多余空白，去掉中文字符两侧的空格，
+    并把年份（包括_enhance_search_query_with_date追加的"2026年"）统一移到末尾，
+    例如"2026年 AI芯片 出口管制"和"AI芯片出口管制，2026"都规范化为"ai芯片出口管制 2026"。
+    
+    Args:
+        query: 原始搜索查询
+        
+    Returns:
+        规范化后的查询
+    """
+    text = unicodedata.normalize("NFKC", query).lower()
+    text = re.sub(r'[^\w\s]', ' ', text)
+    
+    years = sorted(set(re.findall(r'(?<!\d)(?:19|20)\d{2}(?!\d)', text)))
+    text = re.sub(r'(?<!\d)(?:19|20)\d{2}(?!\d)\s*年?', ' ', text)
+    
+    text = " ".join(text.split())
+    text = re.sub(r'\s*([\u4e00-\u9fff])\s*', r'\1', text)
+    return " ".join([text] + years).strip()
+
 
 def clean_json_tags(text: str) -> str:
     """
@@ -107,7 +186,7 @@ def extract_clean_response(text: str) -> Dict[str, Any]:
             pass
     
     # 如果所有方法都失败，返回错误信息
-    print(f"无法解析JSON响应: {cleaned_text[:200]}...")
+    logger.warning("无法解析JSON响应: %s...", cleaned_text[:200])
     return {"error": "JSON解析失败", "raw_text": cleaned_text}
 
 
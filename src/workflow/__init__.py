@@ -0,0 +1,9 @@
+"""
+工作流模块
+以有向无环图声明处理步骤及其依赖，由调度器在资源限制内并发执行就绪的步骤
+"""
+
+from .graph import Task, Workflow, WorkflowError
+from .scheduler import WorkflowScheduler
+
+__all__ = ["Task", "Workflow", "WorkflowError", "WorkflowScheduler"]
@@ -0,0 +1,105 @@
+"""
+工作流图定义
+顶点是一个任务（普通函数或BaseNode），边是声明的依赖关系
+"""
+
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from ..nodes.base_node import BaseNode
+
+# 任务函数，参数为各依赖任务的结果（任务名 -> 结果）
+TaskFunction = Callable[[Dict[str, Any]], Any]
+
+
+class WorkflowError(Exception):
+    """工作流定义或执行错误"""
+    pass
+
+
+@dataclass
+class Task:
+    """工作流中的一个顶点"""
+    name: str                                                      # 任务名，在工作流内唯一
+    fn: TaskFunction                                               # 任务函数
+    deps: List[str] = field(default_factory=list)                  # 依赖的任务名
+    resource: Optional[str] = None                                 # 占用的资源（如llm、search），None表示不受限
+
+
+class Workflow:
+    """
+    有向无环的任务图
+
+    任务在执行过程中也可以继续添加任务（例如生成报告结构后再为每个段落添加任务），
+    新任务只能依赖已存在的任务，因此图始终无环。
+    """
+
+    def __init__(self):
+        self._tasks: Dict[str, Task] = {}
+        self._order: List[Task] = []
+        self._lock = threading.Lock()
+
+    def add(self, name: str, fn: TaskFunction, deps: Iterable[str] = (),
+            resource: Optional[str] = None) -> str:
+        """
+        添加任务
+
+        Args:
+            name: 任务名
+            fn: 任务函数，参数为各依赖任务的结果
+            deps: 依赖的任务名，必须已经添加
+            resource: 占用的资源名，调度器按资源限制并发数
+
+        Returns:
+            任务名，便于作为后续任务的依赖
+        """
+        deps = list(deps)
+        with self._lock:
+            if name in self._tasks:
+                raise WorkflowError(f"任务已存在: {name}")
+            missing = [dep for dep in deps if dep not in self._tasks]
+            if missing:
+                raise WorkflowError(f"任务 {name} 依赖的任务不存在: {', '.join(missing)}")
+            task = Task(name=name, fn=fn, deps=deps, resource=resource)
+            self._tasks[name] = task
+            self._order.append(task)
+        return name
+
+    def add_node(self, name: str, node: BaseNode, build_input: Callable[[Dict[str, Any]], Any],
+                 deps: Iterable[str] = (), resource: Optional[str] = "llm", **kwargs) -> str:
+        """
+        把处理节点添加为任务，任务结果为node.run的输出
+
+        Args:
+            name: 任务名
+            node: 处理节点
+            build_input: 由依赖任务的结果构造节点输入的函数
+            deps: 依赖的任务名
+            resource: 占用的资源名，默认为llm
+            **kwargs: 传给node.run的其他参数
+
+        Returns:
+            任务名
+        """
+        return self.add(name, lambda results: node.run(build_input(results), **kwargs),
+                        deps=deps, resource=resource)
+
+    def tasks(self, start: int = 0) -> List[Task]:
+        """
+        按添加顺序返回任务
+
+        Args:
+            start: 从第几个添加的任务开始返回，调度器用它只取上次之后新添加的任务
+
+        Returns:
+            任务列表
+        """
+        with self._lock:
+            return self._order[start:]
+
+    def __len__(self) -> int:
+        return len(self._tasks)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._tasks
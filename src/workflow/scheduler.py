@@ -0,0 +1,117 @@
+"""
+工作流调度器
+所有依赖都已完成的任务即为就绪任务，在资源限制内全部并发执行
+"""
+
+import logging
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Deque, Dict, List, Optional
+
+from .graph import Task, Workflow, WorkflowError
+
+logger = logging.getLogger(__name__)
+
+
+class WorkflowScheduler:
+    """
+    并发执行工作流的调度器
+
+    调度在调用run的线程中进行：每当有任务完成，就把所有依赖已满足、且所需资源仍有空闲的任务
+    提交到线程池。资源名不在limits中的任务只受线程池大小限制。某个任务失败后不再提交新任务，
+    等正在执行的任务结束后抛出第一个异常。
+
+    调度是增量的：每个任务记录尚未完成的依赖数，依赖完成时只更新它的下游任务；依赖都已满足的任务
+    按资源放进就绪队列；每轮只读取上一轮之后新添加的任务。因此每次任务完成的调度开销与图的大小无关。
+    """
+
+    def __init__(self, limits: Optional[Dict[str, int]] = None, max_workers: int = 16):
+        """
+        初始化调度器
+
+        Args:
+            limits: 各资源的最大并发数，如{"llm": 4, "search": 4}
+            max_workers: 线程池大小，即同时执行的任务总数上限
+        """
+        self.limits = dict(limits or {})
+        self.max_workers = max_workers
+
+    def run(self, workflow: Workflow) -> Dict[str, Any]:
+        """
+        执行工作流，直到所有任务完成（包括执行过程中新添加的任务）
+
+        Args:
+            workflow: 工作流
+
+        Returns:
+            任务名到任务结果的字典
+        """
+        results: Dict[str, Any] = {}
+        running: Dict[Future, Task] = {}
+        in_use: Dict[str, int] = {}
+        error: Optional[BaseException] = None
+
+        seen = 0                                          # 已读取的任务数
+        unmet: Dict[str, int] = {}                        # 等待中的任务 -> 尚未完成的依赖数
+        dependents: Dict[str, List[Task]] = {}            # 任务 -> 等待它完成的下游任务
+        ready: Dict[Optional[str], Deque[Task]] = {}      # 资源 -> 依赖已满足的任务（按添加顺序）
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="workflow") as executor:
+            while True:
+                # 读取上一轮之后新添加的任务
+                new_tasks = workflow.tasks(seen)
+                seen += len(new_tasks)
+                for task in new_tasks:
+                    pending_deps = [dep for dep in task.deps if dep not in results]
+                    if not pending_deps:
+                        ready.setdefault(task.resource, deque()).append(task)
+                        continue
+                    unmet[task.name] = len(pending_deps)
+                    for dep in pending_deps:
+                        dependents.setdefault(dep, []).append(task)
+
+                if error is None:
+                    for resource, queue in ready.items():
+                        while queue and len(running) < self.max_workers and self._has_capacity(resource, in_use):
+                            task = queue.popleft()
+                            if resource is not None:
+                                in_use[resource] = in_use.get(resource, 0) + 1
+                            inputs = {dep: results[dep] for dep in task.deps}
+                            running[executor.submit(task.fn, inputs)] = task
+
+                if not running:
+                    break
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    task = running.pop(future)
+                    if task.resource is not None:
+                        in_use[task.resource] -= 1
+                    try:
+                        results[task.name] = future.result()
+                    except Exception as e:
+                        logger.debug("任务 %s 失败: %s", task.name, e)
+                        if error is None:
+                            error = e
+                        continue
+
+                    for dependent in dependents.pop(task.name, ()):
+                        unmet[dependent.name] -= 1
+                        if unmet[dependent.name] == 0:
+                            del unmet[dependent.name]
+                            ready.setdefault(dependent.resource, deque()).append(dependent)
+
+        if error is not None:
+            raise error
+
+        unfinished = [task.name for task in workflow.tasks() if task.name not in results]
+        if unfinished:
+            raise WorkflowError(f"以下任务的依赖无法满足: {', '.join(unfinished)}")
+        return results
+
+    def _has_capacity(self, resource: Optional[str], in_use: Dict[str, int]) -> bool:
+        """资源是否还能再执行一个任务"""
+        if resource is None:
+            return True
+        limit = self.limits.get(resource)
+        return limit is None or in_use.get(resource, 0) < limit
@@ -0,0 +1,37 @@
+"""
+测试配置
+把项目根目录加入Python路径，使测试可以直接导入src包
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import pytest
+
+from src.state import State
+
+
+@pytest.fixture
+def sample_state() -> State:
+    """包含两个段落和多条搜索记录的状态，内容覆盖转义字符、多字节文本和较长文本"""
+    state = State(query="人工智能的发展", report_title="AI \"未来\" 展望")
+    state.add_paragraph("技术进展", "模型能力\n与算力")
+    state.add_paragraph("经济影响", "就业与生产率")
+
+    first = state.paragraphs[0].research
+    first.add_search_results("AI芯片 2026", [
+        {"url": "https://example.com/a", "title": "芯片\t出口", "content": "内容A\n" * 500, "score": 0.9},
+        {"url": "https://example.com/b", "title": "无评分", "content": "含有\"引号\"和\\反斜杠"}
+    ])
+    first.latest_summary = "初始总结 ✓"
+    first.increment_reflection()
+    first.mark_completed()
+
+    second = state.paragraphs[1].research
+    second.add_search_results("AI 就业", [{"url": "https://example.com/c", "title": "就业", "content": "😀 emoji"}])
+
+    state.final_report = "# 报告\n\n" + "正文" * 2000
+    state.mark_completed()
+    return state
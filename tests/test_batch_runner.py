@@ -0,0 +1,104 @@
+"""
+批处理研究执行器和本地批处理后端测试
+"""
+
+import json
+import os
+
+from src import Config, DeepSearchAgent
+from src.batch import BatchRequest, BatchResearchRunner, LocalFileBatchBackend
+from src.llms.base import BaseLLM
+from src.tools.base import BaseSearch, SearchResult
+
+QUERY = "电动汽车市场"
+
+
+class ScriptedLLM(BaseLLM):
+    """按请求内容返回各节点期望格式的回复，记录每次batch_invoke的请求数"""
+
+    def __init__(self, drop: int = 0):
+        super().__init__("test", "scripted")
+        self.drop = drop
+        self.batches = []
+
+    def invoke(self, system_prompt: str, user_prompt: str, **kwargs) -> str:
+        if QUERY in user_prompt:
+            # 报告结构，与模型常见的输出一样放在代码块中
+            structure = [{"title": "销量", "content": "销量走势"}, {"title": "政策", "content": "补贴政策"}]
+            return "```json\n" + json.dumps(structure, ensure_ascii=False, indent=2) + "\n```"
+        if user_prompt.lstrip().startswith("["):
+            # 报告格式化的输入是段落列表
+            return "# 电动汽车市场报告\n\n正文"
+        # 查询生成和总结节点各取所需的字段
+        return json.dumps({"search_query": "电动汽车 销量", "reasoning": "测试",
+                           "paragraph_latest_state": "首次总结",
+                           "updated_paragraph_latest_state": "反思后的总结"}, ensure_ascii=False)
+
+    def batch_invoke(self, requests, **kwargs):
+        self.batches.append(len(requests))
+        replies = super().batch_invoke(requests, **kwargs)
+        return replies[:len(replies) - self.drop]
+
+    def get_default_model(self) -> str:
+        return "scripted"
+
+
+class StubSearch(BaseSearch):
+    """总是返回一条结果的搜索后端"""
+
+    name = "stub"
+
+    def search(self, query, max_results=5, include_raw_content=True, timeout=240):
+        return [SearchResult(title="结果", url=f"https://example.com/{query}", content="内容")]
+
+
+def create_agent(tmp_path, **overrides) -> DeepSearchAgent:
+    config = Config(deepseek_api_key="test", tavily_api_key="test", search_cache_enabled=False,
+                    output_dir=str(tmp_path), **overrides)
+    agent = DeepSearchAgent(config)
+    agent.search_backend = StubSearch()
+    return agent
+
+
+def test_runner_advances_jobs_through_every_wave(tmp_path):
+    agent = create_agent(tmp_path, max_reflections=1)
+    llm = ScriptedLLM()
+    backend = LocalFileBatchBackend(llm, work_dir=str(tmp_path / "batch_jobs"))
+
+    jobs = BatchResearchRunner(agent, backend, poll_interval=0).run([QUERY, QUERY], save_report=False)
+
+    # 结构、首次查询、首次总结、反思查询、反思总结、格式化，每波包含两个任务的请求
+    assert llm.batches == [2, 4, 4, 4, 4, 2]
+    for job in jobs:
+        assert job.error is None and not job.is_active
+        assert [p.title for p in job.state.paragraphs] == ["销量", "政策"]
+        assert all(p.research.latest_summary == "反思后的总结" for p in job.state.paragraphs)
+        assert all(len(p.research.search_history) == 2 for p in job.state.paragraphs)
+        assert job.state.final_report.startswith("# 电动汽车市场报告")
+        assert job.state.is_completed
+
+
+def test_local_backend_writes_error_for_missing_replies(tmp_path):
+    backend = LocalFileBatchBackend(ScriptedLLM(drop=1), work_dir=str(tmp_path))
+    requests = [BatchRequest(f"req{i}", "系统", f"问题{i}") for i in range(3)]
+
+    job_id = backend.submit(requests)
+    assert backend.poll(job_id) == "completed"
+
+    with open(os.path.join(str(tmp_path), f"{job_id}_output.jsonl"), encoding="utf-8") as f:
+        lines = [json.loads(line) for line in f]
+    assert [line["custom_id"] for line in lines] == ["req0", "req1", "req2"]
+    assert lines[2]["error"] is not None and lines[2]["response"] is None
+    assert sorted(backend.fetch_results(job_id)) == ["req0", "req1"]
+
+
+def test_local_backend_sends_single_system_message(tmp_path):
+    llm = ScriptedLLM()
+    backend = LocalFileBatchBackend(llm, work_dir=str(tmp_path))
+
+    job_id = backend.submit([BatchRequest("req", "系统提示词", "问题")])
+    with open(os.path.join(str(tmp_path), f"{job_id}_input.jsonl"), encoding="utf-8") as f:
+        line = json.loads(f.readline())
+
+    assert [message["role"] for message in line["body"]["messages"]] == ["system", "user"]
+    assert LocalFileBatchBackend._to_prompts(line) == ("系统提示词", "问题")
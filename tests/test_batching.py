@@ -0,0 +1,113 @@
+"""
+请求微批处理测试
+"""
+
+import gc
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from src.llms.base import BaseLLM
+from src.llms.batching import BatchingLLM
+
+
+class FakeBatchLLM(BaseLLM):
+    """按配置返回结果的批处理后端"""
+
+    def __init__(self, drop: int = 0, error: Exception = None):
+        super().__init__("test", "fake")
+        self.drop = drop
+        self.error = error
+        self.batches = []
+
+    def invoke(self, system_prompt: str, user_prompt: str, **kwargs) -> str:
+        return self.batch_invoke([(system_prompt, user_prompt)], **kwargs)[0]
+
+    def batch_invoke(self, requests, **kwargs):
+        self.batches.append(len(requests))
+        if self.error is not None:
+            raise self.error
+        replies = [f"回复:{user_prompt}" for _, user_prompt in requests]
+        return replies[:len(replies) - self.drop]
+
+    def get_default_model(self) -> str:
+        return "fake"
+
+
+def invoke_concurrently(llm: BaseLLM, count: int):
+    """并发发出count个请求，返回各请求的结果或异常"""
+    def call(i):
+        try:
+            return llm.invoke("系统", str(i), max_tokens=10)
+        except Exception as e:
+            return e
+
+    with ThreadPoolExecutor(max_workers=count) as executor:
+        futures = [executor.submit(call, i) for i in range(count)]
+        return [future.result(timeout=5) for future in futures]
+
+
+def test_concurrent_requests_are_batched_and_resolved_in_order():
+    backend = FakeBatchLLM()
+    llm = BatchingLLM(backend, max_batch_size=8, max_wait_ms=200)
+
+    results = invoke_concurrently(llm, 4)
+
+    assert results == [f"回复:{i}" for i in range(4)]
+    assert sum(backend.batches) == 4
+    assert llm.get_batch_stats()["max_batch_size"] > 1
+
+
+def test_short_result_list_fails_unmatched_requests_instead_of_hanging():
+    backend = FakeBatchLLM(drop=1)
+    llm = BatchingLLM(backend, max_batch_size=8, max_wait_ms=200)
+
+    results = invoke_concurrently(llm, 4)
+
+    # 每个批次的最后一个请求没有结果
+    errors = [result for result in results if isinstance(result, Exception)]
+    assert len(errors) == len(backend.batches)
+    assert all(isinstance(error, RuntimeError) for error in errors)
+
+
+def test_backend_error_is_propagated_to_every_request():
+    llm = BatchingLLM(FakeBatchLLM(error=ValueError("服务不可用")), max_batch_size=8, max_wait_ms=200)
+
+    results = invoke_concurrently(llm, 3)
+
+    assert all(isinstance(result, ValueError) for result in results)
+
+
+def test_single_request_raises():
+    llm = BatchingLLM(FakeBatchLLM(drop=1), max_batch_size=8, max_wait_ms=1)
+    with pytest.raises(RuntimeError):
+        llm.invoke("系统", "问题")
+
+
+def test_shared_batchers_are_keyed_by_options_and_released():
+    first = BatchingLLM.shared("backend", FakeBatchLLM, max_batch_size=4)
+    assert BatchingLLM.shared("backend", FakeBatchLLM, max_batch_size=4) is first
+    other = BatchingLLM.shared("backend", FakeBatchLLM, max_batch_size=8)
+    assert other is not first and other.max_batch_size == 8
+
+    dispatcher = first._dispatcher
+    del first
+    gc.collect()
+
+    # 没有调用方持有时实例被回收，后台线程随之退出
+    dispatcher.join(timeout=2)
+    assert not dispatcher.is_alive()
+    assert BatchingLLM.shared("backend", FakeBatchLLM, max_batch_size=4).max_batch_size == 4
+
+
+def test_close_stops_dispatcher_and_rejects_new_requests():
+    llm = BatchingLLM(FakeBatchLLM(), max_batch_size=8, max_wait_ms=1)
+    assert llm.invoke("系统", "问题") == "回复:问题"
+
+    llm.close()
+    llm.close()
+
+    llm._dispatcher.join(timeout=2)
+    assert llm.closed and not llm._dispatcher.is_alive()
+    with pytest.raises(RuntimeError):
+        llm.invoke("系统", "问题")
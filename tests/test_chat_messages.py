@@ -0,0 +1,24 @@
+"""
+对话消息构建测试
+"""
+
+from src.llms.base import build_chat_messages
+from src.prompts.registry import RenderedPrompt
+
+
+def test_rendered_prompt_uses_single_system_message_with_stable_prefix_first():
+    prompt = RenderedPrompt("固定说明\n", "今天是2026-10-19")
+    messages = build_chat_messages(prompt, "用户输入")
+
+    assert [message["role"] for message in messages] == ["system", "user"]
+    assert messages[0]["content"] == "固定说明\n今天是2026-10-19"
+    assert messages[0]["content"].startswith(prompt.prefix)
+    assert messages[1]["content"] == "用户输入"
+
+
+def test_plain_prompt_is_passed_through():
+    messages = build_chat_messages("系统提示", "问题")
+    assert messages == [
+        {"role": "system", "content": "系统提示"},
+        {"role": "user", "content": "问题"}
+    ]
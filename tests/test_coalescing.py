@@ -0,0 +1,63 @@
+"""
+相同请求合并测试
+"""
+
+import gc
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from src.llms.base import BaseLLM
+from src.llms.coalescing import CoalescingLLM
+
+
+class SlowLLM(BaseLLM):
+    """等待放行后才返回的LLM，记录调用次数"""
+
+    def __init__(self):
+        super().__init__("test", "slow")
+        self.release = threading.Event()
+        self.calls = 0
+
+    def invoke(self, system_prompt: str, user_prompt: str, **kwargs) -> str:
+        self.calls += 1
+        self.release.wait(5)
+        return f"回复:{user_prompt}"
+
+    def get_default_model(self) -> str:
+        return "slow"
+
+
+def test_identical_concurrent_requests_call_backend_once():
+    backend = SlowLLM()
+    llm = CoalescingLLM(backend)
+
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        futures = [executor.submit(llm.invoke, "系统", "问题") for _ in range(3)]
+        while llm.get_coalescing_stats()["requests"] < 3:
+            pass
+        backend.release.set()
+        results = [future.result(timeout=5) for future in futures]
+
+    assert results == ["回复:问题"] * 3
+    assert backend.calls == 1
+    assert llm.get_coalescing_stats()["coalesced"] == 2
+
+
+def test_shared_registry_evicts_unused_coalescers():
+    key = ("test", "evict")
+    created = []
+
+    def factory():
+        created.append(SlowLLM())
+        return created[-1]
+
+    first = CoalescingLLM.shared(key, factory)
+    assert CoalescingLLM.shared(key, factory) is first
+    assert len(created) == 1
+
+    del first
+    gc.collect()
+
+    assert key not in CoalescingLLM._shared
+    CoalescingLLM.shared(key, factory)
+    assert len(created) == 2
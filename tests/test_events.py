@@ -0,0 +1,89 @@
+"""
+事件总线测试
+"""
+
+from dataclasses import dataclass
+
+from src.events import Event, EventBus, ReportReady, SearchFinished, SearchStarted
+
+
+@dataclass
+class LocalSearchFinished(SearchFinished):
+    """SearchFinished的子类事件"""
+    db_path: str = ""
+
+
+def test_subscribe_and_unsubscribe():
+    bus = EventBus()
+    received = []
+    unsubscribe = bus.subscribe(SearchStarted, received.append)
+
+    bus.emit(SearchStarted(search_query="芯片"))
+    bus.emit(ReportReady(report="报告"))
+    unsubscribe()
+    bus.emit(SearchStarted(search_query="电池"))
+
+    assert [event.search_query for event in received] == ["芯片"]
+    assert not bus.has_subscribers()
+
+
+def test_unsubscribe_by_handler():
+    bus = EventBus()
+    received = []
+    bus.subscribe(SearchStarted, received.append)
+    bus.subscribe(ReportReady, received.append)
+
+    bus.unsubscribe(SearchStarted, received.append)
+    bus.emit(SearchStarted())
+    bus.emit(ReportReady())
+
+    assert [type(event) for event in received] == [ReportReady]
+
+
+def test_handlers_receive_subclass_events_in_mro_order():
+    bus = EventBus()
+    received = []
+    bus.subscribe(Event, lambda event: received.append("Event"))
+    bus.subscribe(SearchFinished, lambda event: received.append("SearchFinished"))
+    bus.subscribe(LocalSearchFinished, lambda event: received.append("LocalSearchFinished"))
+
+    bus.emit(LocalSearchFinished(result_count=3))
+    bus.emit(SearchFinished())
+
+    assert received == ["LocalSearchFinished", "SearchFinished", "Event", "SearchFinished", "Event"]
+    assert bus.has_subscribers(LocalSearchFinished)
+    assert not EventBus().has_subscribers(LocalSearchFinished)
+
+
+def test_subscription_changes_during_emit_apply_to_later_events():
+    bus = EventBus()
+    received = []
+
+    def once(event):
+        received.append("once")
+        unsubscribe_once()
+        bus.subscribe(SearchStarted, lambda e: received.append("late"))
+
+    unsubscribe_once = bus.subscribe(SearchStarted, once)
+    bus.subscribe(SearchStarted, lambda event: received.append("steady"))
+
+    bus.emit(SearchStarted())
+    # 本次发布使用发布开始时的订阅表：被取消的处理函数之后的订阅者照常执行，新订阅者不会执行
+    assert received == ["once", "steady"]
+
+    bus.emit(SearchStarted())
+    assert received == ["once", "steady", "steady", "late"]
+
+
+def test_handler_errors_do_not_stop_dispatch():
+    bus = EventBus()
+    received = []
+
+    def broken(event):
+        raise RuntimeError("处理失败")
+
+    bus.subscribe(SearchStarted, broken)
+    bus.subscribe(SearchStarted, received.append)
+    bus.emit(SearchStarted())
+
+    assert len(received) == 1
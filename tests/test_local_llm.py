@@ -0,0 +1,88 @@
+"""
+本地模型客户端测试
+"""
+
+from types import SimpleNamespace
+
+from src.llms import LocalLLM
+from src.llms import local_llm
+
+
+class FakeOpenAIClient:
+    """模拟OpenAI兼容客户端，记录模型列表查询次数"""
+
+    def __init__(self, available: bool = True):
+        self.available = available
+        self.list_calls = 0
+        self.list_timeouts = []
+        self.created = []
+        self.models = SimpleNamespace(list=self._list)
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    def _list(self, timeout=None):
+        self.list_calls += 1
+        self.list_timeouts.append(timeout)
+        if not self.available:
+            raise ConnectionError("Connection refused")
+        return SimpleNamespace(data=[SimpleNamespace(id="qwen2.5-7b-instruct")])
+
+    def _create(self, **params):
+        self.created.append(params)
+        message = SimpleNamespace(content="回复")
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=None)
+
+
+def test_constructor_does_not_contact_server():
+    llm = LocalLLM(base_url="http://127.0.0.1:9/v1")
+    assert llm._client is None
+    assert llm.get_model_info()["model"] is None
+
+
+def test_model_resolved_on_first_invoke_and_cached():
+    llm = LocalLLM()
+    fake = FakeOpenAIClient()
+    llm._client = fake
+
+    assert llm.invoke("系统", "问题") == "回复"
+    assert llm.invoke("系统", "问题") == "回复"
+
+    assert fake.list_calls == 1
+    assert [params["model"] for params in fake.created] == ["qwen2.5-7b-instruct"] * 2
+
+
+def test_unavailable_server_falls_back_and_retries_after_interval(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(local_llm.time, "monotonic", lambda: now[0])
+    llm = LocalLLM(fallback_model="qwen-fallback", model_list_timeout=2.0)
+    fake = FakeOpenAIClient(available=False)
+    llm._client = fake
+
+    assert llm.get_default_model() == "qwen-fallback"
+    fake.available = True
+    # 重试间隔内不再查询
+    assert llm.default_model == "qwen-fallback"
+    assert fake.list_calls == 1
+
+    now[0] += local_llm.MODEL_RETRY_INTERVAL
+    assert llm.default_model == "qwen2.5-7b-instruct"
+    assert fake.list_calls == 2
+    assert fake.list_timeouts == [2.0, 2.0]
+
+
+def test_get_default_model_uses_cached_result():
+    llm = LocalLLM()
+    fake = FakeOpenAIClient()
+    llm._client = fake
+
+    assert llm.get_default_model() == "qwen2.5-7b-instruct"
+    assert llm.get_default_model() == "qwen2.5-7b-instruct"
+    assert fake.list_calls == 1
+
+
+def test_configured_model_skips_server_query():
+    llm = LocalLLM(model_name="llama3")
+    fake = FakeOpenAIClient()
+    llm._client = fake
+    llm.invoke("系统", "问题")
+    assert fake.list_calls == 0
+    assert fake.created[0]["model"] == "llama3"
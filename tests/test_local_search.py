@@ -0,0 +1,103 @@
+"""
+本地全文搜索和元搜索测试
+"""
+
+import threading
+
+import pytest
+
+from src.tools.base import BaseSearch, SearchResult
+from src.tools.local_search import LocalSearch
+from src.tools.meta_search import MetaSearch
+
+# 中文按子串匹配依赖trigram分词器（SQLite 3.34+）
+requires_trigram = pytest.mark.skipif(LocalSearch().tokenizer != "trigram",
+                                      reason="SQLite不支持trigram分词器")
+
+
+@requires_trigram
+def test_index_directory_and_search(tmp_path):
+    docs = tmp_path / "docs"
+    (docs / "sub").mkdir(parents=True)
+    (docs / "chips.md").write_text("# 芯片出口管制\n\n2026年芯片出口管制进一步收紧。", encoding="utf-8")
+    (docs / "sub" / "battery.txt").write_text("Solid-state battery production is ramping up.", encoding="utf-8")
+    (docs / "ignored.json").write_text('{"text": "芯片出口管制"}', encoding="utf-8")
+
+    db_path = str(tmp_path / "index.db")
+    search = LocalSearch(db_path=db_path, paths=[str(docs)])
+    assert search.count() == 2
+
+    [result] = search.search("芯片 出口管制")
+    assert result.title == "芯片出口管制"
+    assert result.url.startswith("file://") and result.url.endswith("chips.md")
+    assert result.score == 1.0
+
+    [result] = search.search("battery production")
+    assert result.title == "battery"
+    assert search.search("量子计算") == []
+    search.close()
+
+    # 重新打开已有的索引数据库
+    reopened = LocalSearch(db_path=db_path)
+    assert reopened.count() == 2
+    assert reopened.tokenizer == search.tokenizer
+    reopened.close()
+
+
+@requires_trigram
+def test_add_document_replaces_same_url():
+    search = LocalSearch()
+    search.add_document("doc://1", "旧标题", "电动汽车销量")
+    search.add_document("doc://1", "新标题", "电动汽车销量创新高")
+    search.add_document("doc://2", "电池", "电池成本下降")
+
+    assert search.count() == 2
+    [result] = search.search("电动汽车")
+    assert result.title == "新标题"
+
+    [snippet] = search.search("电池成本", include_raw_content=False)
+    assert "电池成本" in snippet.content
+
+
+class StubSearch(BaseSearch):
+    """返回预设结果的搜索后端，可设置为等待放行后才返回"""
+
+    def __init__(self, name, results, block=False):
+        self.name = name
+        self.results = results
+        self.release = threading.Event()
+        if not block:
+            self.release.set()
+
+    def search(self, query, max_results=5, include_raw_content=True, timeout=240):
+        self.release.wait(5)
+        return self.results
+
+
+def test_meta_search_merges_duplicate_urls():
+    first = StubSearch("a", [
+        SearchResult(title="A的出口", url="https://example.com/export/", content="A", score=0.4),
+        SearchResult(title="只在A", url="https://example.com/only-a", content="A", score=0.9),
+    ])
+    second = StubSearch("b", [
+        SearchResult(title="B的出口", url="http://EXAMPLE.com/export#top", content="B", score=0.8),
+        SearchResult(title="只在B", url="https://example.com/only-b", content="B", score=0.5),
+    ])
+
+    results = MetaSearch([first, second]).search("芯片 出口")
+
+    # 两个后端都命中的结果排在最前，保留评分较高的那条；其余按评分排序
+    assert [result.title for result in results] == ["B的出口", "只在A", "只在B"]
+
+
+def test_meta_search_returns_arrived_results_at_deadline():
+    fast = StubSearch("fast", [SearchResult(title="快", url="https://example.com/fast", content="")])
+    slow = StubSearch("slow", [SearchResult(title="慢", url="https://example.com/slow", content="")],
+                      block=True)
+
+    try:
+        results = MetaSearch([fast, slow], deadline=0.05).search("芯片")
+    finally:
+        slow.release.set()
+
+    assert [result.title for result in results] == ["快"]
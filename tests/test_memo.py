@@ -0,0 +1,129 @@
+"""
+节点输出记忆测试
+"""
+
+import json
+import os
+
+from src import Config, DeepSearchAgent
+from src.tools.base import BaseSearch, SearchResult
+from src.utils import memo as memo_module
+from src.utils.memo import MemoStore
+
+
+class FakeClock:
+    """可手动推进的时钟"""
+
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def time(self) -> float:
+        return self.now
+
+
+def test_ttl_entries_expire(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(memo_module.time, "time", clock.time)
+    store = MemoStore()
+
+    store.put("search", ["old"], ttl=60)
+    store.put("llm", "reply")
+    clock.now += 30
+    assert store.get("search") == ["old"]
+
+    clock.now += 31
+    assert store.get("search") is None
+    assert store.get("llm") == "reply"
+    assert store.get_or_compute("search", lambda: ["new"], ttl=60) == ["new"]
+    assert store.get_stats()["expired"] == 1
+
+
+def test_max_entries_evicts_least_recently_used():
+    store = MemoStore(max_entries=2)
+    store.put("a", 1)
+    store.put("b", 2)
+    store.get("a")
+    store.put("c", 3)
+
+    assert "b" not in store
+    assert store.get("a") == 1 and store.get("c") == 3
+    assert store.get_stats()["evictions"] == 1
+
+
+def test_save_skips_unchanged_store(tmp_path):
+    path = str(tmp_path / "memo.json")
+    store = MemoStore(persist_path=path)
+    store.put("a", 1)
+    store.save()
+
+    os.utime(path, ns=(0, 0))
+    store.get("a")
+    store.save()
+    assert os.stat(path).st_mtime_ns == 0
+
+    store.put("b", 2)
+    store.save()
+    assert os.stat(path).st_mtime_ns != 0
+
+
+def test_persisted_expiry_and_cap_survive_reload(tmp_path, monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(memo_module.time, "time", clock.time)
+    path = str(tmp_path / "memo.json")
+
+    store = MemoStore(persist_path=path)
+    store.put("search", ["result"], ttl=60)
+    for key in ("a", "b", "c"):
+        store.put(key, key)
+    store.save()
+
+    clock.now += 120
+    reloaded = MemoStore(persist_path=path, max_entries=2)
+    assert "search" not in reloaded
+    assert "a" not in reloaded
+    assert reloaded.get("b") == "b" and reloaded.get("c") == "c"
+
+    # 加载时丢弃了记录，下次保存会重写文件
+    reloaded.save()
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    assert sorted(data["entries"]) == ["b", "c"]
+    assert data["expires"] == {}
+
+
+def test_old_version_file_is_ignored(tmp_path):
+    path = tmp_path / "memo.json"
+    path.write_text(json.dumps({"version": 1, "entries": {"a": 1}}), encoding="utf-8")
+
+    assert len(MemoStore(persist_path=str(path))) == 0
+
+
+class FlakySearch(BaseSearch):
+    """第一次搜索失败（返回空列表，与TavilySearch出错时一致），之后返回结果"""
+
+    name = "flaky"
+
+    def __init__(self):
+        self.calls = 0
+
+    def search(self, query, max_results=5, include_raw_content=True, timeout=240):
+        self.calls += 1
+        if self.calls == 1:
+            return []
+        return [SearchResult(title="标题", url="https://example.com/a", content="内容", score=0.9)]
+
+
+def test_failed_search_is_not_memoized(tmp_path):
+    config = Config(deepseek_api_key="test", tavily_api_key="test", search_cache_enabled=False,
+                    node_memo_enabled=True, output_dir=str(tmp_path))
+    agent = DeepSearchAgent(config)
+    agent.search_backend = FlakySearch()
+
+    assert agent._memoized_search(agent.create_run("查询"), "芯片 出口管制") == []
+
+    results = agent._memoized_search(agent.create_run("查询"), "芯片 出口管制")
+    assert [result["url"] for result in results] == ["https://example.com/a"]
+
+    # 成功的结果会被记录，之后不再搜索
+    assert agent._memoized_search(agent.create_run("查询"), "芯片 出口管制") == results
+    assert agent.search_backend.calls == 2
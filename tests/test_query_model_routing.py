@@ -0,0 +1,82 @@
+"""
+查询生成模型路由测试
+"""
+
+import json
+
+from src import Config, DeepSearchAgent
+from src.agent import QUERY_LLM_ROUTE
+from src.batch.backends import BatchRequest, LocalFileBatchBackend
+from src.llms.base import BaseLLM
+
+
+class RecordingLLM(BaseLLM):
+    """记录调用并返回固定回复的LLM"""
+
+    def __init__(self, name: str, reply: str = "", fail: bool = False):
+        super().__init__("test", name)
+        self.default_model = name
+        self.reply = reply
+        self.fail = fail
+        self.calls = []
+
+    def invoke(self, system_prompt: str, user_prompt: str, **kwargs) -> str:
+        self.calls.append(kwargs.get("node_name"))
+        if self.fail:
+            raise RuntimeError(f"{self.model_name} 不可用")
+        return self.reply
+
+    def get_default_model(self) -> str:
+        return self.model_name
+
+
+QUERY_REPLY = json.dumps({"search_query": "2026 芯片 出口管制", "reasoning": "测试"})
+
+
+def create_agent(tmp_path, **overrides) -> DeepSearchAgent:
+    config = Config(deepseek_api_key="test", tavily_api_key="test", llm_coalescing=False,
+                    search_cache_enabled=False, output_dir=str(tmp_path), **overrides)
+    return DeepSearchAgent(config)
+
+
+def test_query_model_is_routed_with_failover(tmp_path):
+    agent = create_agent(tmp_path, query_model="deepseek-chat", deepseek_model="deepseek-reasoner",
+                         node_llm_routes={"ReflectionNode": ["deepseek"]})
+    router = agent.llm_client
+
+    assert router.get_route("FirstSearchNode") == [QUERY_LLM_ROUTE, "deepseek"]
+    assert router.get_route("ReflectionNode") == [QUERY_LLM_ROUTE, "deepseek"]
+    assert router.get_route("FirstSummaryNode") == ["deepseek"]
+
+    query_llm = RecordingLLM("fast", reply=QUERY_REPLY, fail=True)
+    main_llm = RecordingLLM("strong", reply=QUERY_REPLY)
+    router.providers[QUERY_LLM_ROUTE] = query_llm
+    router.providers["deepseek"] = main_llm
+
+    output = agent.first_search_node.run({"title": "出口管制", "content": "芯片出口管制的影响"})
+
+    assert output["search_query"] == "2026 芯片 出口管制"
+    assert query_llm.calls == ["FirstSearchNode"]
+    assert main_llm.calls == ["FirstSearchNode"]
+    assert router.get_metrics()["failovers"] == 1
+
+
+def test_without_query_model_no_router_is_created(tmp_path):
+    agent = create_agent(tmp_path)
+    assert not hasattr(agent.llm_client, "providers")
+    assert agent._query_model_name() is None
+
+
+def test_local_batch_backend_uses_client_for_request_model(tmp_path):
+    main_llm = RecordingLLM("strong", reply="总结")
+    query_llm = RecordingLLM("fast", reply="查询")
+    backend = LocalFileBatchBackend(main_llm, work_dir=str(tmp_path), model_clients={"fast": query_llm})
+
+    results = backend.run([
+        BatchRequest("summary", "系统", "用户"),
+        BatchRequest("query", "系统", "用户", model="fast")
+    ], poll_interval=0)
+
+    assert results == {"summary": "总结", "query": "查询"}
+    assert len(main_llm.calls) == 1
+    assert len(query_llm.calls) == 1
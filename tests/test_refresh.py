@@ -0,0 +1,118 @@
+"""
+刷新模式测试
+"""
+
+import pytest
+
+from src import Config, DeepSearchAgent
+from src.state import State
+from src.tools.base import BaseSearch, SearchResult
+
+
+class StubSearch(BaseSearch):
+    """按查询返回预设结果的搜索后端，未预设的查询返回空列表（与后端出错时一致）"""
+
+    name = "stub"
+
+    def __init__(self, responses):
+        self.responses = responses
+        self.queries = []
+
+    def search(self, query, max_results=5, include_raw_content=True, timeout=240):
+        self.queries.append(query)
+        return [SearchResult(**result) for result in self.responses.get(query, [])]
+
+
+EVIDENCE = {
+    "芯片 出口": [{"title": "出口", "url": "https://example.com/export", "content": "出口收紧"}],
+    "芯片 产能": [{"title": "产能", "url": "https://example.com/fab", "content": "产能扩张"}],
+    "芯片 价格": [{"title": "价格", "url": "https://example.com/price", "content": "价格上涨"}],
+}
+
+
+@pytest.fixture
+def state_file(tmp_path) -> str:
+    """两个已完成段落的状态文件：第一段搜索过两个查询，第二段一个"""
+    state = State(query="芯片行业展望", report_title="芯片行业展望")
+    state.add_paragraph("供应", "出口与产能")
+    state.add_paragraph("价格", "价格走势")
+    for paragraph, queries in zip(state.paragraphs, [["芯片 出口", "芯片 产能"], ["芯片 价格"]]):
+        for query in queries:
+            paragraph.research.add_search_results(query, EVIDENCE[query])
+        paragraph.research.latest_summary = f"{paragraph.title}的总结"
+        paragraph.research.mark_completed()
+    state.final_report = "旧报告"
+    state.mark_completed()
+
+    path = str(tmp_path / "state.json")
+    state.save_to_file(path)
+    return path
+
+
+@pytest.fixture
+def agent(tmp_path, monkeypatch) -> DeepSearchAgent:
+    """段落任务和最终报告都被替换为记录调用的桩，只测试刷新的判断逻辑"""
+    config = Config(deepseek_api_key="test", tavily_api_key="test", search_cache_enabled=False,
+                    output_dir=str(tmp_path))
+    agent = DeepSearchAgent(config)
+    agent.rerun = []
+
+    def add_paragraph_tasks(workflow, ctx, paragraph_index, after=None, first_search=None):
+        agent.rerun.append((paragraph_index, first_search))
+        return workflow.add(f"paragraph_{paragraph_index}.done", lambda _: None)
+
+    def generate_final_report(ctx):
+        ctx.state.final_report = "新报告"
+        return ctx.state.final_report
+
+    monkeypatch.setattr(agent, "_add_paragraph_tasks", add_paragraph_tasks)
+    monkeypatch.setattr(agent, "_generate_final_report", generate_final_report)
+    return agent
+
+
+def test_unchanged_evidence_keeps_report(agent, state_file):
+    agent.search_backend = StubSearch(EVIDENCE)
+
+    run = agent.refresh_research(state_file, save_report=False)
+
+    assert run.refreshed_paragraphs == []
+    assert run.final_report == "旧报告"
+    assert agent.rerun == []
+    assert sorted(agent.search_backend.queries) == sorted(EVIDENCE)
+
+
+def test_changed_paragraph_is_researched_again(agent, state_file):
+    fresh_price = [{"title": "价格", "url": "https://example.com/price", "content": "价格回落"}]
+    agent.search_backend = StubSearch(dict(EVIDENCE, **{"芯片 价格": fresh_price}))
+
+    run = agent.refresh_research(state_file, save_report=False)
+
+    assert run.refreshed_paragraphs == [1]
+    assert run.final_report == "新报告"
+    [(index, (query, results))] = agent.rerun
+    assert (index, query) == (1, "芯片 价格")
+    assert [result["content"] for result in results] == ["价格回落"]
+    # 只有变化的段落被重置
+    assert run.state.paragraphs[0].research.latest_summary == "供应的总结"
+    assert len(run.state.paragraphs[1].research.search_history) == 0
+
+
+def test_failed_search_keeps_previous_research(agent, state_file):
+    agent.search_backend = StubSearch({})
+
+    run = agent.refresh_research(state_file, save_report=False)
+
+    assert run.refreshed_paragraphs == []
+    assert run.final_report == "旧报告"
+    assert [len(p.research.search_history) for p in run.state.paragraphs] == [2, 1]
+    assert run.state.paragraphs[1].research.latest_summary == "价格的总结"
+
+
+def test_partially_failed_search_compares_remaining_queries(agent, state_file):
+    # 第一段的"芯片 出口"搜索失败，"芯片 产能"未变化，不应视为证据变化
+    responses = {query: results for query, results in EVIDENCE.items() if query != "芯片 出口"}
+    agent.search_backend = StubSearch(responses)
+
+    run = agent.refresh_research(state_file, save_report=False)
+
+    assert run.refreshed_paragraphs == []
@@ -0,0 +1,85 @@
+"""
+多提供商路由测试
+"""
+
+import threading
+
+import pytest
+
+from src.llms.base import BaseLLM
+from src.llms.router import RoutingLLM
+
+
+class StubLLM(BaseLLM):
+    """返回固定回复的LLM，可设置为抛出异常或等待放行后才返回"""
+
+    def __init__(self, name: str, error: bool = False, block: bool = False):
+        super().__init__("test", name)
+        self.error = error
+        self.release = threading.Event()
+        if not block:
+            self.release.set()
+        self.calls = 0
+
+    def invoke(self, system_prompt: str, user_prompt: str, **kwargs) -> str:
+        self.calls += 1
+        self.release.wait(5)
+        if self.error:
+            raise RuntimeError(f"{self.model_name} 不可用")
+        return f"{self.model_name}:{user_prompt}"
+
+    def get_default_model(self) -> str:
+        return self.model_name
+
+
+def test_primary_failure_falls_back():
+    primary, fallback = StubLLM("primary", error=True), StubLLM("fallback")
+    router = RoutingLLM({"primary": primary, "fallback": fallback})
+
+    assert router.invoke("系统", "问题") == "fallback:问题"
+
+    metrics = router.get_metrics()
+    assert metrics["failovers"] == 1
+    assert metrics["providers"]["primary"]["errors"] == 1
+    assert metrics["providers"]["fallback"]["calls"] == 1
+
+
+def test_all_providers_failing_raises_last_error():
+    router = RoutingLLM({"a": StubLLM("a", error=True), "b": StubLLM("b", error=True)})
+
+    with pytest.raises(RuntimeError, match="b 不可用"):
+        router.invoke("系统", "问题")
+
+
+def test_node_route_overrides_default_route():
+    router = RoutingLLM({"a": StubLLM("a"), "b": StubLLM("b")}, routes={"FirstSearchNode": ["b", "a"]})
+
+    assert router.invoke("系统", "问题", node_name="FirstSearchNode") == "b:问题"
+    assert router.invoke("系统", "问题", node_name="ReportFormattingNode") == "a:问题"
+
+
+def test_hedge_wins_when_primary_is_slow():
+    primary, secondary = StubLLM("primary", block=True), StubLLM("secondary")
+    router = RoutingLLM({"primary": primary, "secondary": secondary}, hedge_after=0.01)
+
+    try:
+        assert router.invoke("系统", "问题") == "secondary:问题"
+    finally:
+        primary.release.set()
+
+    metrics = router.get_metrics()
+    assert metrics["hedges_issued"] == 1
+    assert metrics["hedges_won"] == 1
+    assert metrics["failovers"] == 0
+
+
+def test_hedged_primary_failure_fails_over_without_hedge():
+    primary, secondary = StubLLM("primary", error=True), StubLLM("secondary")
+    router = RoutingLLM({"primary": primary, "secondary": secondary}, hedge_after=5)
+
+    assert router.invoke("系统", "问题") == "secondary:问题"
+
+    metrics = router.get_metrics()
+    assert metrics["failovers"] == 1
+    assert metrics["hedges_issued"] == 0
+    assert metrics["hedges_won"] == 0
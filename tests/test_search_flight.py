@@ -0,0 +1,85 @@
+"""
+并发搜索合并测试
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from src import Config, DeepSearchAgent
+from src.tools.base import BaseSearch, SearchResult
+from src.utils.text_processing import normalize_search_query
+
+
+class SlowSearch(BaseSearch):
+    """等待放行后才返回的搜索后端，记录调用次数"""
+
+    name = "slow"
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.calls = 0
+
+    def search(self, query, max_results=5, include_raw_content=True, timeout=240):
+        self.calls += 1
+        self.release.wait(5)
+        return [SearchResult(title="结果", url="https://example.com/chip", content="内容")]
+
+
+@pytest.fixture
+def agent(tmp_path) -> DeepSearchAgent:
+    config = Config(deepseek_api_key="test", tavily_api_key="test", search_cache_enabled=False,
+                    output_dir=str(tmp_path))
+    agent = DeepSearchAgent(config)
+    agent.search_backend = SlowSearch()
+    return agent
+
+
+@pytest.mark.parametrize("first, second", [
+    ("AI 芯片", " ai  芯片 "),
+    ("2026年 AI芯片 出口管制", "AI芯片出口管制，2026"),
+    ("ＡＩ芯片", "AI芯片"),
+])
+def test_equivalent_queries_normalize_equal(first, second):
+    assert normalize_search_query(first) == normalize_search_query(second)
+
+
+@pytest.mark.parametrize("first, second", [
+    ("AI芯片 出口管制 2025", "AI芯片 出口管制 2026"),
+    ("中国 出口", "美国 出口"),
+])
+def test_different_queries_normalize_differently(first, second):
+    assert normalize_search_query(first) != normalize_search_query(second)
+
+
+def test_concurrent_equivalent_searches_call_backend_once(agent):
+    backend = agent.search_backend
+    queries = ["AI 芯片", " ai  芯片 ", "AI芯片"]
+
+    with ThreadPoolExecutor(max_workers=len(queries)) as executor:
+        futures = [executor.submit(agent._search, query) for query in queries]
+        while agent._search_flight.get_stats()["calls"] < len(queries):
+            pass
+        backend.release.set()
+        results = [future.result(timeout=5) for future in futures]
+
+    assert backend.calls == 1
+    assert agent._search_flight.get_stats()["coalesced"] == 2
+    assert all(result == results[0] for result in results)
+
+    # 每个调用方拿到各自的副本，修改一份不影响其他调用方
+    results[0][0]["content"] = "已修改"
+    results[0].append({"title": "额外"})
+    assert [result[0]["content"] for result in results[1:]] == ["内容", "内容"]
+    assert all(len(result) == 1 for result in results[1:])
+
+
+def test_sequential_searches_are_not_coalesced(agent):
+    backend = agent.search_backend
+    backend.release.set()
+
+    agent._search("AI 芯片")
+    agent._search("AI 芯片")
+
+    assert backend.calls == 2
@@ -0,0 +1,63 @@
+"""
+列式搜索记录表测试
+"""
+
+import json
+
+import pytest
+
+from src.state import Search, SearchTable
+
+SEARCHES = [
+    Search(query="芯片 出口", url="https://example.com/a", title="A", content="内容A", score=0.9, timestamp=1000.0),
+    Search(query="芯片 产能", url="https://example.com/b", title="B", content="内容B", timestamp=2000.0),
+    Search(query="芯片 出口", url="https://example.com/c", title="C", content="内容C", score=0.0, timestamp=3000.0),
+]
+
+
+def test_add_and_append_share_query_ids():
+    table = SearchTable()
+    table.append(SEARCHES[0])
+    table.add("芯片 产能", url="https://example.com/b", title="B", content="内容B", timestamp=2000.0)
+    table.extend(SEARCHES[2:])
+
+    assert len(table) == 3
+    assert table == SEARCHES
+    assert table.queries() == ["芯片 出口", "芯片 产能"]
+    assert table.to_columns()["query_ids"] == [0, 1, 0]
+
+
+def test_iteration_and_indexing():
+    table = SearchTable(SEARCHES)
+
+    assert list(table) == SEARCHES
+    assert table[0] == SEARCHES[0]
+    assert table[-1] == SEARCHES[-1]
+    assert table[1:] == SEARCHES[1:]
+    with pytest.raises(IndexError):
+        table[3]
+    # 缺失的评分保持为None，0分不会被当成缺失
+    assert [search.score for search in table] == [0.9, None, 0.0]
+
+
+def test_columns_round_trip():
+    table = SearchTable(SEARCHES)
+    columns = json.loads(json.dumps(table.to_columns(), ensure_ascii=False))
+
+    assert columns["scores"] == [0.9, None, 0.0]
+    restored = SearchTable.from_columns(columns)
+    assert restored == table
+    assert restored.queries() == table.queries()
+
+    # 恢复后继续追加，已有查询沿用原编号
+    restored.add("芯片 产能", url="https://example.com/d")
+    restored.add("芯片 价格", url="https://example.com/e")
+    assert restored.to_columns()["query_ids"] == [0, 1, 0, 1, 2]
+    assert len(table) == 3
+
+
+def test_list_round_trip():
+    table = SearchTable(SEARCHES)
+
+    assert SearchTable.from_list(table.to_list()) == table
+    assert SearchTable.from_columns(SearchTable().to_columns()) == []
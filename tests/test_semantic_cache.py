@@ -0,0 +1,100 @@
+"""
+搜索语义缓存测试
+"""
+
+import json
+
+import pytest
+
+from src.tools.semantic_cache import SemanticSearchCache
+
+RESULTS = [{"title": "结果", "url": "https://example.com", "content": "内容"}]
+
+
+@pytest.mark.parametrize("cached_query, query", [
+    ("UK inflation outlook", "US inflation outlook"),
+    ("中国GDP增长预测", "美国GDP增长预测"),
+    ("2025年 AI芯片 出口管制", "2026年 AI芯片 出口管制"),
+    ("特斯拉 Q3 财报", "特斯拉 Q4 财报"),
+])
+def test_different_entities_do_not_hit(cached_query, query):
+    cache = SemanticSearchCache(threshold=0.5)
+    cache.put(cached_query, 3, RESULTS)
+
+    assert cache.get(query, 3) is None
+    assert cache.get_stats()["misses"] == 1
+
+
+@pytest.mark.parametrize("cached_query, query", [
+    ("2026年 AI芯片 出口管制", "AI芯片出口管制 2026"),
+    ("inflation outlook for the UK", "UK inflation outlook"),
+    ("Tesla stock forecast", "forecast: tesla stock"),
+])
+def test_reworded_queries_hit(cached_query, query):
+    cache = SemanticSearchCache()
+    cache.put(cached_query, 3, RESULTS)
+
+    assert cache.get(query, 3) == RESULTS
+
+
+def test_cached_results_need_enough_results():
+    cache = SemanticSearchCache()
+    cache.put("AI芯片 出口管制", 3, RESULTS)
+    assert cache.get("AI芯片 出口管制", 5) is None
+
+
+def test_ttl_expires_entries():
+    cache = SemanticSearchCache(ttl=0)
+    cache.put("AI芯片 出口管制", 3, RESULTS)
+    cache._entries[next(iter(cache._entries))].created_at -= 1
+    assert cache.get("AI芯片 出口管制", 3) is None
+
+
+def test_persistence_is_batched_and_flushed(tmp_path):
+    path = tmp_path / "cache.json"
+    cache = SemanticSearchCache(persist_path=str(path), flush_every=3)
+
+    cache.put("查询一", 3, RESULTS)
+    cache.put("查询二", 3, RESULTS)
+    assert not path.exists()
+
+    cache.put("查询三", 3, RESULTS)
+    assert len(json.loads(path.read_text(encoding="utf-8"))) == 3
+
+    cache.put("查询四", 3, RESULTS)
+    cache.flush()
+    assert len(json.loads(path.read_text(encoding="utf-8"))) == 4
+
+    reloaded = SemanticSearchCache(persist_path=str(path))
+    assert reloaded.get("查询四", 3) == RESULTS
+
+
+def test_entries_are_scoped_by_search_backend(tmp_path):
+    path = tmp_path / "cache.json"
+    cache = SemanticSearchCache(persist_path=str(path))
+    cache.put("AI芯片 出口管制", 3, RESULTS, backend="tavily")
+
+    assert cache.get("AI芯片 出口管制", 3, backend="tavily") == RESULTS
+    assert cache.get("AI芯片 出口管制", 3, backend="local") is None
+    assert cache.get("出口管制 AI芯片", 3, backend="local") is None
+
+    cache.flush()
+    reloaded = SemanticSearchCache(persist_path=str(path))
+    assert reloaded.get("出口管制 AI芯片", 3, backend="tavily") == RESULTS
+    assert reloaded.get("AI芯片 出口管制", 3, backend="tavily,local") is None
+
+
+@pytest.mark.parametrize("cached_query, query", [
+    ("中国收购美国公司", "美国收购中国公司"),
+    ("公司收购", "收购公司"),
+])
+def test_threshold_rejects_reordered_chinese_with_same_characters(cached_query, query):
+    # 中文内容词是单个汉字，这些查询的内容词相同，只能由相似度阈值拒绝
+    cache = SemanticSearchCache()
+    cache.put(cached_query, 3, RESULTS)
+
+    assert cache.get(query, 3) is None
+    # 阈值放宽后同样的查询会命中，说明拒绝来自阈值而不是内容词比较
+    loose = SemanticSearchCache(threshold=0.5)
+    loose.put(cached_query, 3, RESULTS)
+    assert loose.get(query, 3) == RESULTS
@@ -0,0 +1,48 @@
+"""
+状态二进制格式测试
+"""
+
+import io
+
+import pytest
+
+from src.state import BINARY_STATE_EXTENSION, State
+from src.state.binary import is_binary_state_file, read_state, write_state
+
+
+@pytest.mark.parametrize("compression", [None, "zlib", "lzma"])
+def test_round_trip(sample_state, compression):
+    buffer = io.BytesIO()
+    write_state(sample_state, buffer, compression=compression)
+    buffer.seek(0)
+
+    assert read_state(buffer).to_dict() == sample_state.to_dict()
+
+
+def test_compression_shrinks_repetitive_text(sample_state):
+    plain, compressed = io.BytesIO(), io.BytesIO()
+    write_state(sample_state, plain)
+    write_state(sample_state, compressed, compression="zlib")
+    assert len(compressed.getvalue()) < len(plain.getvalue())
+
+
+def test_format_chosen_by_extension_and_detected_on_load(sample_state, tmp_path):
+    binary_path = tmp_path / f"state{BINARY_STATE_EXTENSION}"
+    json_path = tmp_path / "state.json"
+    sample_state.save_to_file(str(binary_path), compression="zlib")
+    sample_state.save_to_file(str(json_path))
+
+    assert is_binary_state_file(str(binary_path))
+    assert not is_binary_state_file(str(json_path))
+    assert State.load_from_file(str(binary_path)).to_dict() == sample_state.to_dict()
+    assert State.load_from_file(str(json_path)).to_dict() == sample_state.to_dict()
+
+
+def test_rejects_unknown_compression_and_truncated_files(sample_state):
+    with pytest.raises(ValueError):
+        write_state(sample_state, io.BytesIO(), compression="brotli")
+
+    buffer = io.BytesIO()
+    write_state(sample_state, buffer)
+    with pytest.raises(ValueError):
+        read_state(io.BytesIO(buffer.getvalue()[:-4]))
@@ -0,0 +1,48 @@
+"""
+状态JSON流式读写测试
+"""
+
+import io
+import json
+
+from src.state import State
+from src.state.streaming import read_state_json, write_state_json
+
+
+def test_streaming_writer_matches_to_dict(sample_state):
+    buffer = io.StringIO()
+    write_state_json(sample_state, buffer)
+    assert json.loads(buffer.getvalue()) == sample_state.to_dict()
+
+
+def test_streaming_round_trip(sample_state):
+    buffer = io.StringIO()
+    write_state_json(sample_state, buffer)
+    buffer.seek(0)
+
+    loaded = read_state_json(buffer)
+
+    assert loaded.to_dict() == sample_state.to_dict()
+    assert loaded.progress.completed_paragraphs == 1
+
+
+class TrickleReader(io.StringIO):
+    """每次最多返回7个字符，让字符串和数字跨越读取块边界"""
+
+    def read(self, size=-1):
+        return super().read(7)
+
+
+def test_reader_handles_values_split_across_reads(sample_state):
+    buffer = TrickleReader(json.dumps(sample_state.to_dict(), ensure_ascii=False, separators=(",", ":")))
+    loaded = read_state_json(buffer)
+    assert loaded.to_dict() == sample_state.to_dict()
+
+
+def test_save_and_load_file(sample_state, tmp_path):
+    path = tmp_path / "state.json"
+    sample_state.save_to_file(str(path))
+
+    assert State.load_from_file(str(path)).to_dict() == sample_state.to_dict()
+    assert State.from_json(path.read_text(encoding="utf-8")).to_dict() == sample_state.to_dict()
+    assert not list(tmp_path.glob("*.tmp"))
@@ -0,0 +1,59 @@
+"""
+状态延迟加载测试
+"""
+
+from src.state import BINARY_STATE_EXTENSION, State
+from src.state.binary import MappedBlobs
+
+
+def save_binary(state: State, tmp_path) -> str:
+    path = str(tmp_path / f"state{BINARY_STATE_EXTENSION}")
+    state.save_to_file(path, compression="zlib")
+    return path
+
+
+def test_lazy_load_matches_eager_load(sample_state, tmp_path):
+    path = save_binary(sample_state, tmp_path)
+
+    lazy = State.load_from_file(path, lazy=True)
+
+    assert lazy.to_dict() == sample_state.to_dict()
+    assert lazy.get_progress_summary()["completed_paragraphs"] == 1
+
+
+def test_search_contents_are_not_read_until_accessed(sample_state, tmp_path, monkeypatch):
+    path = save_binary(sample_state, tmp_path)
+    reads = []
+    original_get = MappedBlobs.get
+    monkeypatch.setattr(MappedBlobs, "get", lambda self, blob_id: reads.append(blob_id) or original_get(self, blob_id))
+
+    lazy = State.load_from_file(path, lazy=True)
+    history = lazy.paragraphs[0].research.search_history
+
+    # 加载时只读取最终报告，搜索内容在访问时才逐条读取
+    assert len(reads) == 1
+    assert history[1].content == "含有\"引号\"和\\反斜杠"
+    assert len(reads) == 2
+    assert history[0].content == "内容A\n" * 500
+    assert len(reads) == 3
+
+
+def test_lazy_state_can_grow_and_be_saved_over_its_own_file(sample_state, tmp_path):
+    path = save_binary(sample_state, tmp_path)
+    lazy = State.load_from_file(path, lazy=True)
+
+    lazy.paragraphs[1].research.add_search_results("AI 就业 2026", [
+        {"url": "https://example.com/d", "title": "新增", "content": "新内容"}
+    ])
+    lazy.save_to_file(path)
+
+    reloaded = State.load_from_file(path)
+    history = reloaded.paragraphs[1].research.search_history
+    assert [search.content for search in history] == ["😀 emoji", "新内容"]
+    assert reloaded.paragraphs[0].research.search_history[0].content == "内容A\n" * 500
+
+
+def test_lazy_flag_ignored_for_json(sample_state, tmp_path):
+    path = str(tmp_path / "state.json")
+    sample_state.save_to_file(path)
+    assert State.load_from_file(path, lazy=True).to_dict() == sample_state.to_dict()
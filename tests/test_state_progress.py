@@ -0,0 +1,33 @@
+"""
+进度快照测试
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+from src.state import State
+
+
+def test_each_state_has_its_own_publish_lock(sample_state):
+    other = State(query="另一个研究")
+
+    assert sample_state._publish_lock is not other._publish_lock
+    assert "_publish_lock" not in sample_state.to_dict()
+    assert "_publish_lock" not in sample_state.to_json()
+
+
+def test_progress_snapshot_tracks_concurrent_updates():
+    state = State(query="并发")
+    for i in range(8):
+        state.add_paragraph(f"段落{i}", "内容")
+
+    def complete(i):
+        state.paragraphs[i].research.latest_summary = "总结"
+        state.paragraphs[i].research.mark_completed()
+        state.update_timestamp()
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        list(executor.map(complete, range(8)))
+
+    progress = state.progress
+    assert (progress.total_paragraphs, progress.completed_paragraphs) == (8, 8)
+    assert state.get_progress_summary()["progress_percentage"] == 100.0
@@ -0,0 +1,35 @@
+"""
+停止序列补全测试
+"""
+
+import json
+
+from src.nodes.search_node import FirstSearchNode
+from src.utils.text_processing import restore_stop_sequence
+
+
+def test_restores_truncated_closing_brace():
+    text = '{\n  "search_query": "AI芯片",\n  "reasoning": "测试"'
+    restored = restore_stop_sequence(text, ["\n}"])
+    assert json.loads(restored) == {"search_query": "AI芯片", "reasoning": "测试"}
+
+
+def test_leaves_complete_output_unchanged():
+    text = '{"search_query": "AI芯片"}\n'
+    assert restore_stop_sequence(text, ["\n}"]) == text
+
+
+def test_strips_trailing_code_fence_before_restoring():
+    text = '```json\n[\n  {"title": "段落"}\n```'
+    assert restore_stop_sequence(text, ["\n]"]).endswith('{"title": "段落"}\n]')
+
+
+def test_empty_text_or_no_stop_sequences():
+    assert restore_stop_sequence("", ["\n}"]) == ""
+    assert restore_stop_sequence('{"a": 1', []) == '{"a": 1'
+
+
+def test_node_parses_response_cut_at_stop_sequence():
+    node = FirstSearchNode(llm_client=None)
+    output = node.parse_response('{\n  "search_query": "电动汽车 市场",\n  "reasoning": "测试"')
+    assert output["search_query"].startswith("电动汽车 市场")
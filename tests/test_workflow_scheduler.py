@@ -0,0 +1,95 @@
+"""
+工作流调度器测试
+"""
+
+import threading
+import time
+
+import pytest
+
+from src.workflow import Workflow, WorkflowError, WorkflowScheduler
+
+
+def test_dependency_results_are_passed_in_order():
+    workflow = Workflow()
+    workflow.add("a", lambda results: 1)
+    workflow.add("b", lambda results: results["a"] + 1, deps=["a"])
+    workflow.add("c", lambda results: results["a"] + results["b"], deps=["a", "b"])
+
+    results = WorkflowScheduler().run(workflow)
+
+    assert results == {"a": 1, "b": 2, "c": 3}
+
+
+def test_tasks_added_while_running_are_scheduled():
+    workflow = Workflow()
+
+    def structure(results):
+        # 模拟生成报告结构后为每个段落添加任务
+        for i in range(5):
+            workflow.add(f"paragraph_{i}", lambda results, i=i: results["structure"] * 10 + i,
+                         deps=["structure"])
+        workflow.add("report", lambda results: sorted(results.values()),
+                     deps=[f"paragraph_{i}" for i in range(5)])
+        return 1
+
+    workflow.add("structure", structure)
+
+    results = WorkflowScheduler().run(workflow)
+
+    assert results["report"] == [10, 11, 12, 13, 14]
+    assert workflow.tasks(6)[0].name == "report"
+
+
+def test_resource_limit_caps_concurrency():
+    workflow = Workflow()
+    lock = threading.Lock()
+    active = {"now": 0, "max": 0}
+
+    def task(results):
+        with lock:
+            active["now"] += 1
+            active["max"] = max(active["max"], active["now"])
+        time.sleep(0.02)
+        with lock:
+            active["now"] -= 1
+
+    for i in range(8):
+        workflow.add(f"llm_{i}", task, resource="llm")
+
+    WorkflowScheduler(limits={"llm": 2}, max_workers=8).run(workflow)
+
+    assert active["max"] == 2
+
+
+def test_first_error_is_raised_and_no_new_tasks_start():
+    workflow = Workflow()
+    started = []
+
+    def fail(results):
+        raise ValueError("boom")
+
+    def slow(results):
+        time.sleep(0.05)
+        started.append("slow")
+
+    workflow.add("fail", fail)
+    workflow.add("slow", slow)
+    workflow.add("after_slow", lambda results: started.append("after_slow"), deps=["slow"])
+    workflow.add("after_fail", lambda results: started.append("after_fail"), deps=["fail"])
+
+    with pytest.raises(ValueError, match="boom"):
+        WorkflowScheduler().run(workflow)
+
+    # 已在执行的任务会完成，但失败之后不再提交新任务
+    assert started == ["slow"]
+
+
+def test_duplicate_and_unknown_dependencies_are_rejected():
+    workflow = Workflow()
+    workflow.add("a", lambda results: None)
+
+    with pytest.raises(WorkflowError):
+        workflow.add("a", lambda results: None)
+    with pytest.raises(WorkflowError):
+        workflow.add("b", lambda results: None, deps=["missing"])